@@ -0,0 +1,291 @@
+import hashlib
+from array import array
+import numpy as np
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+from models import AWSService, ServiceCategory, PricingModel, SearchMode, SortField, ComparisonMatrix, FacetsResponse
+from comparison import ComparisonIndex
+from facets import FacetIndex, positions_bitmap
+from search import SEARCH_FIELDS, SearchIndex
+from fuzzy import FUZZY_FIELDS, FuzzyIndex
+from similarity import SIMILARITY_FIELDS, SimilarityIndex
+from estimate import PricingTable
+from records import ServiceRecords
+from sorting import SortOrders
+
+# A posting list is the ascending tuple of catalog positions matching one index key,
+# kept alongside a frozenset of the same positions for O(1) membership tests
+Posting = Tuple[Tuple[int, ...], FrozenSet[int]]
+
+EMPTY_POSTING: Posting = ((), frozenset())
+
+
+def make_posting(positions: Iterable[int]) -> Posting:
+    ordered = tuple(sorted(positions))
+    return ordered, frozenset(ordered)
+
+
+class ServiceCatalog:
+    """Immutable snapshot of the service catalog with indexes built once at load time"""
+
+    __slots__ = ("version", "fingerprint", "_records", "_fragment_data", "_fragment_offsets", "_by_id", "_by_category", "_by_free_tier", "_by_pricing_model", "_search_index", "_fuzzy_index", "_similarity_index", "_comparison_index", "_facet_index", "_pricing_table", "_sort_orders")
+
+    def __init__(self, services: Iterable[AWSService], version: int = 1):
+        # Bumped for every new snapshot; caches keyed on it drop stale entries
+        self.version = version
+        # The validated models are only used to build the snapshot; it keeps their values
+        # as compact interned columns and builds models again for the services requested
+        services: Tuple[AWSService, ...] = tuple(services)
+        self._records = ServiceRecords(services)
+        # Each service encoded once; the snapshot is validated and immutable, so responses
+        # are assembled from these fragments instead of re-dumping the models per request.
+        # They live in one buffer with an offset table: two objects, whatever the catalog
+        # size, so forked workers reading them never touch (and unshare) per-record pages
+        fragments = [service.model_dump_json().encode() for service in services]
+        self._fragment_offsets = array("Q", [0])
+        for fragment in fragments:
+            self._fragment_offsets.append(self._fragment_offsets[-1] + len(fragment))
+        self._fragment_data = b"".join(fragments)
+        del fragments
+        self._by_id: Dict[str, int] = {}
+
+        by_category: Dict[ServiceCategory, List[int]] = {}
+        by_free_tier: Dict[bool, List[int]] = {True: [], False: []}
+        by_pricing_model: Dict[PricingModel, List[int]] = {}
+
+        for position, service in enumerate(services):
+            if service.id in self._by_id:
+                raise ValueError(f"Duplicate service id: {service.id}")
+            self._by_id[service.id] = position
+            by_category.setdefault(service.category, []).append(position)
+            by_free_tier[service.free_tier_available].append(position)
+            for pricing_model in set(service.pricing_models):
+                by_pricing_model.setdefault(pricing_model, []).append(position)
+
+        self._by_category: Dict[ServiceCategory, Posting] = {
+            category: make_posting(positions) for category, positions in by_category.items()
+        }
+        self._by_free_tier: Dict[bool, Posting] = {
+            flag: make_posting(positions) for flag, positions in by_free_tier.items()
+        }
+        self._by_pricing_model: Dict[PricingModel, Posting] = {
+            pricing_model: make_posting(positions) for pricing_model, positions in by_pricing_model.items()
+        }
+        # Content hash of the whole snapshot, the basis for response ETags
+        digest = hashlib.sha256()
+        digest.update(self._fragment_data)
+        self.fingerprint = digest.hexdigest()
+
+        self._search_index = SearchIndex(
+            {field: getattr(service, field) for field in SEARCH_FIELDS} for service in services
+        )
+        self._fuzzy_index = FuzzyIndex(
+            {field: getattr(service, field) for field in FUZZY_FIELDS} for service in services
+        )
+        self._similarity_index = SimilarityIndex(
+            {field: getattr(service, field) for field in SIMILARITY_FIELDS} for service in services
+        )
+        self._comparison_index = ComparisonIndex(services)
+        self._facet_index = FacetIndex(services)
+        self._pricing_table = PricingTable(services)
+        self._sort_orders = SortOrders(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, service_id: object) -> bool:
+        return service_id in self._by_id
+
+    @property
+    def services(self) -> List[AWSService]:
+        """Every service as a model; builds all of them, so prefer positions and fragments"""
+        return self.materialize(range(len(self._records)))
+
+    def get(self, service_id: str) -> Optional[AWSService]:
+        """Look up a single service by id"""
+        position = self._by_id.get(service_id)
+        return None if position is None else self._records.record(position)
+
+    def position_of(self, service_id: str) -> Optional[int]:
+        return self._by_id.get(service_id)
+
+    def service_id(self, position: int) -> str:
+        return self._records.ids[position]
+
+    def by_category(self, category: ServiceCategory) -> List[AWSService]:
+        return self.materialize(self._by_category.get(category, EMPTY_POSTING)[0])
+
+    def by_free_tier(self, free_tier: bool) -> List[AWSService]:
+        return self.materialize(self._by_free_tier[free_tier][0])
+
+    def by_pricing_model(self, pricing_model: PricingModel) -> FrozenSet[str]:
+        """Ids of all services offering the given pricing model"""
+        positions = self._by_pricing_model.get(pricing_model, EMPTY_POSTING)[0]
+        return frozenset(self._records.ids[position] for position in positions)
+
+    def filter_postings(
+        self,
+        category: Optional[ServiceCategory] = None,
+        free_tier: Optional[bool] = None,
+    ) -> List[Posting]:
+        """Posting lists for the given filters; an empty list means no filtering"""
+        postings = []
+        if category is not None:
+            postings.append(self._by_category.get(category, EMPTY_POSTING))
+        if free_tier is not None:
+            postings.append(self._by_free_tier[free_tier])
+        return postings
+
+    def positions(
+        self,
+        category: Optional[ServiceCategory] = None,
+        free_tier: Optional[bool] = None,
+    ) -> Sequence[int]:
+        """Positions matching all given filters, in catalog order"""
+        postings = self.filter_postings(category=category, free_tier=free_tier)
+        if not postings:
+            return range(len(self._records))
+        return intersect_postings(postings)
+
+    def filter(
+        self,
+        category: Optional[ServiceCategory] = None,
+        free_tier: Optional[bool] = None,
+    ) -> List[AWSService]:
+        """Services matching all given filters, in catalog order"""
+        return self.materialize(self.positions(category=category, free_tier=free_tier))
+
+    def search_positions(
+        self,
+        query: str,
+        category: Optional[ServiceCategory] = None,
+        free_tier: Optional[bool] = None,
+        mode: SearchMode = SearchMode.TEXT,
+    ) -> List[int]:
+        """Positions matching the query and filters, most relevant first
+
+        Fuzzy mode tolerates typos in ids, names and key features; text mode matches
+        whole words and prefixes across all searchable fields, and parts of words for
+        terms no word starts with.
+        """
+        index = self._fuzzy_index if mode == SearchMode.FUZZY else self._search_index
+        ranked = index.search(query)
+        postings = self.filter_postings(category=category, free_tier=free_tier)
+        if postings:
+            ranked = [(position, score) for position, score in ranked if all(position in members for _, members in postings)]
+        return [position for position, _ in ranked]
+
+    def search(
+        self,
+        query: str,
+        category: Optional[ServiceCategory] = None,
+        free_tier: Optional[bool] = None,
+        mode: SearchMode = SearchMode.TEXT,
+    ) -> List[AWSService]:
+        return self.materialize(self.search_positions(query, category=category, free_tier=free_tier, mode=mode))
+
+    def query_positions(
+        self,
+        search: Optional[str] = None,
+        category: Optional[ServiceCategory] = None,
+        free_tier: Optional[bool] = None,
+        search_mode: SearchMode = SearchMode.TEXT,
+        sort: Optional[SortField] = None,
+        descending: bool = False,
+    ) -> Sequence[int]:
+        """Positions for a /api/services query; nothing is materialized, so len() is cheap
+
+        Without a sort, searches are ranked by relevance and listings keep catalog order.
+        Sorted results follow the snapshot's precomputed orders and are only produced as
+        far as the requested slice reaches.
+        """
+        if search:
+            ranked = self.search_positions(search, category=category, free_tier=free_tier, mode=search_mode)
+            if sort is None or sort == SortField.RELEVANCE:
+                return ranked if descending or sort is None else ranked[::-1]
+            return self._sort_orders.sort(sort, descending, ranked, (frozenset(ranked),))
+        positions = self.positions(category=category, free_tier=free_tier)
+        if sort is None or sort == SortField.RELEVANCE:
+            return positions
+        members = [members for _, members in self.filter_postings(category=category, free_tier=free_tier)]
+        return self._sort_orders.sort(sort, descending, positions, members)
+
+    def query_cost(
+        self,
+        search: Optional[str] = None,
+        category: Optional[ServiceCategory] = None,
+        free_tier: Optional[bool] = None,
+        limit: Optional[int] = None,
+        sort: Optional[SortField] = None,
+    ) -> int:
+        """Rough number of services a /api/services query touches, to decide where it runs
+
+        A search may score every service. Intersecting filters, or putting filtered matches
+        in sort order, visits the shortest matching posting list whatever the page size;
+        other listings slice a precomputed order or posting list, and only copy the
+        fragments they return.
+        """
+        if search:
+            return len(self._records)
+        postings = self.filter_postings(category=category, free_tier=free_tier)
+        if len(postings) > 1 or (postings and sort is not None and sort != SortField.RELEVANCE):
+            return min(len(posting[0]) for posting in postings)
+        size = len(postings[0][0]) if postings else len(self._records)
+        return size if limit is None else min(limit, size)
+
+    def facets(
+        self,
+        search: Optional[str] = None,
+        category: Optional[ServiceCategory] = None,
+        free_tier: Optional[bool] = None,
+        search_mode: SearchMode = SearchMode.TEXT,
+    ) -> FacetsResponse:
+        """Category, pricing model and free tier counts for a /api/services query"""
+        matches = None
+        if search:
+            matches = positions_bitmap(self.search_positions(search, mode=search_mode), len(self._records))
+        return self._facet_index.counts(category=category, free_tier=free_tier, matches=matches)
+
+    def similar(self, position: int, k: int) -> Sequence[Tuple[int, float]]:
+        """(position, score) of the k services described most like the one at position"""
+        return self._similarity_index.neighbors(position, k)
+
+    def similar_cost(self, position: int) -> int:
+        """Services scored to answer similar(position): none once its neighbor row is built"""
+        return 0 if self._similarity_index.has_neighbors(position) else len(self._records)
+
+    def is_priced(self, position: int) -> bool:
+        return position in self._pricing_table
+
+    def estimate_width(self, positions: Optional[Sequence[int]] = None) -> int:
+        """Services estimate(usage, positions) prices each scenario on"""
+        return len(self._pricing_table.positions if positions is None else positions)
+
+    def estimate(self, usage: np.ndarray, positions: Optional[Sequence[int]] = None) -> Tuple[Sequence[int], np.ndarray, np.ndarray]:
+        """Positions estimated (every metered service by default), their costs and cheapest columns, see PricingTable.estimate"""
+        costs, cheapest_columns = self._pricing_table.estimate(usage, positions)
+        return self._pricing_table.positions if positions is None else positions, costs, cheapest_columns
+
+    def compare(self, positions: Sequence[int]) -> ComparisonMatrix:
+        return self._comparison_index.compare(self.materialize(positions), positions)
+
+    def materialize(self, positions: Iterable[int]) -> List[AWSService]:
+        record = self._records.record
+        return [record(position) for position in positions]
+
+    def fragment(self, position: int) -> bytes:
+        """The service at position as encoded JSON"""
+        offsets = self._fragment_offsets
+        return self._fragment_data[offsets[position]:offsets[position + 1]]
+
+    def fragments(self, positions: Iterable[int]) -> List[bytes]:
+        data, offsets = self._fragment_data, self._fragment_offsets
+        return [data[offsets[position]:offsets[position + 1]] for position in positions]
+
+
+def intersect_postings(postings: Sequence[Posting]) -> Tuple[int, ...]:
+    """Intersect posting lists, scanning the shortest and probing the others' sets"""
+    if len(postings) == 1:
+        return postings[0][0]
+    ordered = sorted(postings, key=lambda posting: len(posting[0]))
+    others = [members for _, members in ordered[1:]]
+    return tuple(position for position in ordered[0][0] if all(position in members for members in others))
@@ -1,25 +1,53 @@
 from http.server import BaseHTTPRequestHandler
 import json
+import os
+import sys
 
-CATEGORIES = ['Compute', 'Storage', 'Database', 'Networking', 'Messaging', 'Machine Learning', 'Analytics', 'Security', 'Developer Tools']
+# Serverless functions are loaded by path, so make sibling modules importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cache import CACHE_CONTROL, content_hash, etag_matches
+from compression import EncodedBody, negotiate_encoding, variant_etag
+from category_values import CATEGORIES
+
+# The response never changes within a deployment, so encode it and hash it once
+RESPONSE_BODY = EncodedBody(json.dumps({
+    'categories': CATEGORIES
+}).encode())
+RESPONSE_ETAG = f'"{content_hash(RESPONSE_BODY.identity)[:32]}"'
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         try:
-            response_data = {
-                'categories': CATEGORIES
-            }
+            encoding = negotiate_encoding(self.headers.get('Accept-Encoding'))
+            etag = variant_etag(RESPONSE_ETAG, RESPONSE_BODY.applied_encoding(encoding))
+            if etag_matches(self.headers.get('If-None-Match'), etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', CACHE_CONTROL)
+                self.send_header('Vary', 'Accept-Encoding')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                return
+            
+            body, applied_encoding = RESPONSE_BODY.variant(encoding)
             
             # Set CORS headers
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
+            if applied_encoding:
+                self.send_header('Content-Encoding', applied_encoding)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', CACHE_CONTROL)
+            self.send_header('Vary', 'Accept-Encoding')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
             self.end_headers()
             
             # Send JSON response
-            self.wfile.write(json.dumps(response_data).encode())
+            self.wfile.write(body)
             
         except Exception as e:
             print(f"Error in categories endpoint: {e}")
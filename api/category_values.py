@@ -0,0 +1,17 @@
+# Every category a service may have, in ServiceCategory order. A plain tuple, so the
+# stdlib handlers list categories without importing pydantic at cold start; a test keeps
+# it in step with models.ServiceCategory
+CATEGORIES = (
+    "Compute",
+    "Storage",
+    "Database",
+    "Networking",
+    "Security",
+    "Analytics",
+    "Machine Learning",
+    "Containers",
+    "Serverless",
+    "Developer Tools",
+    "Management & Governance",
+    "Internet of Things",
+)
@@ -0,0 +1,307 @@
+"""Memory-mapped columnar catalog for the stdlib serverless handlers.
+
+Build step, run by the buildCommand in the root vercel.json so deployments ship the
+file next to the catalog (run it by hand after editing the catalog file locally):
+
+    python columnar.py [catalog.json] [catalog.columns]
+
+The file holds every service encoded once as JSON, an offset table into those bytes,
+and for each filter column a string table of its distinct values with one bitmap over
+service positions per value. Handlers mmap it, so a cold start reads a small header
+instead of parsing the catalog, and warm instances on a host share its pages through
+the page cache. Filters are evaluated on the mapped bitmaps and response bodies are
+written from slices of the mapped JSON, without a dict per service.
+
+Layout: MAGIC, the header length as a u64, the JSON header, then 8-byte aligned
+sections. The header lists each section as an (offset, length) pair relative to the
+first section.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from serialization import dumps
+
+if TYPE_CHECKING:
+    from search import SearchIndex
+
+MAGIC = b"SVCCOLS\x00"
+
+# Bump when the layout changes; files in an older format are rebuilt from the catalog
+COLUMNS_FORMAT = 2
+
+# Columns with one bitmap per distinct value, keyed by the value's JSON encoding
+FILTER_COLUMNS = ("category", "free_tier_available")
+
+# Prebuilt by `python columnar.py`; used when it was built from the current catalog file
+COLUMNS_PATH = os.environ.get(
+    "CATALOG_COLUMNS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.columns")
+)
+
+# Set bits of every byte value, for walking a bitmap a byte at a time
+BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+Buffer = Union[bytes, memoryview]
+
+
+def align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def parse_catalog(raw: bytes, path: str) -> List[dict]:
+    """Services of a catalog file: a JSON array, or one service per line for .jsonl"""
+    if path.endswith(".jsonl"):
+        return [json.loads(line) for line in raw.splitlines() if line.strip()]
+    return json.loads(raw)
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def file_state(path: str) -> Tuple[int, int]:
+    """Size and modification time of a file, checked before trusting a columns file built from it"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def bitmap_positions(bitmap: Buffer) -> Iterator[int]:
+    """Positions of the set bits, ascending"""
+    for index, byte in enumerate(bitmap):
+        if byte:
+            base = index << 3
+            for bit in BYTE_BITS[byte]:
+                yield base + bit
+
+
+def write_columns(source_path: str, columns_path: str) -> None:
+    source_size, source_mtime_ns = file_state(source_path)
+    with open(source_path, "rb") as f:
+        raw = f.read()
+    services = parse_catalog(raw, source_path)
+    bitmap_length = (len(services) + 7) // 8
+
+    # Every fragment carries a trailing comma, so consecutive services are one slice
+    fragments = [dumps(service) + b"," for service in services]
+    offsets = array("Q", [0])
+    for fragment in fragments:
+        offsets.append(offsets[-1] + len(fragment))
+
+    sections: List[bytes] = []
+    position = 0
+
+    def add_section(data: bytes) -> List[int]:
+        nonlocal position
+        start = position
+        sections.append(data + bytes(align(len(data)) - len(data)))
+        position += align(len(data))
+        return [start, len(data)]
+
+    header: Dict[str, object] = {
+        "format": COLUMNS_FORMAT,
+        "byteorder": sys.byteorder,
+        "count": len(services),
+        "source": hashlib.sha256(raw).hexdigest(),
+        "source_size": source_size,
+        "source_mtime_ns": source_mtime_ns,
+        "offsets": add_section(offsets.tobytes()),
+        "fragments": add_section(b"".join(fragments)),
+    }
+    del fragments
+    columns: Dict[str, Dict[str, list]] = {}
+    for column in FILTER_COLUMNS:
+        bitmaps: Dict[str, bytearray] = {}
+        for index, service in enumerate(services):
+            key = dumps(service.get(column)).decode()
+            bitmap = bitmaps.get(key)
+            if bitmap is None:
+                bitmap = bitmaps[key] = bytearray(bitmap_length)
+            bitmap[index >> 3] |= 1 << (index & 7)
+        columns[column] = {
+            "values": list(bitmaps),
+            "bitmaps": [add_section(bytes(bitmap)) for bitmap in bitmaps.values()],
+        }
+    header["columns"] = columns
+
+    encoded_header = json.dumps(header).encode()
+    prefix = MAGIC + struct.pack("<Q", len(encoded_header)) + encoded_header
+    # Write then rename so a concurrently starting instance never maps a partial file
+    temp_path = f"{columns_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(prefix + bytes(align(len(prefix)) - len(prefix)))
+        for section in sections:
+            f.write(section)
+    os.replace(temp_path, columns_path)
+
+
+class ColumnarCatalog:
+    """Read-only view of a mapped columns file; nothing is decoded until a search needs it"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = view = memoryview(self._map)
+        try:
+            if bytes(view[:len(MAGIC)]) != MAGIC:
+                raise ValueError(f"{path} is not a columns file")
+            (header_length,) = struct.unpack_from("<Q", self._map, len(MAGIC))
+            header_start = len(MAGIC) + 8
+            header = json.loads(bytes(view[header_start:header_start + header_length]))
+            if header["format"] != COLUMNS_FORMAT or header["byteorder"] != sys.byteorder:
+                raise ValueError(f"{path} was built in another format")
+        except BaseException:
+            self.close()
+            raise
+        base = align(header_start + header_length)
+
+        def section(bounds: Sequence[int]) -> memoryview:
+            return view[base + bounds[0]:base + bounds[0] + bounds[1]]
+
+        self.count: int = header["count"]
+        # Hash of the catalog file it was built from, the basis for response ETags
+        self.fingerprint: str = header["source"]
+        self._source_state: Tuple[int, int] = (header["source_size"], header["source_mtime_ns"])
+        self._offsets = section(header["offsets"]).cast("Q")
+        self._fragments = section(header["fragments"])
+        self._bitmaps: Dict[str, Dict[str, memoryview]] = {
+            column: {value: section(bounds) for value, bounds in zip(spec["values"], spec["bitmaps"])}
+            for column, spec in header["columns"].items()
+        }
+        self._search_index: Optional["SearchIndex"] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def built_from(self, source_path: str, state: Tuple[int, int]) -> bool:
+        """Whether this file was built from the catalog file with the given file_state
+
+        An unchanged size and mtime settle it without reading the catalog; only a file
+        of the same size touched or copied since the build is hashed.
+        """
+        if state[0] != self._source_state[0]:
+            return False
+        return state == self._source_state or file_digest(source_path) == self.fingerprint
+
+    def close(self) -> None:
+        """Unmap the file; every view handed out by this catalog must be released first"""
+        for bitmaps in getattr(self, "_bitmaps", {}).values():
+            for bitmap in bitmaps.values():
+                bitmap.release()
+        for name in ("_offsets", "_fragments", "_view"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._map.close()
+
+    def filter_bitmap(self, category: Optional[str] = None, free_tier: Optional[bool] = None) -> Optional[Buffer]:
+        """Bitmap of services matching every given filter, or None when nothing filters"""
+        bitmaps = []
+        for column, value in (("category", category), ("free_tier_available", free_tier)):
+            if value is not None:
+                bitmap = self._bitmaps[column].get(dumps(value).decode())
+                if bitmap is None:
+                    return bytes((self.count + 7) // 8)
+                bitmaps.append(bitmap)
+        if not bitmaps:
+            return None
+        if len(bitmaps) == 1:
+            return bitmaps[0]
+        combined = int.from_bytes(bitmaps[0], "little")
+        for bitmap in bitmaps[1:]:
+            combined &= int.from_bytes(bitmap, "little")
+        return combined.to_bytes(len(bitmaps[0]), "little")
+
+    def positions(self, category: Optional[str] = None, free_tier: Optional[bool] = None) -> Sequence[int]:
+        """Positions matching the filters, in catalog order"""
+        bitmap = self.filter_bitmap(category, free_tier)
+        if bitmap is None:
+            return range(self.count)
+        return list(bitmap_positions(bitmap))
+
+    @property
+    def search_index(self) -> "SearchIndex":
+        """Built from the mapped JSON on the first search, then kept for the instance's lifetime"""
+        if self._search_index is None:
+            # Imported here because search pulls in numpy, which only searches should pay for
+            from search import SearchIndex
+            self._search_index = SearchIndex(json.loads(bytes(self.fragment(position))) for position in range(self.count))
+        return self._search_index
+
+    def search_positions(self, query: str, category: Optional[str] = None, free_tier: Optional[bool] = None) -> List[int]:
+        """Positions matching the query and filters, most relevant first"""
+        bitmap = self.filter_bitmap(category, free_tier)
+        ranked = self.search_index.search(query)
+        if bitmap is None:
+            return [position for position, _ in ranked]
+        return [position for position, _ in ranked if bitmap[position >> 3] >> (position & 7) & 1]
+
+    def fragment(self, position: int) -> memoryview:
+        """The service at position as encoded JSON"""
+        return self._fragments[self._offsets[position]:self._offsets[position + 1] - 1]
+
+    def json_array(self, positions: Iterable[int]) -> List[Buffer]:
+        """Chunks of a JSON array of the services at positions, slicing the mapping once per run of neighbours"""
+        offsets, fragments = self._offsets, self._fragments
+        if isinstance(positions, range) and positions.step == 1:
+            if not positions:
+                return [b"[]"]
+            return [b"[", fragments[offsets[positions.start]:offsets[positions.stop] - 1], b"]"]
+        chunks: List[Buffer] = [b"["]
+        start = end = None
+        for position in positions:
+            if position == end:
+                end += 1
+                continue
+            if start is not None:
+                chunks.append(fragments[offsets[start]:offsets[end]])
+            start, end = position, position + 1
+        if start is not None:
+            # The last fragment's trailing comma is left out
+            chunks.append(fragments[offsets[start]:offsets[end] - 1])
+        chunks.append(b"]")
+        return chunks
+
+
+def open_columns(source_path: str, columns_path: str = COLUMNS_PATH) -> ColumnarCatalog:
+    """Map the columns file built from source_path, building one first if it is missing or stale"""
+    try:
+        state: Optional[Tuple[int, int]] = file_state(source_path)
+    except OSError:
+        # The columns file is self-contained, so a deployment may ship it without the source
+        state = None
+    try:
+        columns = ColumnarCatalog(columns_path)
+    except (OSError, ValueError, KeyError) as e:
+        if state is None:
+            raise
+        if not isinstance(e, FileNotFoundError):
+            print(f"Ignoring columns file {columns_path}: {e}")
+    else:
+        if state is None or columns.built_from(source_path, state):
+            return columns
+        print(f"Ignoring columns file {columns_path}: built from another version of {source_path}")
+        columns.close()
+
+    # The deployment directory is read-only on serverless hosts, the temp dir is not
+    target = os.path.join(tempfile.gettempdir(), f"catalog-{file_digest(source_path)[:16]}.columns")
+    if not os.path.exists(target):
+        write_columns(source_path, target)
+    return ColumnarCatalog(target)
+
+
+if __name__ == "__main__":
+    here = os.path.dirname(os.path.abspath(__file__))
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "catalog.json")
+    target = sys.argv[2] if len(sys.argv) > 2 else COLUMNS_PATH
+
+    write_columns(source, target)
+    columns = ColumnarCatalog(target)
+    print(f"Wrote {target}: {len(columns)} services, source {columns.fingerprint[:12]}")
@@ -0,0 +1,124 @@
+from array import array
+from typing import Dict, Iterable, List, Sequence
+from models import AWSService, PricingModel, ComparisonMatrix, PricingComparison, SetComparison
+
+# Bit assigned to each pricing model; stable because it follows the enum order
+PRICING_MODEL_BITS: Dict[PricingModel, int] = {model: 1 << index for index, model in enumerate(PricingModel)}
+
+
+def pricing_mask(pricing_models: Iterable[PricingModel]) -> int:
+    mask = 0
+    for pricing_model in pricing_models:
+        mask |= PRICING_MODEL_BITS[pricing_model]
+    return mask
+
+
+def pricing_models_from_mask(mask: int) -> List[PricingModel]:
+    return [pricing_model for pricing_model, bit in PRICING_MODEL_BITS.items() if mask & bit]
+
+
+def common_mask(masks: Sequence[int]) -> int:
+    common = masks[0] if masks else 0
+    for mask in masks[1:]:
+        common &= mask
+    return common
+
+
+class TermLists:
+    """Each service's distinct terms as ids into one shared vocabulary
+
+    Terms are compared case-insensitively; the first spelling seen is the one reported.
+    Ids are kept sorted per service in one flat array with an offset per service, so
+    memory grows with the number of terms listed rather than with the vocabulary size.
+    """
+
+    __slots__ = ("_ids", "_terms", "_term_ids", "_offsets")
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._term_ids = array("I")
+        self._offsets = array("I", [0])
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def append(self, terms: Iterable[str]) -> None:
+        ids = set()
+        for term in terms:
+            key = term.strip().casefold()
+            index = self._ids.get(key)
+            if index is None:
+                index = self._ids[key] = len(self._terms)
+                self._terms.append(term)
+            ids.add(index)
+        self._term_ids.extend(sorted(ids))
+        self._offsets.append(len(self._term_ids))
+
+    def ids(self, position: int) -> Sequence[int]:
+        return self._term_ids[self._offsets[position]:self._offsets[position + 1]]
+
+    def terms(self, ids: Iterable[int]) -> List[str]:
+        return [self._terms[index] for index in ids]
+
+    def compare(self, ids: List[str], positions: Sequence[int]) -> SetComparison:
+        """Terms all the services share, and those only one of them has, in vocabulary order"""
+        # Only the compared services' terms are counted, so this is linear in their total
+        counts: Dict[int, int] = {}
+        term_ids = [self.ids(position) for position in positions]
+        for service_ids in term_ids:
+            for index in service_ids:
+                counts[index] = counts.get(index, 0) + 1
+        return SetComparison(
+            shared=self.terms(index for index in term_ids[0] if counts[index] == len(positions)) if term_ids else [],
+            unique={
+                service_id: self.terms(index for index in service_ids if counts[index] == 1)
+                for service_id, service_ids in zip(ids, term_ids)
+            },
+        )
+
+
+class ComparisonIndex:
+    """Per-snapshot term ids of features and limitations, and pricing model bitsets, for fast comparisons"""
+
+    __slots__ = ("_features", "_limitations", "_pricing_masks")
+
+    def __init__(self, services: Sequence[AWSService]):
+        self._features = TermLists()
+        self._limitations = TermLists()
+        for service in services:
+            self._features.append(service.key_features)
+            self._limitations.append(service.limitations or ())
+        # One byte per service while there are at most eight pricing models
+        self._pricing_masks = bytes(pricing_mask(service.pricing_models) for service in services)
+
+    def compare(self, services: Sequence[AWSService], positions: Sequence[int]) -> ComparisonMatrix:
+        """Comparison matrix for the services at the given catalog positions"""
+        ids = [service.id for service in services]
+        pricing_masks = [self._pricing_masks[position] for position in positions]
+        common_pricing = common_mask(pricing_masks)
+        union_pricing = 0
+        for mask in pricing_masks:
+            union_pricing |= mask
+
+        free_tier = {service.id: service.free_tier_available for service in services}
+        region_availability = {service.id: service.region_availability for service in services}
+
+        return ComparisonMatrix(
+            key_features=self._features.compare(ids, positions),
+            limitations=self._limitations.compare(ids, positions),
+            pricing_models=PricingComparison(
+                bits=dict(zip(ids, pricing_masks)),
+                common_bits=common_pricing,
+                union_bits=union_pricing,
+                common=pricing_models_from_mask(common_pricing),
+                differences={
+                    service_id: pricing_models_from_mask(mask & ~common_pricing)
+                    for service_id, mask in zip(ids, pricing_masks)
+                },
+            ),
+            free_tier=free_tier,
+            free_tier_differs=len(set(free_tier.values())) > 1,
+            region_availability=region_availability,
+            region_availability_differs=len(set(region_availability.values())) > 1,
+        )
@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from models import AWSService, UsageScenario
+
+# Billed usage dimensions, in the column order of every array below
+DIMENSIONS = ("requests", "gb_months", "hours")
+
+# Upper bound on scenarios per /api/estimate call
+MAX_SCENARIOS = 10000
+
+# Upper bound on scenario x service cells per /api/estimate call; the cost matrix alone is
+# 8 bytes a cell, and its JSON several times that
+MAX_ESTIMATE_CELLS = 1 << 22
+
+# Scenario x service x dimension cells evaluated per block, bounding temporary arrays to ~8MB
+BLOCK_CELLS = 1 << 20
+
+
+def usage_matrix(scenarios: Iterable[UsageScenario]) -> np.ndarray:
+    """Scenarios as rows of monthly usage, one column per dimension"""
+    return np.array(
+        [[scenario.requests, scenario.gb_months, scenario.hours] for scenario in scenarios],
+        dtype=np.float64,
+    ).reshape(-1, len(DIMENSIONS))
+
+
+class PricingTable:
+    """Rates and free allowances of every priced service as (services x dimensions) arrays
+
+    Services whose rates are all zero (free, or not metered on any dimension) can still be
+    estimated by id, but are left out of the default candidates: they would otherwise
+    come out cheapest for every scenario.
+    """
+
+    __slots__ = ("positions", "_rows", "_default_rows", "_rates", "_allowances")
+
+    def __init__(self, services: Sequence[AWSService]):
+        priced = [(position, service.pricing) for position, service in enumerate(services) if service.pricing is not None]
+        self._rows: Dict[int, int] = {position: row for row, (position, _) in enumerate(priced)}
+        self._rates = np.array(
+            [[pricing.per_request, pricing.per_gb_month, pricing.per_hour] for _, pricing in priced],
+            dtype=np.float64,
+        ).reshape(-1, len(DIMENSIONS))
+        self._allowances = np.array(
+            [[pricing.free_requests_per_month, pricing.free_gb_months_per_month, pricing.free_hours_per_month] for _, pricing in priced],
+            dtype=np.float64,
+        ).reshape(-1, len(DIMENSIONS))
+        self._default_rows = np.flatnonzero((self._rates > 0).any(axis=1))
+        # Default candidates, every metered service in catalog order
+        self.positions: Tuple[int, ...] = tuple(priced[row][0] for row in self._default_rows.tolist())
+
+    def __contains__(self, position: object) -> bool:
+        return position in self._rows
+
+    def estimate(self, usage: np.ndarray, positions: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Monthly cost of each usage row (scenario) on each service, and the cheapest column per row
+
+        Costs come as a scenarios x services array. Usage beyond each free allowance is
+        billed at the service's rate, summed over the dimensions. Every (scenario,
+        service) pair is evaluated with array math, in blocks of scenarios so the
+        broadcast intermediates stay small.
+
+        A service only competes for cheapest on a scenario if it bills at least one of the
+        dimensions the scenario uses; one that bills none of them would cost nothing
+        without offering what was asked for. Rows with no such service get -1.
+        """
+        rows = self._default_rows if positions is None else [self._rows[position] for position in positions]
+        rates, allowances = self._rates[rows], self._allowances[rows]
+        metered = (rates > 0).T.astype(np.float64)
+
+        costs = np.empty((len(usage), len(rates)), dtype=np.float64)
+        cheapest_columns = np.full(len(usage), -1, dtype=np.int64)
+        block = max(1, BLOCK_CELLS // max(1, len(rates) * len(DIMENSIONS)))
+        for start in range(0, len(usage), block):
+            block_usage = usage[start:start + block]
+            billable = block_usage[:, None, :] - allowances[None, :, :]
+            np.maximum(billable, 0.0, out=billable)
+            block_costs = costs[start:start + block]
+            np.einsum("svd,vd->sv", billable, rates, out=block_costs)
+            if len(rates):
+                billed = (block_usage > 0).astype(np.float64) @ metered > 0
+                columns = np.where(billed, block_costs, np.inf).argmin(axis=1)
+                cheapest_columns[start:start + block] = np.where(billed.any(axis=1), columns, -1)
+        return costs, cheapest_columns
+
+
+def cheapest(columns: np.ndarray, service_ids: List[str]) -> List[Optional[str]]:
+    """Id of the lowest-cost competing service for each scenario row, see PricingTable.estimate"""
+    return [service_ids[column] if column >= 0 else None for column in columns.tolist()]
@@ -1,27 +1,91 @@
 from http.server import BaseHTTPRequestHandler
 import json
+import os
+import sys
 
-# Sample services count
-SERVICES_COUNT = 8  # EC2, S3, Lambda, RDS, CloudFront, SNS, DynamoDB, SageMaker
+# Serverless functions are loaded by path, so make sibling modules importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cache import CACHE_CONTROL, content_hash, etag_matches
+from columnar import COLUMNS_PATH, file_state, open_columns
+from compression import EncodedBody, negotiate_encoding, variant_etag
+
+# Same catalog file the services endpoint serves (JSON array, or JSONL with one service per line)
+CATALOG_PATH = os.environ.get(
+    'CATALOG_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog.json')
+)
+
+def catalog_file_state(path):
+    try:
+        return file_state(path)
+    except OSError:
+        return None
+
+class HealthResponse:
+    """Encoded health body for one version of the catalog file"""
+    
+    def __init__(self, path):
+        self.file_state = catalog_file_state(path)
+        # The count is in the columns file header, so the catalog itself is never parsed
+        columns = open_columns(path, COLUMNS_PATH)
+        services_count = len(columns)
+        columns.close()
+        self.body = EncodedBody(json.dumps({
+            'status': 'healthy',
+            'services_count': services_count
+        }).encode())
+        self.etag = f'"{content_hash(self.body.identity)[:32]}"'
+
+RESPONSE = HealthResponse(CATALOG_PATH)
+
+def get_response():
+    """Body for the current catalog file, re-encoded only when the file changes"""
+    global RESPONSE
+    response = RESPONSE
+    file_state = catalog_file_state(CATALOG_PATH)
+    if file_state is not None and file_state != response.file_state:
+        try:
+            response = RESPONSE = HealthResponse(CATALOG_PATH)
+        except (OSError, ValueError) as e:
+            # Keep reporting the last good count; remember the bad file so it is not re-read each request
+            print(f"Error reloading catalog: {e}")
+            response.file_state = file_state
+    return response
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         try:
-            response_data = {
-                'status': 'healthy',
-                'services_count': SERVICES_COUNT
-            }
+            response = get_response()
+            encoding = negotiate_encoding(self.headers.get('Accept-Encoding'))
+            etag = variant_etag(response.etag, response.body.applied_encoding(encoding))
+            if etag_matches(self.headers.get('If-None-Match'), etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', CACHE_CONTROL)
+                self.send_header('Vary', 'Accept-Encoding')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                return
+            
+            body, applied_encoding = response.body.variant(encoding)
             
             # Set CORS headers
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
+            if applied_encoding:
+                self.send_header('Content-Encoding', applied_encoding)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', CACHE_CONTROL)
+            self.send_header('Vary', 'Accept-Encoding')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
             self.end_headers()
             
             # Send JSON response
-            self.wfile.write(json.dumps(response_data).encode())
+            self.wfile.write(body)
             
         except Exception as e:
             print(f"Error in health endpoint: {e}")
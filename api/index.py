@@ -2,7 +2,9 @@ from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
 from models import AWSService, ServiceCategory, ServicesResponse
-from data import get_all_services, get_service_by_id, get_services_by_category, get_all_categories
+# Importing data loads catalog.snapshot, written by the buildCommand in the root vercel.json,
+# instead of validating catalog.json and building every index on this cold start
+from data import CATALOG_STORE, get_all_categories, get_catalog
 
 app = FastAPI()
 
@@ -34,24 +36,18 @@ async def get_services(
     free_tier: Optional[bool] = Query(None),
     search: Optional[str] = Query(None)
 ):
-    services = get_all_services()
-    
+    category_enum = None
     if category:
         try:
             category_enum = ServiceCategory(category)
-            services = [s for s in services if s.category == category_enum]
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid category: {category}")
     
-    if free_tier is not None:
-        services = [s for s in services if s.free_tier_available == free_tier]
-    
+    catalog = get_catalog()
     if search:
-        search_lower = search.lower()
-        services = [
-            s for s in services 
-            if search_lower in s.name.lower() or search_lower in s.description.lower()
-        ]
+        services = catalog.search(search, category=category_enum, free_tier=free_tier)
+    else:
+        services = catalog.filter(category=category_enum, free_tier=free_tier)
     
     return {
         "services": services,
@@ -65,7 +61,7 @@ async def get_categories():
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "services_count": len(get_all_services())}
+    return {"status": "healthy", "services_count": len(get_catalog()), "catalog_from_snapshot": CATALOG_STORE.from_snapshot}
 
 @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def catch_all(request: Request, path: str):
@@ -1,13 +1,40 @@
-from fastapi import FastAPI, HTTPException, Query
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
-from models import AWSService, ServiceCategory, ServicesResponse, CategoryResponse
-from data import get_all_services, get_service_by_id, get_services_by_category, get_all_categories
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import AsyncIterator, Callable, Hashable, List, Optional, Tuple, TypeVar
+from models import AWSService, SearchMode, SortField, SortOrder, ServiceCategory, ServicesResponse, CategoryResponse, CompareRequest, ComparisonResponse, FacetsResponse, SimilarServicesResponse, EstimateRequest, EstimateResponse, BatchRequest, BatchServicesResponse
+from data import CATALOG_STORE, get_all_categories, get_catalog
+from catalog import ServiceCatalog
+from cache import CACHE_CONTROL, ResponseCache, etag_matches, make_etag
+from compression import EncodedBody, gzip_stream, negotiate_encoding, variant_etag
+from search import normalize_query
+from fuzzy import normalize_fuzzy_query
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, LoopLagMonitor, MetricsMiddleware, MetricsRegistry
+from timing import ServerTimingMiddleware, phase
+from singleflight import SingleFlight
+from offload import OFFLOAD_COST, PoolSaturated, PoolTimeout, WorkerPool
+from serialization import batch_response, comparison_response as encode_comparison_response, dumps, json_array, services_response, similar_services_response
+from similarity import MAX_SIMILAR
+from estimate import MAX_ESTIMATE_CELLS, MAX_SCENARIOS, cheapest, usage_matrix
+from pagination import MAX_PAGE_SIZE, InvalidCursor, InvalidFields, decode_cursor, encode_cursor, page_bounds, parse_fields
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Poll the catalog file and publish new snapshots while the server runs
+    CATALOG_STORE.start_watching()
+    LOOP_LAG.start()
+    yield
+    await LOOP_LAG.stop()
+    WORKER_POOL.shutdown()
+    CATALOG_STORE.stop_watching()
 
 app = FastAPI(
     title="AWS Service Comparison API",
     description="API for comparing AWS services with detailed information about categories, features, and pricing",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -23,6 +50,148 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Encoded list responses, keyed by normalized query and dropped on catalog version change.
+# The byte budget matters more than the entry count: an unpaginated listing of a large
+# catalog is megabytes per search term, before its compressed variants
+RESPONSE_CACHE = ResponseCache(maxsize=256, max_bytes=64 * 1024 * 1024)
+
+# Cache misses being encoded right now, joined by identical requests that arrive meanwhile
+SINGLE_FLIGHT = SingleFlight()
+
+# Runs queries whose estimated cost reaches OFFLOAD_COST, keeping the event loop responsive
+WORKER_POOL = WorkerPool()
+
+# Measures how late the loop wakes up relative to its schedule, sampled by a background task
+LOOP_LAG = LoopLagMonitor()
+
+# Per-route request metrics, exposed at /metrics
+METRICS = MetricsRegistry()
+METRICS.register_callback("catalog_version", "Version of the catalog snapshot being served.", lambda: get_catalog().version)
+METRICS.register_callback("catalog_services", "Services in the current catalog snapshot.", lambda: len(get_catalog()))
+METRICS.register_callback("response_cache_hits_total", "Response cache hits.", lambda: RESPONSE_CACHE.hits, metric_type="counter")
+METRICS.register_callback("response_cache_misses_total", "Response cache misses.", lambda: RESPONSE_CACHE.misses, metric_type="counter")
+METRICS.register_callback("response_cache_entries", "Encoded responses held in the response cache.", lambda: len(RESPONSE_CACHE))
+METRICS.register_callback("response_cache_bytes", "Bytes of encoded responses and their compressed variants in the response cache.", lambda: RESPONSE_CACHE.nbytes)
+METRICS.register_callback("response_cache_hit_ratio", "Response cache hits over all lookups.", lambda: RESPONSE_CACHE.stats()["hit_ratio"])
+METRICS.register_callback("single_flight_leaders_total", "Response encodes started on a cache miss.", lambda: SINGLE_FLIGHT.leaders, metric_type="counter")
+METRICS.register_callback("single_flight_coalesced_total", "Requests that waited for an identical in-flight encode instead of repeating it.", lambda: SINGLE_FLIGHT.coalesced, metric_type="counter")
+METRICS.register_callback(
+    "single_flight_coalesced_by_route_total",
+    "Coalesced requests by cache key kind.",
+    lambda: {(("kind", kind),): count for kind, count in SINGLE_FLIGHT.coalesced_by_kind().items()},
+    metric_type="counter",
+)
+METRICS.register_callback("single_flight_in_flight", "Response encodes currently in flight.", lambda: len(SINGLE_FLIGHT))
+METRICS.register_callback("offload_running", "Offloaded queries running on the worker pool.", lambda: WORKER_POOL.stats()["running"])
+METRICS.register_callback("offload_queued", "Offloaded queries waiting for a worker.", lambda: WORKER_POOL.stats()["queued"])
+METRICS.register_callback("offload_completed_total", "Offloaded queries finished by the worker pool.", lambda: WORKER_POOL.completed, metric_type="counter")
+METRICS.register_callback("offload_rejected_total", "Queries refused with 503 because the worker pool queue was full.", lambda: WORKER_POOL.rejected, metric_type="counter")
+METRICS.register_callback("offload_timeouts_total", "Offloaded queries that exceeded the pool timeout.", lambda: WORKER_POOL.timeouts, metric_type="counter")
+METRICS.register_callback("event_loop_lag_seconds", "Delay of the latest event loop wake-up probe.", lambda: LOOP_LAG.lag)
+METRICS.register_callback("event_loop_lag_max_seconds", "Largest event loop wake-up delay over the last minute.", lambda: LOOP_LAG.max_lag)
+
+def route_paths():
+    return {route.endpoint: route.path for route in app.routes if hasattr(route, "endpoint")}
+
+app.add_middleware(MetricsMiddleware, registry=METRICS, route_paths=route_paths)
+
+# Per-phase Server-Timing header and timing log lines, enabled with SERVER_TIMING=1
+app.add_middleware(ServerTimingMiddleware)
+
+# Records per chunk written by the NDJSON export stream
+EXPORT_CHUNK_SIZE = 256
+
+T = TypeVar("T")
+
+async def run_query(cost: int, func: Callable[..., T], *args) -> T:
+    """Run func inline when its estimated cost is low, otherwise on the worker pool
+
+    Indexed lookups finish faster than a thread hand-off, so only searches and large
+    listings leave the event loop. A full pool or a query over its timeout answers 503.
+    """
+    if cost < OFFLOAD_COST:
+        return func(*args)
+    try:
+        return await WORKER_POOL.run(func, *args)
+    except PoolSaturated:
+        raise HTTPException(status_code=503, detail="Too many expensive queries in progress, retry shortly", headers={"Retry-After": "1"})
+    except PoolTimeout:
+        raise HTTPException(status_code=503, detail="Query took too long, retry shortly", headers={"Retry-After": "1"})
+
+async def cached_json_response(
+    request: Request,
+    catalog: ServiceCatalog,
+    cache_key: Hashable,
+    encode: Callable[[ServiceCatalog], bytes],
+    cost: int = 0
+) -> Response:
+    """Serve pre-encoded, precompressed JSON for cache_key, answering 304 when the client's ETag still matches
+
+    catalog is the snapshot the route already validated its input against; cost is the
+    estimated number of services encode touches, see run_query.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    with phase("cache"):
+        cached = RESPONSE_CACHE.get(catalog.version, cache_key)
+    if cached is None:
+        def encode_body(catalog: ServiceCatalog) -> EncodedBody:
+            body = EncodedBody(encode(catalog))
+            if cost >= OFFLOAD_COST:
+                # Compressing a large body takes as long as encoding it, so it happens
+                # on the worker thread too rather than back on the event loop
+                with phase("compress"):
+                    body.variant(encoding)
+            return body
+        
+        async def compute() -> EncodedBody:
+            # A flight for this key may have landed since the lookup above
+            body = RESPONSE_CACHE.peek(catalog.version, cache_key)
+            if body is None:
+                # Expensive queries leave the event loop, and identical requests arriving meanwhile join them
+                body = await run_query(cost, encode_body, catalog)
+                RESPONSE_CACHE.put(catalog.version, cache_key, body)
+            return body
+        
+        # Concurrent misses for the same key share the whole miss path, query, encode and
+        # cache fill, instead of each repeating it
+        cached = await SINGLE_FLIGHT.run(catalog.version, cache_key, compute)
+    
+    # The ETag names the coding actually sent, which for a small body is identity whatever
+    # the client accepts, so it is only known once the body is
+    headers = {
+        "ETag": variant_etag(make_etag(catalog.fingerprint, cache_key), cached.applied_encoding(encoding)),
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    if not cached.has_variant(encoding):
+        # A cached large body asked for in a coding it was not compressed in yet
+        await run_query(cost, cached.variant, encoding)
+    with phase("compress"):
+        body, applied_encoding = cached.variant(encoding)
+    if applied_encoding:
+        headers["Content-Encoding"] = applied_encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def parse_category(category: Optional[str]) -> Optional[ServiceCategory]:
+    """The category filter as an enum, or 400 for an unknown one"""
+    if not category:
+        return None
+    try:
+        return ServiceCategory(category)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid category: {category}")
+
+def search_cache_key(search: Optional[str], search_mode: SearchMode) -> Optional[tuple]:
+    """Queries that return the same results share a key; fuzzy queries keep their word order"""
+    if not search:
+        return None
+    if search_mode == SearchMode.FUZZY:
+        return (search_mode, normalize_fuzzy_query(search))
+    return (search_mode, normalize_query(search))
+
 @app.get("/")
 async def root():
     return {
@@ -31,105 +200,364 @@ async def root():
         "endpoints": {
             "/api/services": "Get all AWS services",
             "/api/services/{service_id}": "Get specific service details",
+            "/api/services/export": "Stream services as NDJSON",
+            "/api/services/batch": "Get many services by id in one request",
+            "/api/services/{service_id}/similar": "Get the services most similar to a service",
             "/api/categories": "Get all service categories",
-            "/api/services/category/{category}": "Get services by category"
+            "/api/services/category/{category}": "Get services by category",
+            "/api/facets": "Get category, pricing model and free tier counts for a filter",
+            "/api/estimate": "Estimate monthly costs of usage scenarios across services",
+            "/metrics": "Prometheus metrics"
         }
     }
 
 @app.get("/api/services", response_model=ServicesResponse)
 async def get_services(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category"),
     free_tier: Optional[bool] = Query(None, description="Filter by free tier availability"),
-    search: Optional[str] = Query(None, description="Search in service names and descriptions")
+    search: Optional[str] = Query(None, description="Search in service names, descriptions, features and use cases"),
+    search_mode: SearchMode = Query(SearchMode.TEXT, description="text matches words, prefixes and, when no word starts with a term, parts of words; fuzzy tolerates typos in ids, names and key features"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of services per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated service fields to return; id is always included"),
+    sort: Optional[SortField] = Query(None, description="Sort by name, category, number of features, free tier first, or search relevance"),
+    order: Optional[SortOrder] = Query(None, description="asc or desc; defaults to desc for relevance and asc otherwise")
 ):
-    """Get all AWS services with optional filtering"""
-    services = get_all_services()
-    
-    # Apply category filter
-    if category:
+    """Get all AWS services with optional filtering, sorting, pagination and field projection"""
+    catalog = get_catalog()
+    with phase("validate"):
+        category_enum = parse_category(category)
+        # Relevance only orders searches; listings without one keep catalog order
+        if sort == SortField.RELEVANCE and not search:
+            sort = None
+        descending = order == SortOrder.DESC if order is not None else sort == SortField.RELEVANCE
         try:
-            category_enum = ServiceCategory(category)
-            services = [s for s in services if s.category == category_enum]
-        except ValueError:
-            raise HTTPException(status_code=400, detail=f"Invalid category: {category}")
-    
-    # Apply free tier filter
-    if free_tier is not None:
-        services = [s for s in services if s.free_tier_available == free_tier]
-    
-    # Apply search filter
-    if search:
-        search_lower = search.lower()
-        services = [
-            s for s in services 
-            if search_lower in s.name.lower() or search_lower in s.description.lower()
-        ]
-    
-    return ServicesResponse(
-        services=services,
-        total_count=len(services),
-        categories=get_all_categories()
+            projection = parse_fields(fields, AWSService.model_fields)
+            offset = decode_cursor(cursor, catalog.fingerprint) if cursor else 0
+        except (InvalidFields, InvalidCursor) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    def encode(catalog: ServiceCatalog) -> bytes:
+        # Apply filters through the catalog indexes; searches come back ranked by relevance
+        # unless sorted otherwise. Only the requested page is materialized (and, for sorted
+        # listings, looked up), total_count comes from the index.
+        with phase("filter"):
+            positions = catalog.query_positions(
+                search, category=category_enum, free_tier=free_tier, search_mode=search_mode, sort=sort, descending=descending
+            )
+            total_count = len(positions)
+            end, next_offset = page_bounds(total_count, offset, limit)
+            page = positions[offset:end]
+        next_cursor = encode_cursor(next_offset, catalog.fingerprint) if next_offset is not None else None
+        
+        # The snapshot was validated when it was loaded, so full records are served from
+        # their pre-encoded fragments without going back through ServicesResponse
+        if projection is None:
+            with phase("serialize"):
+                return services_response(catalog.fragments(page), total_count, get_all_categories(), next_cursor)
+        
+        # Projected records are partial services, so they bypass the response model
+        with phase("serialize"):
+            return dumps({
+                "services": [s.model_dump(mode="json", include=set(projection)) for s in catalog.materialize(page)],
+                "total_count": total_count,
+                "categories": get_all_categories(),
+                "next_cursor": next_cursor
+            })
+    
+    cache_key = (
+        "services",
+        category_enum,
+        free_tier,
+        search_cache_key(search, search_mode),
+        limit,
+        offset,
+        projection,
+        (sort, descending) if sort is not None else None
     )
+    cost = catalog.query_cost(search, category=category_enum, free_tier=free_tier, limit=limit, sort=sort)
+    return await cached_json_response(request, catalog, cache_key, encode, cost)
+
+@app.get("/api/services/export")
+async def export_services(
+    request: Request,
+    category: Optional[str] = Query(None, description="Filter by category"),
+    free_tier: Optional[bool] = Query(None, description="Filter by free tier availability"),
+    search: Optional[str] = Query(None, description="Search in service names, descriptions, features and use cases"),
+    search_mode: SearchMode = Query(SearchMode.TEXT, description="text matches words, prefixes and, when no word starts with a term, parts of words; fuzzy tolerates typos in ids, names and key features")
+):
+    """Stream matching services as NDJSON, one service per line, gzipped if the client accepts it"""
+    with phase("validate"):
+        category_enum = parse_category(category)
+    
+    # Pin one snapshot for the whole stream so a reload mid-export cannot mix catalogs
+    catalog = get_catalog()
+    positions = await run_query(
+        catalog.query_cost(search, category=category_enum, free_tier=free_tier),
+        lambda: catalog.query_positions(search, category=category_enum, free_tier=free_tier, search_mode=search_mode)
+    )
+    
+    async def ndjson_lines() -> AsyncIterator[bytes]:
+        for start in range(0, len(positions), EXPORT_CHUNK_SIZE):
+            fragments = catalog.fragments(positions[start:start + EXPORT_CHUNK_SIZE])
+            yield b"\n".join(fragments) + b"\n"
+    
+    headers = {"Vary": "Accept-Encoding"}
+    body = ndjson_lines()
+    # Streams are compressed on the fly, so stick to gzip, which is cheap enough per chunk
+    if negotiate_encoding(request.headers.get("accept-encoding"), supported=("gzip",)) == "gzip":
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_stream(body)
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+# Upper bound on ids per batch lookup
+MAX_BATCH_SERVICES = 100
+
+async def batch_services_response(request: Request, ids: List[str]) -> Response:
+    """Found services in request order plus the ids that matched nothing"""
+    with phase("validate"):
+        ids = list(dict.fromkeys(id.strip() for id in ids if id.strip()))
+        if len(ids) > MAX_BATCH_SERVICES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SERVICES} services can be fetched at once")
+    
+    def encode(catalog: ServiceCatalog) -> bytes:
+        with phase("filter"):
+            positions = [catalog.position_of(service_id) for service_id in ids]
+        with phase("serialize"):
+            return batch_response(
+                catalog.fragments(position for position in positions if position is not None),
+                [service_id for service_id, position in zip(ids, positions) if position is None]
+            )
+    
+    return await cached_json_response(request, get_catalog(), ("batch", tuple(ids)), encode, len(ids))
+
+@app.get("/api/services/batch", response_model=BatchServicesResponse)
+async def get_services_batch(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated service IDs")
+):
+    """Get many services by id; unknown ids are listed in missing instead of failing the call"""
+    return await batch_services_response(request, ids.split(","))
+
+@app.post("/api/services/batch", response_model=BatchServicesResponse)
+async def get_services_batch_bulk(request: Request, body: BatchRequest):
+    """Get services given as a JSON list, for id sets too large for a query string"""
+    return await batch_services_response(request, body.service_ids)
 
 @app.get("/api/services/{service_id}", response_model=AWSService)
-async def get_service(service_id: str):
+async def get_service(request: Request, service_id: str):
     """Get detailed information about a specific AWS service"""
-    service = get_service_by_id(service_id)
-    if not service:
+    catalog = get_catalog()
+    position = catalog.position_of(service_id)
+    if position is None:
         raise HTTPException(status_code=404, detail=f"Service not found: {service_id}")
-    return service
+    return await cached_json_response(
+        request,
+        catalog,
+        ("service", service_id),
+        lambda catalog: catalog.fragment(position)
+    )
+
+@app.get("/api/services/{service_id}/similar", response_model=SimilarServicesResponse)
+async def get_similar_services(
+    request: Request,
+    service_id: str,
+    k: int = Query(5, ge=1, le=MAX_SIMILAR, description="Number of similar services to return")
+):
+    """Services whose descriptions, key features and use cases are most like this one's"""
+    catalog = get_catalog()
+    position = catalog.position_of(service_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail=f"Service not found: {service_id}")
+    
+    # Neighbors come from the snapshot's precomputed TF-IDF similarity table
+    def encode(catalog: ServiceCatalog) -> bytes:
+        with phase("filter"):
+            neighbors = catalog.similar(position, k)
+        with phase("serialize"):
+            return similar_services_response(
+                service_id,
+                ((score, catalog.fragment(neighbor)) for neighbor, score in neighbors)
+            )
+    
+    return await cached_json_response(request, catalog, ("similar", service_id, k), encode, catalog.similar_cost(position))
 
 @app.get("/api/categories", response_model=CategoryResponse)
-async def get_categories():
+async def get_categories(request: Request):
     """Get all available service categories"""
-    return CategoryResponse(categories=get_all_categories())
+    return await cached_json_response(
+        request,
+        get_catalog(),
+        ("categories",),
+        lambda catalog: dumps({"categories": get_all_categories()})
+    )
 
 @app.get("/api/services/category/{category}", response_model=List[AWSService])
-async def get_services_by_cat(category: str):
+async def get_services_by_cat(request: Request, category: str):
     """Get all services in a specific category"""
-    try:
-        category_enum = ServiceCategory(category)
-        services = get_services_by_category(category_enum)
-        return services
-    except ValueError:
-        raise HTTPException(status_code=400, detail=f"Invalid category: {category}")
+    with phase("validate"):
+        category_enum = parse_category(category)
+    catalog = get_catalog()
+    return await cached_json_response(
+        request,
+        catalog,
+        ("category", category_enum),
+        lambda catalog: json_array(catalog.fragments(catalog.positions(category=category_enum))),
+        catalog.query_cost(category=category_enum)
+    )
 
-@app.get("/api/compare")
-async def compare_services(service_ids: str = Query(..., description="Comma-separated service IDs")):
+@app.get("/api/facets", response_model=FacetsResponse)
+async def get_facets(
+    request: Request,
+    category: Optional[str] = Query(None, description="Filter by category"),
+    free_tier: Optional[bool] = Query(None, description="Filter by free tier availability"),
+    search: Optional[str] = Query(None, description="Search in service names, descriptions, features and use cases"),
+    search_mode: SearchMode = Query(SearchMode.TEXT, description="text matches words, prefixes and, when no word starts with a term, parts of words; fuzzy tolerates typos in ids, names and key features")
+):
+    """Facet counts for the services matching the same filters as /api/services"""
+    with phase("validate"):
+        category_enum = parse_category(category)
+    
+    def encode(catalog: ServiceCatalog) -> bytes:
+        with phase("filter"):
+            facets = catalog.facets(search, category=category_enum, free_tier=free_tier, search_mode=search_mode)
+        with phase("serialize"):
+            return facets.model_dump_json().encode()
+    
+    # Counts are bitmap operations; only the search behind them is expensive
+    catalog = get_catalog()
+    cache_key = ("facets", category_enum, free_tier, search_cache_key(search, search_mode))
+    return await cached_json_response(request, catalog, cache_key, encode, catalog.query_cost(search) if search else 0)
+
+# Upper bound on services per comparison, mostly relevant to POST bodies
+MAX_COMPARE_SERVICES = 100
+
+COMPARISON_CRITERIA = [
+    "Category",
+    "Key Features",
+    "Pricing Models",
+    "Use Cases",
+    "Limitations",
+    "Free Tier Available",
+    "Region Availability"
+]
+
+async def comparison_response(request: Request, ids: List[str]) -> Response:
+    """Validate ids, then serve the (cached) comparison matrix for them"""
+    catalog = get_catalog()
+    with phase("validate"):
+        ids = list(dict.fromkeys(id.strip() for id in ids if id.strip()))
+        if len(ids) > MAX_COMPARE_SERVICES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_SERVICES} services can be compared at once")
+        positions = []
+        for service_id in ids:
+            position = catalog.position_of(service_id)
+            if position is None:
+                raise HTTPException(status_code=404, detail=f"Service not found: {service_id}")
+            positions.append(position)
+        if len(positions) < 2:
+            raise HTTPException(status_code=400, detail="At least 2 services are required for comparison")
+    
+    # Popular pairs are served from the response cache; the matrix is built from
+    # per-snapshot term ids, so a miss is linear in the terms of the services compared
+    def encode(catalog: ServiceCatalog) -> bytes:
+        with phase("compare"):
+            matrix = catalog.compare(positions)
+        with phase("serialize"):
+            return encode_comparison_response(
+                catalog.fragments(positions),
+                COMPARISON_CRITERIA,
+                len(positions),
+                matrix.model_dump_json().encode()
+            )
+    
+    return await cached_json_response(request, catalog, ("compare", tuple(ids)), encode, len(ids))
+
+@app.get("/api/compare", response_model=ComparisonResponse)
+async def compare_services(
+    request: Request,
+    service_ids: str = Query(..., description="Comma-separated service IDs")
+):
     """Compare multiple services side by side"""
-    ids = [id.strip() for id in service_ids.split(",")]
-    services = []
-    
-    for service_id in ids:
-        service = get_service_by_id(service_id)
-        if not service:
-            raise HTTPException(status_code=404, detail=f"Service not found: {service_id}")
-        services.append(service)
-    
-    if len(services) < 2:
-        raise HTTPException(status_code=400, detail="At least 2 services are required for comparison")
-    
-    # Extract comparison criteria
-    comparison_criteria = [
-        "Category",
-        "Key Features",
-        "Pricing Models",
-        "Use Cases",
-        "Limitations",
-        "Free Tier Available",
-        "Region Availability"
-    ]
+    return await comparison_response(request, service_ids.split(","))
+
+@app.post("/api/compare", response_model=ComparisonResponse)
+async def compare_services_bulk(request: Request, body: CompareRequest):
+    """Compare services given as a JSON list, for id sets too large for a query string"""
+    return await comparison_response(request, body.service_ids)
+
+@app.post("/api/estimate", response_model=EstimateResponse)
+async def estimate_costs(request: Request, body: EstimateRequest):
+    """Monthly cost of every usage scenario on every requested (by default, every metered) service"""
+    catalog = get_catalog()
+    with phase("validate"):
+        if not body.scenarios:
+            raise HTTPException(status_code=400, detail="At least 1 scenario is required")
+        if len(body.scenarios) > MAX_SCENARIOS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_SCENARIOS} scenarios can be estimated at once")
+        positions = None
+        if body.service_ids is not None:
+            # Leaving service_ids out is how to ask for every metered service
+            if not body.service_ids:
+                raise HTTPException(status_code=400, detail="At least 1 service id is required, or omit service_ids")
+            positions = []
+            for service_id in dict.fromkeys(body.service_ids):
+                position = catalog.position_of(service_id)
+                if position is None:
+                    raise HTTPException(status_code=404, detail=f"Service not found: {service_id}")
+                if not catalog.is_priced(position):
+                    raise HTTPException(status_code=400, detail=f"No pricing data for service: {service_id}")
+                positions.append(position)
+        # One cost cell per scenario and service, which bounds memory and decides offloading
+        cost = len(body.scenarios) * catalog.estimate_width(positions)
+        if cost > MAX_ESTIMATE_CELLS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_ESTIMATE_CELLS} scenario x service cells can be estimated at once, pass fewer scenarios or service_ids")
     
-    return {
-        "services": services,
-        "comparison_criteria": comparison_criteria,
-        "comparison_count": len(services)
-    }
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    
+    def encode(positions: Optional[List[int]]) -> Tuple[bytes, Optional[str]]:
+        # All scenarios are evaluated against all services in one vectorized pass
+        with phase("estimate"):
+            positions, costs, cheapest_columns = catalog.estimate(usage_matrix(body.scenarios), positions)
+        with phase("serialize"):
+            service_ids = [catalog.service_id(position) for position in positions]
+            content = dumps({
+                "service_ids": service_ids,
+                "scenario_count": len(body.scenarios),
+                "costs": costs.round(6).tolist(),
+                "cheapest": cheapest(cheapest_columns, service_ids)
+            })
+        with phase("compress"):
+            return EncodedBody(content).variant(encoding)
+    
+    content, applied_encoding = await run_query(cost, encode, positions)
+    headers = {"Vary": "Accept-Encoding"}
+    if applied_encoding:
+        headers["Content-Encoding"] = applied_encoding
+    return Response(content=content, media_type="application/json", headers=headers)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics"""
+    # Passed as a header so the charset already in it is not appended a second time
+    return PlainTextResponse(METRICS.render(), headers={"Content-Type": METRICS_CONTENT_TYPE})
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "services_count": len(get_all_services())}
+    return {
+        "status": "healthy",
+        # Tells apart the workers of a multi-process deployment
+        "pid": os.getpid(),
+        "services_count": len(get_catalog()),
+        "catalog_version": get_catalog().version,
+        "catalog_from_snapshot": CATALOG_STORE.from_snapshot,
+        "response_cache": RESPONSE_CACHE.stats(),
+        "single_flight": SINGLE_FLIGHT.stats(),
+        "offload": WORKER_POOL.stats(),
+        "event_loop_lag_ms": {"latest": LOOP_LAG.lag * 1000, "max": LOOP_LAG.max_lag * 1000}
+    }
 
 if __name__ == "__main__":
     import uvicorn
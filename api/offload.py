@@ -0,0 +1,103 @@
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Estimated cost, in services scored or serialized, from which a query leaves the event loop
+OFFLOAD_COST = int(os.environ.get("OFFLOAD_COST", "5000"))
+
+# Threads running offloaded queries
+OFFLOAD_WORKERS = int(os.environ.get("OFFLOAD_WORKERS", "4"))
+
+# Offloaded queries allowed to wait for a free thread; beyond that new ones are refused
+OFFLOAD_QUEUE_DEPTH = int(os.environ.get("OFFLOAD_QUEUE_DEPTH", "32"))
+
+# Seconds a request waits for its offloaded query before giving up on it
+OFFLOAD_TIMEOUT = float(os.environ.get("OFFLOAD_TIMEOUT", "10"))
+
+
+class PoolSaturated(Exception):
+    """Every worker is busy and the queue is full"""
+
+
+class PoolTimeout(Exception):
+    """An offloaded query did not finish within the pool's timeout"""
+
+
+class WorkerPool:
+    """Bounded thread pool for queries too expensive to run on the event loop
+
+    Threads rather than processes: queries read the in-memory catalog snapshot, which a
+    process pool would have to pickle for every call, and the heaviest steps (similarity
+    and estimate matrix math, compression) release the GIL. Pure-Python scoring still
+    shares the GIL with the loop, but the interpreter's switch interval keeps the loop
+    serving cheap requests in between.
+
+    A query that times out keeps its thread until it finishes, since threads cannot be
+    interrupted. It still counts toward the queue depth, so a burst of slow queries is
+    refused rather than piling up.
+    """
+
+    def __init__(self, workers: int = OFFLOAD_WORKERS, queue_depth: int = OFFLOAD_QUEUE_DEPTH, timeout: float = OFFLOAD_TIMEOUT):
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        # Created on first use, so a pre-forking master never forks with live threads, and
+        # again after shutdown, so the pool outlives the app lifespan that stopped it
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Submitted and not yet finished, running or queued
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """func(*args) on a worker thread, in the caller's context so Server-Timing phases still count"""
+        with self._lock:
+            if self.pending >= self.workers + self.queue_depth:
+                self.rejected += 1
+                raise PoolSaturated(f"{self.pending} queries already running or queued")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="offload")
+            self.pending += 1
+            future = self._executor.submit(contextvars.copy_context().run, func, *args)
+        future.add_done_callback(self._finished)
+        try:
+            # A timeout cancels the future, which only takes effect while it is still queued
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeout(f"Query did not finish within {self.timeout}s") from None
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            if not future.cancelled():
+                self.completed += 1
+
+    def shutdown(self) -> None:
+        """Stop the threads; the next run starts a fresh executor"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "running": min(self.pending, self.workers),
+                "queued": max(0, self.pending - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
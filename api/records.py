@@ -0,0 +1,124 @@
+from array import array
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+from models import AWSService, ServiceCategory, PricingModel, PricingDimensions
+
+# Categories by code; each service stores its category as one byte indexing this tuple
+CATEGORIES: Tuple[ServiceCategory, ...] = tuple(ServiceCategory)
+CATEGORY_CODES: Dict[ServiceCategory, int] = {category: code for code, category in enumerate(CATEGORIES)}
+
+# PricingDimensions fields, in the column order of ServiceRecords.pricing
+PRICING_FIELDS: Tuple[str, ...] = tuple(PricingDimensions.model_fields)
+
+
+class Interner:
+    """Hands out one shared instance per distinct value, so repeats cost a reference"""
+
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values: Dict[Hashable, Hashable] = {}
+
+    def __call__(self, value):
+        return self._values.setdefault(value, value)
+
+    def strings(self, values: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+        """Interned tuple of interned strings; identical lists share one tuple"""
+        if values is None:
+            return None
+        return self(tuple(self(value) for value in values))
+
+
+class ServiceRecords:
+    """The catalog's services as columns instead of one pydantic object per service
+
+    Strings are interned per snapshot, so a feature like "Auto Scaling" or a region like
+    "Most AWS regions" is stored once however many services list it, and identical lists
+    share one tuple. Categories are byte codes, free tier a byte flag, pricing dimensions
+    one flat float array. AWSService models are only built by record(), for the few
+    services a response actually needs as models.
+    """
+
+    __slots__ = (
+        "ids", "names", "descriptions", "categories", "key_features", "pricing_notes",
+        "pricing_models", "use_cases", "limitations", "free_tier", "region_availability",
+        "documentation_urls", "pricing", "priced",
+    )
+
+    def __init__(self, services: Iterable[AWSService]):
+        intern = Interner()
+        ids: List[str] = []
+        names: List[str] = []
+        descriptions: List[str] = []
+        categories = bytearray()
+        key_features: List[Tuple[str, ...]] = []
+        pricing_notes: List[str] = []
+        pricing_models: List[Tuple[PricingModel, ...]] = []
+        use_cases: List[Tuple[str, ...]] = []
+        limitations: List[Optional[Tuple[str, ...]]] = []
+        free_tier = bytearray()
+        region_availability: List[str] = []
+        documentation_urls: List[Optional[str]] = []
+        self.pricing = array("d")
+        priced = bytearray()
+
+        for service in services:
+            ids.append(service.id)
+            names.append(service.name)
+            descriptions.append(intern(service.description))
+            categories.append(CATEGORY_CODES[service.category])
+            key_features.append(intern.strings(service.key_features))
+            pricing_notes.append(intern(service.pricing_notes))
+            pricing_models.append(intern(tuple(service.pricing_models)))
+            use_cases.append(intern.strings(service.use_cases))
+            limitations.append(intern.strings(service.limitations))
+            free_tier.append(service.free_tier_available)
+            region_availability.append(intern(service.region_availability))
+            documentation_urls.append(service.documentation_url)
+            priced.append(service.pricing is not None)
+            pricing = service.pricing or PricingDimensions()
+            self.pricing.extend(getattr(pricing, field) for field in PRICING_FIELDS)
+
+        self.ids: Tuple[str, ...] = tuple(ids)
+        self.names: Tuple[str, ...] = tuple(names)
+        self.descriptions: Tuple[str, ...] = tuple(descriptions)
+        self.categories = bytes(categories)
+        self.key_features: Tuple[Tuple[str, ...], ...] = tuple(key_features)
+        self.pricing_notes: Tuple[str, ...] = tuple(pricing_notes)
+        self.pricing_models: Tuple[Tuple[PricingModel, ...], ...] = tuple(pricing_models)
+        self.use_cases: Tuple[Tuple[str, ...], ...] = tuple(use_cases)
+        self.limitations: Tuple[Optional[Tuple[str, ...]], ...] = tuple(limitations)
+        self.free_tier = bytes(free_tier)
+        self.region_availability: Tuple[str, ...] = tuple(region_availability)
+        self.documentation_urls: Tuple[Optional[str], ...] = tuple(documentation_urls)
+        self.priced = bytes(priced)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def category(self, position: int) -> ServiceCategory:
+        return CATEGORIES[self.categories[position]]
+
+    def pricing_dimensions(self, position: int) -> Optional[PricingDimensions]:
+        if not self.priced[position]:
+            return None
+        start = position * len(PRICING_FIELDS)
+        return PricingDimensions.model_construct(**dict(zip(PRICING_FIELDS, self.pricing[start:start + len(PRICING_FIELDS)])))
+
+    def record(self, position: int) -> AWSService:
+        """The service at position as a model; its values were validated when the snapshot was built"""
+        limitations = self.limitations[position]
+        return AWSService.model_construct(
+            id=self.ids[position],
+            name=self.names[position],
+            description=self.descriptions[position],
+            category=self.category(position),
+            key_features=list(self.key_features[position]),
+            pricing_notes=self.pricing_notes[position],
+            pricing_models=list(self.pricing_models[position]),
+            use_cases=list(self.use_cases[position]),
+            limitations=None if limitations is None else list(limitations),
+            free_tier_available=bool(self.free_tier[position]),
+            region_availability=self.region_availability[position],
+            documentation_url=self.documentation_urls[position],
+            pricing=self.pricing_dimensions(position),
+        )
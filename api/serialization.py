@@ -0,0 +1,62 @@
+import json
+from typing import Any, Iterable, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder produces the same compact JSON
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON, in the same layout pydantic's model_dump_json produces"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def json_array(fragments: Iterable[bytes]) -> bytes:
+    """JSON array of already encoded values"""
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def services_response(
+    fragments: Iterable[bytes],
+    total_count: int,
+    categories: Iterable[str],
+    next_cursor: Optional[str] = None,
+) -> bytes:
+    """ServicesResponse body assembled from pre-encoded services, skipping model validation"""
+    return b"".join((
+        b'{"services":', json_array(fragments),
+        b',"total_count":', dumps(total_count),
+        b',"categories":', dumps(list(categories)),
+        b',"next_cursor":', dumps(next_cursor),
+        b"}",
+    ))
+
+
+def comparison_response(
+    fragments: Iterable[bytes],
+    comparison_criteria: Iterable[str],
+    comparison_count: int,
+    matrix: bytes,
+) -> bytes:
+    """ComparisonResponse body from pre-encoded services and an encoded comparison matrix"""
+    return b"".join((
+        b'{"services":', json_array(fragments),
+        b',"comparison_criteria":', dumps(list(comparison_criteria)),
+        b',"comparison_count":', dumps(comparison_count),
+        b',"matrix":', matrix,
+        b"}",
+    ))
+
+
+def similar_services_response(service_id: str, neighbors: Iterable[Tuple[float, bytes]]) -> bytes:
+    """SimilarServicesResponse body from (score, pre-encoded service) pairs"""
+    similar = [b'{"score":' + dumps(score) + b',"service":' + fragment + b"}" for score, fragment in neighbors]
+    return b'{"service_id":' + dumps(service_id) + b',"similar":' + json_array(similar) + b"}"
+
+
+def batch_response(fragments: Iterable[bytes], missing: Iterable[str]) -> bytes:
+    """BatchServicesResponse body from pre-encoded services and the ids not found"""
+    return b'{"services":' + json_array(fragments) + b',"missing":' + dumps(list(missing)) + b"}"
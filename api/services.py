@@ -5,154 +5,123 @@ import sys
 import os
 from typing import Optional
 
-# Sample AWS services data
-SAMPLE_SERVICES = [
-    {
-        'id': 'ec2',
-        'name': 'Amazon EC2',
-        'category': 'Compute',
-        'description': 'Secure and resizable compute capacity in the cloud.',
-        'key_features': ['Virtual servers', 'Multiple instance types', 'Auto Scaling', 'Elastic Load Balancing'],
-        'pricing_models': ['On-Demand', 'Reserved Instances', 'Spot Instances'],
-        'use_cases': ['Web hosting', 'Application hosting', 'Development environments'],
-        'limitations': ['Requires OS management', 'Instance limits per region'],
-        'free_tier_available': True,
-        'region_availability': 'All AWS Regions'
-    },
-    {
-        'id': 's3',
-        'name': 'Amazon S3',
-        'category': 'Storage',
-        'description': 'Object storage service with industry-leading scalability.',
-        'key_features': ['Unlimited storage', 'High durability', 'Web interface', 'REST API'],
-        'pricing_models': ['Pay-as-you-go', 'Storage classes'],
-        'use_cases': ['Backup and restore', 'Data archiving', 'Static website hosting'],
-        'limitations': ['Regional service', 'Eventual consistency'],
-        'free_tier_available': True,
-        'region_availability': 'All AWS Regions'
-    },
-    {
-        'id': 'lambda',
-        'name': 'AWS Lambda',
-        'category': 'Compute',
-        'description': 'Run code without thinking about servers.',
-        'key_features': ['Serverless', 'Event-driven', 'Auto scaling', 'Multiple runtimes'],
-        'pricing_models': ['Pay per request', 'Pay per duration'],
-        'use_cases': ['API backends', 'Data processing', 'Real-time file processing'],
-        'limitations': ['15-minute execution limit', 'Cold start latency'],
-        'free_tier_available': True,
-        'region_availability': 'Most AWS Regions'
-    },
-    {
-        'id': 'rds',
-        'name': 'Amazon RDS',
-        'category': 'Database',
-        'description': 'Managed relational database service.',
-        'key_features': ['Automated backups', 'Multi-AZ deployment', 'Read replicas', 'Multiple engines'],
-        'pricing_models': ['On-Demand', 'Reserved Instances'],
-        'use_cases': ['Web applications', 'Online transaction processing', 'Data warehousing'],
-        'limitations': ['No shell access', 'Limited customization'],
-        'free_tier_available': True,
-        'region_availability': 'Most AWS Regions'
-    },
-    {
-        'id': 'cloudfront',
-        'name': 'Amazon CloudFront',
-        'category': 'Networking',
-        'description': 'Global content delivery network (CDN) service.',
-        'key_features': ['Global edge locations', 'DDoS protection', 'SSL/TLS', 'Real-time metrics'],
-        'pricing_models': ['Pay-as-you-go', 'Savings bundles'],
-        'use_cases': ['Website acceleration', 'Video streaming', 'API acceleration'],
-        'limitations': ['Cache invalidation costs', 'Geographic restrictions'],
-        'free_tier_available': True,
-        'region_availability': 'Global'
-    },
-    {
-        'id': 'sns',
-        'name': 'Amazon SNS',
-        'category': 'Messaging',
-        'description': 'Fully managed messaging service for both application-to-application and application-to-person communication.',
-        'key_features': ['Topic-based pub/sub', 'SMS and email', 'Mobile push', 'Message filtering'],
-        'pricing_models': ['Pay per message', 'No upfront costs'],
-        'use_cases': ['Mobile app notifications', 'System alerts', 'Email campaigns'],
-        'limitations': ['Message size limits', 'Regional service'],
-        'free_tier_available': True,
-        'region_availability': 'Most AWS Regions'
-    },
-    {
-        'id': 'dynamodb',
-        'name': 'Amazon DynamoDB',
-        'category': 'Database',
-        'description': 'Fast and flexible NoSQL database service.',
-        'key_features': ['Serverless', 'Auto scaling', 'Built-in security', 'Global tables'],
-        'pricing_models': ['On-demand', 'Provisioned capacity'],
-        'use_cases': ['Mobile backends', 'Web applications', 'Gaming', 'IoT'],
-        'limitations': ['Query limitations', 'Item size limits'],
-        'free_tier_available': True,
-        'region_availability': 'Most AWS Regions'
-    },
-    {
-        'id': 'sagemaker',
-        'name': 'Amazon SageMaker',
-        'category': 'Machine Learning',
-        'description': 'Fully managed service to build, train, and deploy machine learning models.',
-        'key_features': ['Built-in algorithms', 'Jupyter notebooks', 'Model training', 'Auto scaling'],
-        'pricing_models': ['Pay for compute time', 'Instance-based'],
-        'use_cases': ['Predictive analytics', 'Computer vision', 'Natural language processing'],
-        'limitations': ['Learning curve', 'Cost optimization needed'],
-        'free_tier_available': False,
-        'region_availability': 'Selected AWS Regions'
-    }
-]
+# Serverless functions are loaded by path, so make sibling modules importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-CATEGORIES = ['Compute', 'Storage', 'Database', 'Networking', 'Messaging', 'Machine Learning', 'Analytics', 'Security', 'Developer Tools']
+from cache import CACHE_CONTROL, ResponseCache, etag_matches, make_etag
+from category_values import CATEGORIES
+from columnar import COLUMNS_PATH, file_state, open_columns
+from compression import EncodedBody, negotiate_encoding, variant_etag
+from serialization import dumps
+
+# Same catalog file the FastAPI app serves (JSON array, or JSONL with one service per line)
+CATALOG_PATH = os.environ.get(
+    'CATALOG_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog.json')
+)
+
+class ServicesSnapshot:
+    """Mapped columnar catalog and fingerprint for one version of the catalog file"""
+    
+    def __init__(self, path, version):
+        self.file_state = catalog_file_state(path)
+        # Services stay in the mapped file as pre-encoded JSON with per-column filter
+        # bitmaps; the search index is built from it on the first search
+        self.columns = open_columns(path, COLUMNS_PATH)
+        self.version = version
+        # Content hash of the file, combined with the query into each response ETag
+        self.fingerprint = self.columns.fingerprint
+
+def catalog_file_state(path):
+    try:
+        return file_state(path)
+    except OSError:
+        return None
+
+SNAPSHOT = ServicesSnapshot(CATALOG_PATH, version=1)
+
+def get_snapshot():
+    """Current snapshot, rebuilt when the catalog file changes and published with one assignment"""
+    global SNAPSHOT
+    snapshot = SNAPSHOT
+    file_state = catalog_file_state(CATALOG_PATH)
+    if file_state is not None and file_state != snapshot.file_state:
+        try:
+            snapshot = SNAPSHOT = ServicesSnapshot(CATALOG_PATH, version=snapshot.version + 1)
+        except (OSError, ValueError) as e:
+            # Keep serving the last good snapshot; remember the bad file so it is not re-read each request
+            print(f"Error reloading catalog: {e}")
+            snapshot.file_state = file_state
+    return snapshot
+
+# Encoded and compressed bodies survive across invocations of a warm instance, within a
+# byte budget well under a function's memory limit
+RESPONSE_CACHE = ResponseCache(maxsize=64, max_bytes=32 * 1024 * 1024)
 
 class handler(BaseHTTPRequestHandler):
+    # Buffered, so the many small slices of a response go out in few sends; finish() flushes
+    wbufsize = 64 * 1024
+    
     def do_GET(self):
         try:
             # Parse URL and query parameters
             parsed_url = urlparse(self.path)
             query_params = parse_qs(parsed_url.query)
             
-            # Get services with optional filtering
-            services = SAMPLE_SERVICES.copy()
-            
-            # Apply category filter
             category = query_params.get('category', [None])[0]
-            if category:
-                services = [s for s in services if s['category'] == category]
-            
-            # Apply free tier filter
             free_tier_param = query_params.get('free_tier', [None])[0]
-            if free_tier_param is not None:
-                free_tier = free_tier_param.lower() == 'true'
-                services = [s for s in services if s['free_tier_available'] == free_tier]
-            
-            # Apply search filter
+            free_tier = None if free_tier_param is None else free_tier_param.lower() == 'true'
             search = query_params.get('search', [None])[0]
+            
+            snapshot = get_snapshot()
+            search_key = None
             if search:
-                search_lower = search.lower()
-                services = [
-                    s for s in services 
-                    if search_lower in s['name'].lower() or search_lower in s['description'].lower()
-                ]
+                # search pulls in numpy, so only requests that search pay for importing it
+                from search import normalize_query
+                search_key = normalize_query(search)
+            cache_key = (category or None, free_tier, search_key)
+            encoding = negotiate_encoding(self.headers.get('Accept-Encoding'))
             
-            response_data = {
-                'services': services,
-                'total_count': len(services),
-                'categories': CATEGORIES
-            }
+            etag = make_etag(snapshot.fingerprint, cache_key)
+            if encoding is None:
+                # Answer unchanged data with 304 before doing any filtering
+                if etag_matches(self.headers.get('If-None-Match'), etag):
+                    self.send_not_modified(etag)
+                    return
+                # Uncompressed bodies are written straight from the mapped file, never copied
+                chunks = self.encode_services(snapshot, category, free_tier, search)
+                applied_encoding = None
+            else:
+                # Compression needs the whole body, so compressed variants are kept instead
+                cached = RESPONSE_CACHE.get(snapshot.version, cache_key)
+                if cached is None:
+                    cached = EncodedBody(b''.join(self.encode_services(snapshot, category, free_tier, search)))
+                    RESPONSE_CACHE.put(snapshot.version, cache_key, cached)
+                # A body too small to compress is sent, and tagged, as identity
+                etag = variant_etag(etag, cached.applied_encoding(encoding))
+                if etag_matches(self.headers.get('If-None-Match'), etag):
+                    self.send_not_modified(etag)
+                    return
+                body, applied_encoding = cached.variant(encoding)
+                chunks = [body]
             
             # Set CORS headers
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
+            if applied_encoding:
+                self.send_header('Content-Encoding', applied_encoding)
+            self.send_header('Content-Length', str(sum(len(chunk) for chunk in chunks)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', CACHE_CONTROL)
+            self.send_header('Vary', 'Accept-Encoding')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
             self.end_headers()
             
             # Send JSON response
-            self.wfile.write(json.dumps(response_data).encode())
+            for chunk in chunks:
+                self.wfile.write(chunk)
             
         except Exception as e:
             print(f"Error in services endpoint: {e}")
@@ -170,6 +139,31 @@ class handler(BaseHTTPRequestHandler):
             }
             self.wfile.write(json.dumps(error_response).encode())
     
+    def query_services(self, snapshot, category, free_tier, search):
+        # Positions of services matching the filters, read from the mapped bitmaps;
+        # searches come back ranked by relevance
+        if search:
+            return snapshot.columns.search_positions(search, category or None, free_tier)
+        return snapshot.columns.positions(category or None, free_tier)
+    
+    def encode_services(self, snapshot, category, free_tier, search):
+        """Response body as chunks, the services among them slices of the mapped file"""
+        positions = self.query_services(snapshot, category, free_tier, search)
+        return [
+            b'{"services":', *snapshot.columns.json_array(positions),
+            b',"total_count":', dumps(len(positions)),
+            b',"categories":', dumps(CATEGORIES),
+            b'}'
+        ]
+    
+    def send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', CACHE_CONTROL)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+    
     def do_OPTIONS(self):
         # Handle CORS preflight requests
         self.send_response(200)
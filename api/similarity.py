@@ -0,0 +1,116 @@
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+from search import Document, concatenated_ranges, tokenize
+
+# Fields whose text describes what a service does
+SIMILARITY_FIELDS = ("description", "key_features", "use_cases")
+
+# Largest k served by /api/services/{service_id}/similar
+MAX_SIMILAR = 20
+
+# Terms in more than this fraction of services are left out of the vectors: their idf
+# weight is close to nothing, and their long postings would dominate every row's cost
+MAX_DOCUMENT_FRACTION = 0.5
+
+# Up to this many services the whole neighbor table is built with the snapshot;
+# above it, each service's row is computed on first request and then kept
+EAGER_NEIGHBORS_LIMIT = 5000
+
+
+def document_terms(document: Document) -> List[str]:
+    terms: List[str] = []
+    for field in SIMILARITY_FIELDS:
+        value = document.get(field) or ()
+        texts = (value,) if isinstance(value, str) else value
+        for text in texts:
+            terms.extend(tokenize(text))
+    return terms
+
+
+class SimilarityIndex:
+    """Sparse TF-IDF vectors of every service and a top-k cosine neighbor table
+
+    Each vector is L2-normalized and stored as its terms and weights (CSR rows), and the
+    same weights are kept per term (postings). A row's similarities to the whole catalog
+    only visit the postings of its own terms, so the work and memory follow the number
+    of term occurrences, never services times vocabulary. Neighbor lists hold up to
+    MAX_SIMILAR positions, best first, with their scores; services sharing no terms are
+    never neighbors.
+    """
+
+    __slots__ = ("_size", "_row_offsets", "_row_terms", "_row_weights", "_term_offsets", "_term_rows", "_term_weights", "_neighbors")
+
+    def __init__(self, documents: Iterable[Document]):
+        term_lists = [document_terms(document) for document in documents]
+        document_frequency: Dict[str, int] = {}
+        for terms in term_lists:
+            for term in set(terms):
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        size = self._size = len(term_lists)
+        vocabulary = sorted(term for term, count in document_frequency.items() if count <= MAX_DOCUMENT_FRACTION * size)
+        columns = {term: column for column, term in enumerate(vocabulary)}
+
+        idf = np.array([math.log((1 + size) / (1 + document_frequency[term])) + 1 for term in vocabulary], dtype=np.float32)
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, terms in enumerate(term_lists):
+            for term in terms:
+                column = columns.get(term)
+                if column is not None:
+                    rows.append(row)
+                    cols.append(column)
+        # Term counts per (row, term), in row-major order
+        cells, counts = np.unique(
+            np.array(rows, dtype=np.int64) * max(1, len(vocabulary)) + np.array(cols, dtype=np.int64), return_counts=True
+        )
+        rows_of_cells, terms_of_cells = np.divmod(cells, max(1, len(vocabulary)))
+        # Sublinear term frequency, so a word repeated across fields does not dominate
+        weights = (np.log1p(counts) * idf[terms_of_cells]).astype(np.float32)
+        norms = np.sqrt(np.bincount(rows_of_cells, weights=weights.astype(np.float64) ** 2, minlength=size))
+        weights /= norms[rows_of_cells].astype(np.float32)
+
+        self._row_offsets = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows_of_cells, minlength=size), out=self._row_offsets[1:])
+        self._row_terms = terms_of_cells.astype(np.int32)
+        self._row_weights = weights
+        by_term = np.argsort(terms_of_cells, kind="stable")
+        self._term_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms_of_cells, minlength=len(vocabulary)), out=self._term_offsets[1:])
+        self._term_rows = rows_of_cells[by_term].astype(np.int32)
+        self._term_weights = weights[by_term]
+
+        self._neighbors: Dict[int, Tuple[Tuple[int, float], ...]] = {}
+        if size <= EAGER_NEIGHBORS_LIMIT:
+            for row in range(size):
+                self._neighbors[row] = self._top_k(row, self._similarities(row))
+
+    def _similarities(self, row: int) -> np.ndarray:
+        """Cosine similarity of row to every service, from the postings of its terms"""
+        start, stop = self._row_offsets[row], self._row_offsets[row + 1]
+        terms = self._row_terms[start:stop]
+        starts, stops = self._term_offsets[terms], self._term_offsets[terms + 1]
+        entries = concatenated_ranges(starts, stops)
+        products = self._term_weights[entries] * np.repeat(self._row_weights[start:stop], stops - starts)
+        return np.bincount(self._term_rows[entries], weights=products, minlength=self._size)
+
+    def _top_k(self, row: int, scores: np.ndarray) -> Tuple[Tuple[int, float], ...]:
+        scores = scores.copy()
+        scores[row] = 0.0
+        count = min(MAX_SIMILAR, len(scores) - 1)
+        if count <= 0:
+            return ()
+        candidates = np.argpartition(-scores, count - 1)[:count]
+        ranked = sorted(candidates.tolist(), key=lambda position: (-scores[position], position))
+        return tuple((position, round(float(scores[position]), 4)) for position in ranked if scores[position] > 0)
+
+    def has_neighbors(self, position: int) -> bool:
+        """Whether position's neighbor row is already built, so a lookup is cheap"""
+        return position in self._neighbors
+
+    def neighbors(self, position: int, k: int) -> Sequence[Tuple[int, float]]:
+        """(position, cosine similarity) of the k services most similar to position"""
+        neighbors = self._neighbors.get(position)
+        if neighbors is None:
+            neighbors = self._neighbors[position] = self._top_k(position, self._similarities(position))
+        return neighbors[:k]
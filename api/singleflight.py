@@ -0,0 +1,88 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, Hashable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Keys whose coalesced-caller totals are kept for stats(); beyond it the smaller half is dropped
+MAX_TRACKED_KEYS = 256
+
+# Keys reported by stats(), most coalesced first
+TOP_KEYS = 10
+
+
+def key_kind(key: Hashable) -> str:
+    """Route part of a cache key, e.g. "services" for ("services", ...)"""
+    if isinstance(key, tuple) and key:
+        return str(key[0])
+    return str(key)
+
+
+def key_label(key: Hashable) -> str:
+    return json.dumps(key, default=str)
+
+
+class SingleFlight:
+    """Shares one in-flight computation between concurrent callers asking for the same key
+
+    The first caller for a (version, key) starts the computation as a task of its own;
+    callers arriving before it finishes wait on that task instead of starting another.
+    Each caller is shielded, so a client that disconnects cancels neither the shared
+    computation nor the other callers. Used from the event loop thread only.
+    """
+
+    def __init__(self, max_tracked_keys: int = MAX_TRACKED_KEYS):
+        self.max_tracked_keys = max_tracked_keys
+        # Computations started, and callers that joined one instead of computing
+        self.leaders = 0
+        self.coalesced = 0
+        self._tasks: Dict[Tuple[int, Hashable], "asyncio.Future"] = {}
+        # Callers currently waiting on each in-flight computation, besides its leader
+        self._waiters: Dict[Tuple[int, Hashable], int] = {}
+        # Coalesced callers per key over time, and per route kind for metrics
+        self._totals: Dict[Hashable, int] = {}
+        self._kinds: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def run(self, version: int, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        flight = (version, key)
+        task = self._tasks.get(flight)
+        if task is None:
+            self.leaders += 1
+            task = self._tasks[flight] = asyncio.ensure_future(compute())
+            self._waiters[flight] = 0
+            task.add_done_callback(lambda done: self._land(flight, done))
+        else:
+            self.coalesced += 1
+            self._waiters[flight] += 1
+            kind = key_kind(key)
+            self._kinds[kind] = self._kinds.get(kind, 0) + 1
+        return await asyncio.shield(task)
+
+    def _land(self, flight: Tuple[int, Hashable], task: "asyncio.Future") -> None:
+        del self._tasks[flight]
+        waiters = self._waiters.pop(flight)
+        if waiters:
+            key = flight[1]
+            self._totals[key] = self._totals.get(key, 0) + waiters
+            if len(self._totals) > self.max_tracked_keys:
+                ranked = sorted(self._totals.items(), key=lambda item: -item[1])
+                self._totals = dict(ranked[:self.max_tracked_keys // 2])
+        # Every caller may have gone; retrieving the exception keeps asyncio from logging it as lost
+        if not task.cancelled():
+            task.exception()
+
+    def coalesced_by_kind(self) -> Dict[str, int]:
+        return dict(self._kinds)
+
+    def stats(self) -> Dict[str, object]:
+        top: List[Tuple[Hashable, int]] = sorted(self._totals.items(), key=lambda item: -item[1])[:TOP_KEYS]
+        return {
+            "in_flight": len(self._tasks),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "waiters": {key_label(key): count for (_, key), count in self._waiters.items()},
+            "top_coalesced": [{"key": key_label(key), "coalesced": count} for key, count in top],
+        }
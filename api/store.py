@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+import threading
+from typing import List, Optional, Tuple
+from models import AWSService
+from catalog import ServiceCatalog
+from snapshot import read_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def load_services(path: str) -> List[AWSService]:
+    """Read and validate a catalog file: a JSON array, or one service per line for .jsonl"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = json.load(f)
+    return [AWSService.model_validate(record) for record in records]
+
+
+class CatalogStore:
+    """Holds the current catalog snapshot and publishes reloads with a single reference swap
+
+    Readers call current() once per request and keep using that snapshot, so a reload
+    never exposes a half-built catalog. Indexes for the new snapshot are built off to the
+    side (on the polling thread) before the swap.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 2.0, snapshot_path: Optional[str] = None):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._file_state = self._stat()
+
+        # A compiled snapshot of the same file skips validation and index builds at startup
+        catalog = read_snapshot(snapshot_path, path) if snapshot_path else None
+        # Reported by health checks, so a deployment that missed its build step shows up
+        self.from_snapshot = catalog is not None
+        if catalog is None:
+            catalog = ServiceCatalog(load_services(path), version=1)
+        self._snapshot = catalog
+
+    def current(self) -> ServiceCatalog:
+        return self._snapshot
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self) -> bool:
+        """Rebuild the snapshot from disk; on any error the current snapshot stays live"""
+        with self._reload_lock:
+            file_state = self._stat()
+            try:
+                services = load_services(self.path)
+                snapshot = ServiceCatalog(services, version=self._snapshot.version + 1)
+            except Exception as e:
+                logger.error("Catalog reload from %s failed, keeping version %s: %s", self.path, self._snapshot.version, e)
+                # Remember the broken file so it is not re-parsed on every poll
+                self._file_state = file_state
+                return False
+            self._file_state = file_state
+            self._snapshot = snapshot
+            logger.info("Catalog reloaded from %s: version %s, %s services", self.path, snapshot.version, len(snapshot))
+            return True
+
+    def reload_if_changed(self) -> bool:
+        file_state = self._stat()
+        if file_state is None or file_state == self._file_state:
+            return False
+        return self.reload()
+
+    def start_watching(self) -> None:
+        """Poll the catalog file's mtime and size on a daemon thread"""
+        if self.poll_interval <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher:
+            self._watcher.join(timeout=self.poll_interval + 1)
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            self.reload_if_changed()
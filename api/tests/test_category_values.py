@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from category_values import CATEGORIES
+from models import ServiceCategory
+
+
+def test_categories_match_the_model():
+    assert list(CATEGORIES) == [category.value for category in ServiceCategory]
+
+
+@pytest.mark.parametrize("module", ["categories", "health", "services"])
+def test_handlers_do_not_import_pydantic(module):
+    code = f"import sys, {module}; print('pydantic' in sys.modules)"
+    api = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=api, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
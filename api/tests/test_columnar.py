@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from columnar import ColumnarCatalog, write_columns
+
+SIZE = 25
+
+
+@pytest.fixture(scope="module")
+def catalog(tmp_path_factory):
+    services = [
+        {
+            "id": f"svc-{index}",
+            "name": f"Service {index}",
+            "category": ["Compute", "Storage", "Database"][index % 3],
+            "free_tier_available": index % 2 == 0,
+            # Non-ASCII text, so byte offsets and character offsets differ
+            "description": f"Déploiement {index} – ünïcode",
+        }
+        for index in range(SIZE)
+    ]
+    directory = tmp_path_factory.mktemp("columns")
+    source = directory / "catalog.json"
+    source.write_text(json.dumps(services), encoding="utf-8")
+    write_columns(str(source), str(directory / "catalog.columns"))
+    return services, ColumnarCatalog(str(directory / "catalog.columns"))
+
+
+def decode(chunks):
+    return json.loads(b"".join(bytes(chunk) for chunk in chunks))
+
+
+@pytest.mark.parametrize("limit", [1, 4, 7, SIZE, SIZE + 5])
+def test_range_pages(catalog, limit):
+    services, columns = catalog
+    for offset in range(0, SIZE, limit):
+        page = range(offset, min(offset + limit, SIZE))
+        chunks = columns.json_array(page)
+        # A contiguous page is a single slice of the mapped fragments
+        assert len(chunks) == 3
+        assert decode(chunks) == services[offset:offset + limit]
+
+
+def test_empty_pages(catalog):
+    _, columns = catalog
+    assert decode(columns.json_array(range(0))) == []
+    assert decode(columns.json_array(range(SIZE, SIZE))) == []
+    assert decode(columns.json_array([])) == []
+
+
+@pytest.mark.parametrize("positions, runs", [
+    ([0], 1),
+    ([SIZE - 1], 1),
+    ([0, 1, 2], 1),
+    # The last service has no trailing comma in the mapping
+    ([SIZE - 3, SIZE - 2, SIZE - 1], 1),
+    ([2, 3, 4, 7, 8, 9], 2),
+    ([0, 2, 4, 6], 4),
+    ([9, 8, 7], 3),
+    ([5, 6, 0, 1, SIZE - 1], 3),
+    ([3, 3], 2),
+])
+def test_runs_of_positions(catalog, positions, runs):
+    services, columns = catalog
+    chunks = columns.json_array(positions)
+    assert len(chunks) == runs + 2
+    assert decode(chunks) == [services[position] for position in positions]
+
+
+@pytest.mark.parametrize("limit", [2, 3, 5])
+def test_filtered_pages_split_runs_at_page_boundaries(catalog, limit):
+    services, columns = catalog
+    positions = columns.positions(free_tier=True)
+    assert list(positions) == list(range(0, SIZE, 2))
+    matching = [service for service in services if service["free_tier_available"]]
+    pages = [columns.json_array(positions[offset:offset + limit]) for offset in range(0, len(positions), limit)]
+    assert [service for page in pages for service in decode(page)] == matching
+
+    # Runs of neighbours cut by a page boundary come out whole on either side
+    neighbours = [1, 2, 3, 4, 5, 6, 7, 8, 20, 21, 22]
+    for offset in range(0, len(neighbours), limit):
+        page = neighbours[offset:offset + limit]
+        assert decode(columns.json_array(page)) == [services[position] for position in page]
+
+
+@pytest.mark.parametrize("module", ["columnar", "health", "services"])
+def test_cold_start_does_not_import_numpy(module):
+    # Only the first search builds the index, and only it should load numpy
+    code = f"import sys, {module}; print('numpy' in sys.modules)"
+    api = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=api, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
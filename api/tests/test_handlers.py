@@ -0,0 +1,144 @@
+import gzip
+import http.client
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HANDLERS = ("services", "categories", "health")
+PATHS = ["/api/services", "/api/categories", "/api/health"]
+
+
+@pytest.fixture(scope="module")
+def servers(tmp_path_factory):
+    """A server per handler module, over the bundled catalog with its columns file in a temporary directory"""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("CATALOG_PATH", os.path.join(API_DIR, "catalog.json"))
+        patch.setenv("CATALOG_COLUMNS_PATH", str(tmp_path_factory.mktemp("columns") / "catalog.columns"))
+        # The handlers read both paths when imported, so import them afresh
+        for name in ("columnar", *HANDLERS):
+            patch.delitem(sys.modules, name, raising=False)
+        modules = {name: importlib.import_module(name) for name in HANDLERS}
+        started = {}
+        for name, module in modules.items():
+            server = ThreadingHTTPServer(("127.0.0.1", 0), module.handler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            started[f"/api/{name}"] = server
+        yield modules, started
+        for server in started.values():
+            server.shutdown()
+            server.server_close()
+
+
+def get(servers, path, **headers):
+    """(status, headers, body) of a GET for path, routed to its handler's server"""
+    _, started = servers
+    server = started[path.partition("?")[0]]
+    connection = http.client.HTTPConnection(*server.server_address)
+    try:
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.headers, response.read()
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_validators_and_vary(servers, path):
+    status, headers, body = get(servers, path)
+    assert status == 200
+    assert headers["ETag"].startswith('"') and headers["ETag"].endswith('"')
+    assert headers["Vary"] == "Accept-Encoding"
+    assert "must-revalidate" in headers["Cache-Control"]
+    assert int(headers["Content-Length"]) == len(body)
+    json.loads(body)
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_matching_etag_answers_not_modified(servers, path):
+    _, headers, _ = get(servers, path)
+    etag = headers["ETag"]
+
+    status, revalidated, body = get(servers, path, **{"If-None-Match": etag})
+    assert status == 304
+    assert body == b""
+    assert revalidated["ETag"] == etag
+    assert revalidated["Vary"] == "Accept-Encoding"
+    assert get(servers, path, **{"If-None-Match": f'"stale", W/{etag}'})[0] == 304
+    assert get(servers, path, **{"If-None-Match": '"stale"'})[0] == 200
+
+
+def test_services_etags_follow_the_query(servers):
+    paths = ["/api/services", "/api/services?category=Database", "/api/services?free_tier=true", "/api/services?search=lambda"]
+    etags = [get(servers, path)[1]["ETag"] for path in paths]
+    assert len(set(etags)) == len(paths)
+    # Searches that normalize to the same terms are the same response
+    assert get(servers, "/api/services?search=LAMBDA")[1]["ETag"] == etags[-1]
+    status, _, _ = get(servers, "/api/services?category=Database", **{"If-None-Match": etags[0]})
+    assert status == 200
+
+
+def test_health_counts_the_catalog(servers):
+    with open(os.path.join(API_DIR, "catalog.json"), encoding="utf-8") as catalog:
+        services = json.load(catalog)
+    _, _, body = get(servers, "/api/health")
+    assert json.loads(body) == {"status": "healthy", "services_count": len(services)}
+
+
+ENCODINGS = [
+    "gzip",
+    pytest.param("br", marks=pytest.mark.skipif(importlib.util.find_spec("brotli") is None, reason="brotli is optional")),
+]
+
+
+def decompress(body, encoding):
+    if encoding == "br":
+        import brotli
+        return brotli.decompress(body)
+    return gzip.decompress(body)
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_services_negotiates_compression(servers, encoding):
+    _, identity_headers, identity = get(servers, "/api/services")
+    status, headers, body = get(servers, "/api/services", **{"Accept-Encoding": f"{encoding}, identity;q=0.5"})
+    assert status == 200
+    assert headers["Content-Encoding"] == encoding
+    assert headers["Vary"] == "Accept-Encoding"
+    assert int(headers["Content-Length"]) == len(body) < len(identity)
+    assert decompress(body, encoding) == identity
+    # Each coding is its own representation, and revalidates only against its own tag
+    etag = headers["ETag"]
+    assert etag != identity_headers["ETag"]
+    assert get(servers, "/api/services", **{"Accept-Encoding": encoding, "If-None-Match": etag})[0] == 304
+    assert get(servers, "/api/services", **{"Accept-Encoding": encoding, "If-None-Match": identity_headers["ETag"]})[0] == 200
+    assert get(servers, "/api/services", **{"If-None-Match": etag})[0] == 200
+
+
+def test_services_identity_when_nothing_supported_is_accepted(servers):
+    _, identity_headers, identity = get(servers, "/api/services")
+    for accept_encoding in ("identity", "deflate", "gzip;q=0, br;q=0"):
+        status, headers, body = get(servers, "/api/services", **{"Accept-Encoding": accept_encoding})
+        assert status == 200
+        assert "Content-Encoding" not in headers
+        assert headers["ETag"] == identity_headers["ETag"]
+        assert body == identity
+
+
+@pytest.mark.parametrize("path", ["/api/categories", "/api/health"])
+def test_small_bodies_are_sent_as_identity(servers, path):
+    # Both bodies are under MIN_COMPRESS_SIZE, so they go out and are tagged uncompressed
+    _, identity_headers, identity = get(servers, path)
+    status, headers, body = get(servers, path, **{"Accept-Encoding": "gzip, br"})
+    assert status == 200
+    assert "Content-Encoding" not in headers
+    assert headers["ETag"] == identity_headers["ETag"]
+    assert headers["Vary"] == "Accept-Encoding"
+    assert body == identity
+    assert get(servers, path, **{"Accept-Encoding": "gzip, br", "If-None-Match": identity_headers["ETag"]})[0] == 304
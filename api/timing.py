@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger("timing")
+
+# Opt-in: when disabled, phase() is a context-variable lookup returning a shared no-op
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING", "").lower() in ("1", "true", "yes")
+
+_NO_TIMING = nullcontext()
+
+# Structured fields each timing record carries, see ServerTimingMiddleware
+LOG_FIELDS = ("method", "path", "status", "total_ms", "phases_ms")
+
+
+class TimingFormatter(logging.Formatter):
+    """One JSON object per record: time, logger and message, plus its structured fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"time": self.formatTime(record), "logger": record.name, "message": record.getMessage()}
+        entry.update((field, getattr(record, field)) for field in LOG_FIELDS if hasattr(record, field))
+        return json.dumps(entry)
+
+
+def configure_logger() -> None:
+    """Log timings at INFO to stderr as JSON lines; the root logger's format would drop the fields"""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(TimingFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class PhaseTimer:
+    """Accumulated duration of each named phase of one request"""
+
+    __slots__ = ("started", "phases")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def server_timing(self, total: float) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.phases.items()]
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+
+CURRENT_TIMER: ContextVar[Optional[PhaseTimer]] = ContextVar("current_timer", default=None)
+
+
+def phase(name: str):
+    """Time a block as one phase of the current request, if timing is enabled for it"""
+    timer = CURRENT_TIMER.get()
+    if timer is None:
+        return _NO_TIMING
+    return timer.measure(name)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that collects phase timings per request
+
+    Timings are sent as a Server-Timing header (visible in browser devtools) and logged
+    with structured fields on the "timing" logger, as JSON lines (see configure_logger).
+    Routes report validate, cache, filter, compare, estimate, serialize and compress
+    phases. validate covers the route's own checks of its parameters; FastAPI parses and
+    type-checks them before the route runs, which only shows in total.
+    """
+
+    def __init__(self, app, enabled: bool = SERVER_TIMING_ENABLED):
+        self.app = app
+        self.enabled = enabled
+        if enabled:
+            configure_logger()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        timer = PhaseTimer()
+        token = CURRENT_TIMER.set(timer)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - timer.started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.server_timing(total).encode("latin-1")))
+                message = {**message, "headers": headers}
+                logger.info(
+                    "%s %s %s total=%.3fms %s",
+                    scope["method"], scope["path"], message["status"], total * 1000,
+                    " ".join(f"{name}={seconds * 1000:.3f}ms" for name, seconds in timer.phases.items()),
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": message["status"],
+                        "total_ms": total * 1000,
+                        "phases_ms": {name: seconds * 1000 for name, seconds in timer.phases.items()},
+                    },
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            CURRENT_TIMER.reset(token)
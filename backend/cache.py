@@ -0,0 +1,146 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+from compression import EncodedBody
+
+# Clients may reuse a response briefly, then must revalidate it with If-None-Match
+CACHE_CONTROL = "public, max-age=60, must-revalidate"
+
+# Part of every query ETag; bump it whenever the JSON a response is encoded as changes
+# (models, field order, serialization), so clients holding an old body revalidate to a
+# new one even though the catalog and query are the same
+RESPONSE_FORMAT = 1
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag over the response format and the given parts, typically a snapshot fingerprint and a query key"""
+    digest = hashlib.sha256("\x1f".join(repr(part) for part in (RESPONSE_FORMAT, *parts)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """Bounded LRU of encoded response bodies, invalidated whenever the catalog version changes
+
+    Each entry keeps its compressed variants, so a body is compressed at most once per version.
+    Entries are bounded in number and, with max_bytes, in the bytes they hold, counting every
+    variant as it is built; a body larger than the whole budget is not cached at all.
+    """
+
+    def __init__(self, maxsize: int = 256, max_bytes: Optional[int] = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[int] = None
+        self._entries: "OrderedDict[Hashable, EncodedBody]" = OrderedDict()
+        # Bytes each entry was last counted at, so a grown entry adjusts the total
+        self._charges: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sync_version(self, version: int) -> bool:
+        """Advance to version if it is newer; False when the caller holds an outdated snapshot"""
+        if self._version is None or version > self._version:
+            # Entries encoded against an older snapshot are never served again
+            self._drop_all()
+            self._version = version
+        return version == self._version
+
+    def _drop_all(self) -> None:
+        for body in self._entries.values():
+            body.on_resize = None
+        self._entries.clear()
+        self._charges.clear()
+        self.nbytes = 0
+
+    def _discard(self, key: Hashable) -> None:
+        body = self._entries.pop(key, None)
+        if body is not None:
+            body.on_resize = None
+            self.nbytes -= self._charges.pop(key)
+
+    def _charge(self, key: Hashable, body: EncodedBody) -> None:
+        nbytes = body.nbytes
+        self.nbytes += nbytes - self._charges.get(key, 0)
+        self._charges[key] = nbytes
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.maxsize
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            self._discard(next(iter(self._entries)))
+
+    def _resized(self, key: Hashable, body: EncodedBody) -> None:
+        with self._lock:
+            # The entry may have been evicted or replaced since the variant was requested
+            if self._entries.get(key) is body:
+                self._charge(key, body)
+                self._evict()
+
+    def get(self, version: int, key: Hashable) -> Optional[EncodedBody]:
+        with self._lock:
+            body = self._entries.get(key) if self._sync_version(version) else None
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def peek(self, version: int, key: Hashable) -> Optional[EncodedBody]:
+        """Like get, without counting a hit or miss; for re-checking a key already looked up"""
+        with self._lock:
+            return self._entries.get(key) if self._sync_version(version) else None
+
+    def put(self, version: int, key: Hashable, body: EncodedBody) -> None:
+        with self._lock:
+            # Requests still running against a replaced snapshot must not repopulate the cache
+            if not self._sync_version(version):
+                return
+            self._discard(key)
+            if self.max_bytes is not None and body.nbytes > self.max_bytes:
+                return
+            self._entries[key] = body
+            self._charge(key, body)
+            body.on_resize = lambda: self._resized(key, body)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._drop_all()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
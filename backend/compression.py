@@ -0,0 +1,118 @@
+import gzip
+import zlib
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; the framing overhead outweighs the savings
+MIN_COMPRESS_SIZE = 1024
+
+# Server preference when the client accepts several encodings equally
+SUPPORTED_ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(
+    accept_encoding: Optional[str],
+    supported: Tuple[str, ...] = SUPPORTED_ENCODINGS,
+) -> Optional[str]:
+    """Pick the best supported content coding for an Accept-Encoding header, or None for identity"""
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in supported:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    # Variants are built lazily on a cache miss, which is still on the request path, so use
+    # mid-range levels: maximum levels cost several ms per body for a few percent in size
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        # Fixed mtime keeps the output, and therefore its length, deterministic
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """Strong ETags must differ between content codings of the same resource
+
+    encoding is the coding actually applied to the body, see EncodedBody.applied_encoding,
+    not the one negotiated: a small body is sent as identity whatever the client accepts.
+    """
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+class EncodedBody:
+    """An encoded response body and its compressed variants, each compressed at most once"""
+
+    __slots__ = ("identity", "_variants", "on_resize")
+
+    def __init__(self, identity: bytes):
+        self.identity = identity
+        self._variants: Dict[str, bytes] = {}
+        # Called after a new variant is stored, so a cache holding the body can re-count it
+        self.on_resize: Optional[Callable[[], None]] = None
+
+    def __len__(self) -> int:
+        return len(self.identity)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held: the identity body plus every variant compressed so far"""
+        return len(self.identity) + sum(len(body) for body in self._variants.values())
+
+    def applied_encoding(self, encoding: Optional[str]) -> Optional[str]:
+        """Coding variant(encoding) applies: None for identity and for bodies too small to compress"""
+        if encoding is None or len(self.identity) < MIN_COMPRESS_SIZE:
+            return None
+        return encoding
+
+    def has_variant(self, encoding: Optional[str]) -> bool:
+        """Whether variant(encoding) is answered without compressing anything"""
+        return self.applied_encoding(encoding) is None or encoding in self._variants
+
+    def variant(self, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """Body bytes for the negotiated encoding, and the coding actually applied"""
+        if self.applied_encoding(encoding) is None:
+            return self.identity, None
+        body = self._variants.get(encoding)
+        if body is None:
+            body = self._variants[encoding] = compress(self.identity, encoding)
+            if self.on_resize is not None:
+                self.on_resize()
+        return body, encoding
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip an async byte stream incrementally, without buffering the whole body"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
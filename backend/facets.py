@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+from models import AWSService, ServiceCategory, PricingModel, FacetsResponse
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def popcount(mask: int) -> int:
+        return bin(mask).count("1")
+
+
+def positions_bitmap(positions: Iterable[int], size: int) -> int:
+    """Int bitmap with bit p set for every catalog position p"""
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+class FacetIndex:
+    """One bitmap over catalog positions per category, pricing model and free tier value
+
+    Counting a facet value is an AND plus a popcount, so a facets request costs the same
+    number of big-int operations whatever the filter matches.
+    """
+
+    __slots__ = ("size", "_all", "_categories", "_free_tier", "_pricing_models")
+
+    def __init__(self, services: Sequence[AWSService]):
+        self.size = len(services)
+        categories: Dict[ServiceCategory, List[int]] = {category: [] for category in ServiceCategory}
+        free_tier: Dict[bool, List[int]] = {True: [], False: []}
+        pricing_models: Dict[PricingModel, List[int]] = {pricing_model: [] for pricing_model in PricingModel}
+        for position, service in enumerate(services):
+            categories[service.category].append(position)
+            free_tier[service.free_tier_available].append(position)
+            for pricing_model in set(service.pricing_models):
+                pricing_models[pricing_model].append(position)
+
+        self._all = (1 << self.size) - 1
+        self._categories = {key: positions_bitmap(positions, self.size) for key, positions in categories.items()}
+        self._free_tier = {key: positions_bitmap(positions, self.size) for key, positions in free_tier.items()}
+        self._pricing_models = {key: positions_bitmap(positions, self.size) for key, positions in pricing_models.items()}
+
+    def counts(
+        self,
+        category: Optional[ServiceCategory] = None,
+        free_tier: Optional[bool] = None,
+        matches: Optional[int] = None,
+    ) -> FacetsResponse:
+        """Facet counts under the given filters; matches restricts to e.g. search results
+
+        Each facet ignores its own filter, so a selected category still reports counts for
+        the other categories a user could switch to.
+        """
+        base = self._all if matches is None else matches
+        category_mask = self._categories[category] if category is not None else self._all
+        free_tier_mask = self._free_tier[free_tier] if free_tier is not None else self._all
+
+        by_free_tier = base & category_mask
+        by_category = base & free_tier_mask
+        selected = by_free_tier & free_tier_mask
+        return FacetsResponse(
+            total_count=popcount(selected),
+            categories={key: popcount(by_category & bitmap) for key, bitmap in self._categories.items()},
+            pricing_models={key: popcount(selected & bitmap) for key, bitmap in self._pricing_models.items()},
+            free_tier={key: popcount(by_free_tier & bitmap) for key, bitmap in self._free_tier.items()},
+        )
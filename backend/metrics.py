@@ -0,0 +1,217 @@
+import asyncio
+import bisect
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+# Request latency buckets in seconds, dense below 10ms where indexed lookups land
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Response body size buckets in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds between event loop lag probes, and probes kept for the recent maximum (one minute)
+LOOP_LAG_INTERVAL = 0.25
+LOOP_LAG_WINDOW = 240
+
+Labels = Tuple[Tuple[str, str], ...]
+GaugeValue = Union[float, Mapping[Labels, float]]
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition layout"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: Labels) -> Iterable[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f"{name}_bucket{format_labels(labels + (('le', repr(float(bound))),))} {cumulative}"
+        yield f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {self.count}"
+        yield f"{name}_sum{format_labels(labels)} {self.sum}"
+        yield f"{name}_count{format_labels(labels)} {self.count}"
+
+
+class MetricsRegistry:
+    """Per-route request metrics plus callback gauges, rendered in Prometheus text format"""
+
+    def __init__(self, prefix: str = "catalog_api"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._requests: Dict[Labels, int] = {}
+        self._latency: Dict[Labels, Histogram] = {}
+        self._sizes: Dict[Labels, Histogram] = {}
+        self._callbacks: List[Tuple[str, str, str, Callable[[], GaugeValue]]] = []
+
+    def observe_request(self, route: str, method: str, status: int, duration: float, size: int) -> None:
+        route_labels: Labels = (("route", route), ("method", method))
+        with self._lock:
+            status_labels = route_labels + (("status", str(status)),)
+            self._requests[status_labels] = self._requests.get(status_labels, 0) + 1
+            latency = self._latency.get(route_labels)
+            if latency is None:
+                latency = self._latency[route_labels] = Histogram(LATENCY_BUCKETS)
+            latency.observe(duration)
+            sizes = self._sizes.get(route_labels)
+            if sizes is None:
+                sizes = self._sizes[route_labels] = Histogram(SIZE_BUCKETS)
+            sizes.observe(size)
+
+    def register_callback(
+        self,
+        name: str,
+        help_text: str,
+        callback: Callable[[], GaugeValue],
+        metric_type: str = "gauge",
+    ) -> None:
+        """Metric read at scrape time; callback returns a value or a {labels: value} mapping
+
+        Use metric_type="counter" for monotonic values tracked elsewhere, such as cache hits.
+        """
+        self._callbacks.append((f"{self.prefix}_{name}", help_text, metric_type, callback))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            name = f"{self.prefix}_requests_total"
+            lines += [f"# HELP {name} HTTP requests by route, method and status.", f"# TYPE {name} counter"]
+            lines += [f"{name}{format_labels(labels)} {count}" for labels, count in sorted(self._requests.items())]
+
+            name = f"{self.prefix}_request_duration_seconds"
+            lines += [f"# HELP {name} Time from request start to the last response byte.", f"# TYPE {name} histogram"]
+            for labels, histogram in sorted(self._latency.items()):
+                lines += histogram.samples(name, labels)
+
+            name = f"{self.prefix}_response_size_bytes"
+            lines += [f"# HELP {name} Response body size as sent, after compression.", f"# TYPE {name} histogram"]
+            for labels, histogram in sorted(self._sizes.items()):
+                lines += histogram.samples(name, labels)
+
+        for name, help_text, metric_type, callback in self._callbacks:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+            value = callback()
+            if isinstance(value, Mapping):
+                lines += [f"{name}{format_labels(labels)} {sample}" for labels, sample in value.items()]
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording status, latency and bytes sent for every HTTP request
+
+    Routes are labelled by their path template (e.g. /api/services/{service_id}) so that
+    label cardinality stays bounded; requests that match no route share one label.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry, route_paths: Optional[Callable[[], Mapping[object, str]]] = None):
+        self.app = app
+        self.registry = registry
+        # endpoint -> path template, resolved on first use once every route is registered
+        self._route_paths_factory = route_paths
+        self._route_paths: Optional[Mapping[object, str]] = None
+
+    def route_label(self, scope) -> str:
+        route = scope.get("route")
+        if route is not None and hasattr(route, "path"):
+            return route.path
+        endpoint = scope.get("endpoint")
+        if endpoint is None or self._route_paths_factory is None:
+            return "unmatched"
+        if self._route_paths is None:
+            self._route_paths = self._route_paths_factory()
+        return self._route_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_and_measure(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            self.registry.observe_request(
+                self.route_label(scope), scope["method"], status, time.perf_counter() - started, size
+            )
+
+
+class LoopLagMonitor:
+    """Event loop lag: how much later than asked a sleep on the loop wakes up
+
+    Synchronous work on the loop delays every wake-up, so sustained lag means requests
+    are queueing behind CPU work that should have been offloaded.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, window: int = LOOP_LAG_WINDOW):
+        self.interval = interval
+        self._samples: "deque[float]" = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def lag(self) -> float:
+        """Most recent lag in seconds"""
+        return self._samples[-1] if self._samples else 0.0
+
+    @property
+    def max_lag(self) -> float:
+        """Largest lag in seconds over the last window of probes"""
+        return max(self._samples, default=0.0)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._probe())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self._samples.append(max(0.0, loop.time() - started - self.interval))
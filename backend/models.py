@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from enum import Enum
 
 class ServiceCategory(str, Enum):
@@ -23,6 +23,35 @@ class PricingModel(str, Enum):
     FREE_TIER = "Free Tier"
     PAY_PER_USE = "Pay-per-use"
 
+class SearchMode(str, Enum):
+    TEXT = "text"
+    FUZZY = "fuzzy"
+
+class SortField(str, Enum):
+    NAME = "name"
+    CATEGORY = "category"
+    FEATURES = "features"
+    FREE_TIER = "free_tier"
+    RELEVANCE = "relevance"
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+# Upper bounds on prices and usage quantities. Finite and far below float overflow even
+# when multiplied together, so estimates always encode as JSON numbers
+MAX_RATE = 1e6
+MAX_QUANTITY = 1e15
+
+# Approximate list prices in USD and monthly free tier allowances; zero means not billed
+class PricingDimensions(BaseModel):
+    per_request: float = Field(0.0, ge=0, le=MAX_RATE, allow_inf_nan=False)
+    per_gb_month: float = Field(0.0, ge=0, le=MAX_RATE, allow_inf_nan=False)
+    per_hour: float = Field(0.0, ge=0, le=MAX_RATE, allow_inf_nan=False)
+    free_requests_per_month: float = Field(0.0, ge=0, le=MAX_QUANTITY, allow_inf_nan=False)
+    free_gb_months_per_month: float = Field(0.0, ge=0, le=MAX_QUANTITY, allow_inf_nan=False)
+    free_hours_per_month: float = Field(0.0, ge=0, le=MAX_QUANTITY, allow_inf_nan=False)
+
 class AWSService(BaseModel):
     id: str
     name: str
@@ -36,6 +65,7 @@ class AWSService(BaseModel):
     free_tier_available: bool = False
     region_availability: str = "Most AWS regions"
     documentation_url: Optional[str] = None
+    pricing: Optional[PricingDimensions] = None
 
 class ServiceComparison(BaseModel):
     services: List[AWSService]
@@ -48,3 +78,71 @@ class ServicesResponse(BaseModel):
     services: List[AWSService]
     total_count: int
     categories: List[ServiceCategory]
+    next_cursor: Optional[str] = None
+
+class SetComparison(BaseModel):
+    shared: List[str]
+    unique: Dict[str, List[str]]
+
+class PricingComparison(BaseModel):
+    bits: Dict[str, int]
+    common_bits: int
+    union_bits: int
+    common: List[PricingModel]
+    differences: Dict[str, List[PricingModel]]
+
+class ComparisonMatrix(BaseModel):
+    key_features: SetComparison
+    limitations: SetComparison
+    pricing_models: PricingComparison
+    free_tier: Dict[str, bool]
+    free_tier_differs: bool
+    region_availability: Dict[str, str]
+    region_availability_differs: bool
+
+class CompareRequest(BaseModel):
+    service_ids: List[str]
+
+class FacetsResponse(BaseModel):
+    total_count: int
+    categories: Dict[ServiceCategory, int]
+    pricing_models: Dict[PricingModel, int]
+    free_tier: Dict[bool, int]
+
+class SimilarService(BaseModel):
+    score: float
+    service: AWSService
+
+class SimilarServicesResponse(BaseModel):
+    service_id: str
+    similar: List[SimilarService]
+
+# One month of usage: request count, storage in GB-months and running hours
+class UsageScenario(BaseModel):
+    name: Optional[str] = None
+    requests: float = Field(0.0, ge=0, le=MAX_QUANTITY, allow_inf_nan=False)
+    gb_months: float = Field(0.0, ge=0, le=MAX_QUANTITY, allow_inf_nan=False)
+    hours: float = Field(0.0, ge=0, le=MAX_QUANTITY, allow_inf_nan=False)
+
+class EstimateRequest(BaseModel):
+    scenarios: List[UsageScenario]
+    service_ids: Optional[List[str]] = None
+
+class EstimateResponse(BaseModel):
+    service_ids: List[str]
+    scenario_count: int
+    costs: List[List[float]]
+    cheapest: List[Optional[str]]
+
+class BatchRequest(BaseModel):
+    service_ids: List[str]
+
+class BatchServicesResponse(BaseModel):
+    services: List[AWSService]
+    missing: List[str]
+
+class ComparisonResponse(BaseModel):
+    services: List[AWSService]
+    comparison_criteria: List[str]
+    comparison_count: int
+    matrix: ComparisonMatrix
@@ -0,0 +1,60 @@
+import base64
+import json
+from typing import Iterable, Optional, Tuple
+
+# Upper bound for the limit parameter of paginated endpoints
+MAX_PAGE_SIZE = 100
+
+# Always included in projected records so clients can key and re-fetch them
+PROJECTION_KEY_FIELD = "id"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def encode_cursor(offset: int, fingerprint: str) -> str:
+    """Opaque cursor pointing at offset within the result list of one catalog snapshot"""
+    payload = json.dumps({"o": offset, "s": fingerprint[:12]}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset, snapshot = payload["o"], payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor(f"Malformed cursor: {cursor}")
+    # bool is an int subclass, so {"o": true} would otherwise pass as offset 1
+    if type(offset) is not int or offset < 0:
+        raise InvalidCursor(f"Malformed cursor: {cursor}")
+    # Offsets are only meaningful against the snapshot they were issued for
+    if snapshot != fingerprint[:12]:
+        raise InvalidCursor("Cursor refers to an outdated catalog snapshot, restart pagination")
+    return offset
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[Tuple[str, ...]]:
+    """Validated, canonically ordered projection for a comma-separated fields parameter"""
+    if not fields:
+        return None
+    allowed = tuple(allowed)
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add(PROJECTION_KEY_FIELD)
+    return tuple(field for field in allowed if field in requested)
+
+
+def page_bounds(total_count: int, offset: int, limit: Optional[int]) -> Tuple[int, Optional[int]]:
+    """End of the page starting at offset, and the offset of the next page if there is one"""
+    if limit is None:
+        return total_count, None
+    end = min(offset + limit, total_count)
+    return end, end if end < total_count else None
@@ -0,0 +1,160 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple, Union
+import numpy as np
+
+# Searchable fields and the relevance weight of a term found in each of them
+SEARCH_FIELDS: Dict[str, float] = {
+    "name": 4.0,
+    "key_features": 2.0,
+    "use_cases": 1.5,
+    "description": 1.0,
+}
+
+# A term that only prefix-matches an indexed token scores less than an exact match
+PREFIX_MATCH_FACTOR = 0.5
+
+# A term found inside a token, when no token starts with it, scores less again
+INFIX_MATCH_FACTOR = 0.25
+
+# Shorter terms with no prefix match find nothing rather than most of the vocabulary
+MIN_INFIX_LENGTH = 3
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+Document = Mapping[str, Union[str, Sequence[str], None]]
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a query: queries with the same terms give the same results"""
+    return " ".join(sorted(set(tokenize(query))))
+
+
+def posting_arrays(postings: Sequence[Dict[int, float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Posting dicts as flat arrays: offsets per term, then positions and weights
+
+    Forked workers only ever read these three buffers. Dicts of boxed ints and floats
+    would have every lookup write reference counts all over the catalog's pages and
+    unshare them.
+    """
+    offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+    np.cumsum([len(posting) for posting in postings], out=offsets[1:])
+    positions = np.fromiter((position for posting in postings for position in posting), dtype=np.uint32, count=offsets[-1])
+    weights = np.fromiter((weight for posting in postings for weight in posting.values()), dtype=np.float32, count=offsets[-1])
+    return offsets, positions, weights
+
+
+def concatenated_ranges(starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    """Every index of the [start, stop) ranges, one after another"""
+    lengths = stops - starts
+    ends = np.cumsum(lengths)
+    return np.repeat(starts - ends + lengths, lengths) + np.arange(ends[-1] if len(ends) else 0)
+
+
+def best_scores(positions: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct positions in ascending order, each with its highest score"""
+    order = np.lexsort((-scores, positions))
+    positions, scores = positions[order], scores[order]
+    first = np.ones(len(positions), dtype=bool)
+    np.not_equal(positions[1:], positions[:-1], out=first[1:])
+    return positions[first], scores[first]
+
+
+def intersect_scores(
+    scores: Tuple[np.ndarray, np.ndarray], other: Tuple[np.ndarray, np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions in both best_scores results, with their scores added"""
+    positions, left, right = np.intersect1d(scores[0], other[0], assume_unique=True, return_indices=True)
+    return positions, scores[1][left] + other[1][right]
+
+
+def ranked(scores: Tuple[np.ndarray, np.ndarray]) -> List[Tuple[int, float]]:
+    """(position, score) pairs, best match first and ties in catalog order"""
+    positions, values = scores
+    order = np.lexsort((positions, -values))
+    return list(zip(positions[order].tolist(), values[order].tolist()))
+
+
+class SearchIndex:
+    """Inverted token and prefix index over the searchable fields of a catalog
+
+    Tokens are kept sorted, so the tokens starting with a partially typed word are one
+    contiguous range found by bisection, and so are their postings. A term no token
+    starts with is looked up inside tokens instead, so "sql" still finds "MySQL" and
+    "base" finds "Database". That scans the vocabulary, not the catalog, and only
+    happens for terms the prefix index has nothing for.
+    """
+
+    __slots__ = ("_tokens", "_offsets", "_positions", "_weights", "_vocabulary", "_token_starts")
+
+    def __init__(self, documents: Iterable[Document]):
+        # token -> {position: weight}
+        postings: Dict[str, Dict[int, float]] = {}
+        for position, document in enumerate(documents):
+            for field, weight in SEARCH_FIELDS.items():
+                value = document.get(field) or ()
+                texts = (value,) if isinstance(value, str) else value
+                tokens = {token for text in texts for token in tokenize(text)}
+                for token in tokens:
+                    posting = postings.setdefault(token, {})
+                    posting[position] = posting.get(position, 0.0) + weight
+
+        self._tokens: Tuple[str, ...] = tuple(sorted(postings))
+        self._offsets, self._positions, self._weights = posting_arrays([postings[token] for token in self._tokens])
+        # Every token on its own line, and where each line starts, for infix lookups
+        self._vocabulary = "".join(f"{token}\n" for token in self._tokens)
+        self._token_starts = array("Q", [0])
+        for token in self._tokens:
+            self._token_starts.append(self._token_starts[-1] + len(token) + 1)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def infix_tokens(self, term: str) -> List[int]:
+        """Ids of the tokens containing term, in vocabulary order"""
+        found = []
+        at = self._vocabulary.find(term)
+        while at != -1:
+            token = bisect_right(self._token_starts, at) - 1
+            found.append(token)
+            # Continue from the next token, each one counts once
+            at = self._vocabulary.find(term, self._token_starts[token + 1])
+        return found
+
+    def term_scores(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Best score per position for a single query term: exact, prefix or, failing those, infix match"""
+        # Tokens are [a-z0-9]+ and "{" sorts after all of those characters
+        first, end = bisect_left(self._tokens, term), bisect_left(self._tokens, term + "{")
+        if first == end and len(term) >= MIN_INFIX_LENGTH:
+            tokens = self.infix_tokens(term)
+            if tokens:
+                entries = np.concatenate([
+                    np.arange(self._offsets[token], self._offsets[token + 1]) for token in tokens
+                ])
+                return best_scores(self._positions[entries], self._weights[entries].astype(np.float64) * INFIX_MATCH_FACTOR)
+        start, stop = self._offsets[first], self._offsets[end]
+        scores = self._weights[start:stop].astype(np.float64)
+        exact = first < end and self._tokens[first] == term
+        scores[self._offsets[first + 1] - start if exact else 0:] *= PREFIX_MATCH_FACTOR
+        return best_scores(self._positions[start:stop], scores)
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """(position, score) pairs matching every query term, best match first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        # Start from the rarest term so the running intersection stays small
+        term_scores = sorted((self.term_scores(term) for term in terms), key=lambda scores: len(scores[0]))
+        scores = term_scores[0]
+        for other in term_scores[1:]:
+            scores = intersect_scores(scores, other)
+            if not len(scores[0]):
+                return []
+
+        return ranked(scores)
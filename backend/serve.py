@@ -0,0 +1,222 @@
+"""Production launcher: pre-forked uvicorn workers sharing one preloaded catalog.
+
+    python serve.py --workers 4 --host 0.0.0.0 --port 8000
+
+The master process loads the catalog (from the compiled snapshot when there is one),
+builds every index, freezes the garbage collector's view of those objects and only
+then forks the workers. Workers inherit the catalog through copy-on-write pages
+instead of each importing data.py and building their own copy, so adding workers
+adds little memory. Encoded service JSON, the text and fuzzy search postings, the
+trigram index and the NumPy similarity and pricing arrays are single large buffers,
+which reads never write to, so those pages stay shared. What requests still unshare
+are the Python objects they touch: record strings for the services a response builds
+models for, and the per-worker response cache.
+
+This is copy-on-write sharing, not a shared memory segment, and it only holds as long
+as nothing writes to the inherited pages. Every Python object carries its reference
+count in its own header, so merely referencing a catalog object from a worker dirties
+the page it lives on; gc.freeze keeps the collector's own bookkeeping off those pages,
+but not the refcounts. The savings therefore depend on the catalog's bulk living in the
+large buffers above and on the catalog never being mutated after the fork; a reload
+builds a new snapshot in the master and forks new workers instead.
+
+A worker that keeps crashing right after its fork is replaced with a doubling delay,
+so a bad deploy does not turn the master into a fork loop.
+
+Only the master polls the catalog file. On a change it builds the new snapshot once,
+forks a fresh generation of workers from it, and then asks the old generation to
+finish in-flight requests and exit. All workers share one listening socket, so the
+handover drops no connections.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+import uvicorn
+
+logger = logging.getLogger("serve")
+
+# Seconds between checks for exited workers
+SUPERVISE_INTERVAL = 0.5
+
+# A worker exiting sooner than this after its fork counts as crashing on start; each
+# such exit in a row doubles the wait before its replacement is forked, up to the cap
+MIN_WORKER_UPTIME = 10.0
+RESPAWN_BACKOFF_INITIAL = 0.5
+RESPAWN_BACKOFF_MAX = 30.0
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, args: argparse.Namespace) -> None:
+    """Serve on the inherited socket until uvicorn shuts down on SIGTERM or SIGINT"""
+    # Out of the terminal's process group: Ctrl+C reaches only the master, which forwards
+    # one SIGTERM, since a second signal would make uvicorn skip the graceful shutdown
+    os.setpgid(0, 0)
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(signum, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=args.log_level, timeout_keep_alive=args.keep_alive)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    """Forks and supervises one generation of workers per catalog snapshot"""
+
+    def __init__(self, app, store, sock: socket.socket, args: argparse.Namespace):
+        self.app = app
+        self.store = store
+        self.sock = sock
+        self.args = args
+        self.generation = 0
+        # pid -> generation it was forked for
+        self.workers: Dict[int, int] = {}
+        # pid -> monotonic time it was forked at
+        self.started: Dict[int, float] = {}
+        # Monotonic times at which replacements for crashed workers are due
+        self.respawns: List[float] = []
+        self.backoff = 0.0
+        self.stopping = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                run_worker(self.app, self.sock, self.args)
+            except BaseException:
+                logger.exception("Worker failed")
+                status = 1
+            finally:
+                os._exit(status)
+        self.workers[pid] = self.generation
+        self.started[pid] = time.monotonic()
+
+    def start_generation(self) -> None:
+        """Fork a full set of workers from the current snapshot, then retire older ones"""
+        # Objects built so far are moved out of the collector's generations, so collections
+        # in the workers do not write to (and unshare) the catalog's pages
+        gc.collect()
+        gc.freeze()
+        self.generation += 1
+        # The new generation is a full set, so replacements still due for the old one are dropped
+        self.respawns.clear()
+        for _ in range(self.args.workers):
+            self.spawn()
+        for pid, generation in list(self.workers.items()):
+            if generation < self.generation:
+                self.signal(pid, signal.SIGTERM)
+        logger.info(
+            "Generation %s: %s workers serving catalog version %s",
+            self.generation, self.args.workers, self.store.current().version,
+        )
+
+    def signal(self, pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+
+    def reap(self) -> None:
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            generation = self.workers.pop(pid, None)
+            uptime = time.monotonic() - self.started.pop(pid, time.monotonic())
+            # A current worker that exits on its own is replaced; retired ones are expected to go
+            if generation == self.generation and not self.stopping:
+                if uptime < MIN_WORKER_UPTIME:
+                    self.backoff = min(RESPAWN_BACKOFF_MAX, self.backoff * 2 or RESPAWN_BACKOFF_INITIAL)
+                else:
+                    self.backoff = 0.0
+                logger.warning(
+                    "Worker %s exited with status %s after %.1fs, restarting in %.1fs", pid, status, uptime, self.backoff,
+                )
+                self.respawns.append(time.monotonic() + self.backoff)
+
+    def respawn_due(self) -> None:
+        """Fork the replacements whose backoff has run out"""
+        now = time.monotonic()
+        due = [at for at in self.respawns if at <= now]
+        self.respawns = [at for at in self.respawns if at > now]
+        for _ in due:
+            self.spawn()
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
+        self.respawns.clear()
+        for pid in list(self.workers):
+            self.signal(pid, signal.SIGTERM)
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.start_generation()
+
+        deadline = None
+        next_poll = time.monotonic() + self.args.poll_interval
+        while self.workers or self.respawns:
+            time.sleep(SUPERVISE_INTERVAL)
+            self.reap()
+            if not self.stopping:
+                self.respawn_due()
+            if self.stopping:
+                deadline = deadline or time.monotonic() + self.args.graceful_timeout
+                if time.monotonic() > deadline:
+                    for pid in list(self.workers):
+                        self.signal(pid, signal.SIGKILL)
+                continue
+            if self.args.poll_interval <= 0 or time.monotonic() < next_poll:
+                continue
+            next_poll = time.monotonic() + self.args.poll_interval
+            # Rebuilt once here and inherited by the next generation, never per worker
+            if self.store.reload_if_changed():
+                self.start_generation()
+        return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--poll-interval", type=float, default=float(os.environ.get("CATALOG_POLL_INTERVAL", "2")),
+                        help="Seconds between catalog file checks in the master; 0 disables reloads")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="Seconds workers get to finish requests on shutdown")
+    parser.add_argument("--keep-alive", type=int, default=5)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(process)d %(name)s %(message)s")
+
+    # The master polls on behalf of every worker, so the per-process watcher thread
+    # started by the app's lifespan is switched off before the app is imported
+    os.environ["CATALOG_POLL_INTERVAL"] = "0"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from main import app
+    from data import CATALOG_STORE
+
+    sock = bind_socket(args.host, args.port)
+    # The bound port, which differs from args.port when that is 0
+    logger.info("Listening on %s:%s", args.host, sock.getsockname()[1])
+    return Master(app, CATALOG_STORE, sock, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Compiled catalog snapshots for fast cold starts.
+
+Build step (run after editing the catalog file, before deploying; the root
+vercel.json runs it as part of the deployment's buildCommand):
+
+    python snapshot.py [catalog.json] [catalog.snapshot]
+
+The snapshot is a pickled, fully indexed ServiceCatalog. Loading it skips pydantic
+validation and index construction. It is only used while both the model schema and
+the catalog file it was built from are unchanged; otherwise startup falls back to
+validating the catalog file.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+from typing import Optional
+import numpy
+import pydantic
+from models import AWSService
+from catalog import ServiceCatalog
+
+logger = logging.getLogger(__name__)
+
+# Bump when the pickled layout of ServiceCatalog or its indexes changes
+SNAPSHOT_FORMAT = 17
+
+# Protocol 5 is the newest one Python 3.8 and later all read
+SNAPSHOT_PROTOCOL = 5
+
+# Pickled models and indexes are only portable across identical schema, pydantic and numpy
+# versions. The pickle protocol is readable by every supported Python, so the interpreter
+# version is left out: the build image and the function runtime need not match.
+SCHEMA_HASH = hashlib.sha256(json.dumps({
+    "format": SNAPSHOT_FORMAT,
+    "schema": AWSService.model_json_schema(),
+    "pydantic": pydantic.VERSION,
+    "numpy": numpy.__version__,
+}, sort_keys=True).encode()).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def write_snapshot(catalog: ServiceCatalog, source_path: str, snapshot_path: str) -> None:
+    payload = {
+        "schema": SCHEMA_HASH,
+        "source": file_digest(source_path),
+        "catalog": catalog,
+    }
+    # Write then rename so a concurrently starting instance never reads a partial file
+    temp_path = f"{snapshot_path}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=SNAPSHOT_PROTOCOL)
+    os.replace(temp_path, snapshot_path)
+
+
+def read_snapshot(snapshot_path: str, source_path: str) -> Optional[ServiceCatalog]:
+    """The prebuilt catalog, or None if it is missing, stale or built for another schema"""
+    try:
+        with open(snapshot_path, "rb") as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable catalog snapshot %s: %s", snapshot_path, e)
+        return None
+
+    if payload.get("schema") != SCHEMA_HASH:
+        logger.warning("Ignoring catalog snapshot %s built for another schema", snapshot_path)
+        return None
+    try:
+        if payload.get("source") != file_digest(source_path):
+            logger.warning("Ignoring catalog snapshot %s, %s has changed since it was built", snapshot_path, source_path)
+            return None
+    except OSError:
+        # The snapshot is self-contained, so a deployment may ship it without the source file
+        pass
+    return payload["catalog"]
+
+
+if __name__ == "__main__":
+    from store import load_services
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "catalog.json")
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.join(here, "catalog.snapshot")
+
+    catalog = ServiceCatalog(load_services(source))
+    write_snapshot(catalog, source, target)
+    print(f"Wrote {target}: {len(catalog)} services, schema {SCHEMA_HASH[:12]}")
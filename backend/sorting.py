@@ -0,0 +1,117 @@
+from array import array
+from itertools import islice
+from typing import Container, Dict, List, Sequence, Tuple
+import numpy as np
+from models import SortField
+from records import CATEGORIES, ServiceRecords
+
+# Matches whose ranks numpy selects from in the time one Python step of the walk takes
+WALK_STEP_MATCHES = 16
+
+# Fields with a precomputed permutation; relevance comes from the search itself
+INDEXED_SORT_FIELDS = (SortField.NAME, SortField.CATEGORY, SortField.FEATURES, SortField.FREE_TIER)
+
+
+class SortOrders:
+    """Catalog positions pre-sorted by each sort field, ascending and descending
+
+    Ties are broken by name, then by catalog position, in both directions, so pages of
+    a sorted listing are stable. Each order comes with its inverse (the rank of every
+    position), used to sort a small set of matches without walking the whole order.
+    """
+
+    __slots__ = ("_orders", "_ranks")
+
+    def __init__(self, records: ServiceRecords):
+        size = len(records)
+        names = [name.casefold() for name in records.names]
+        primary_keys = {
+            SortField.CATEGORY: [CATEGORIES[code].value for code in records.categories],
+            SortField.FEATURES: [len(features) for features in records.key_features],
+            # Ascending puts free tier services first
+            SortField.FREE_TIER: [not free_tier for free_tier in records.free_tier],
+        }
+        by_name = sorted(range(size), key=names.__getitem__)
+        self._orders: Dict[Tuple[SortField, bool], array] = {
+            (SortField.NAME, False): array("I", by_name),
+            (SortField.NAME, True): array("I", sorted(range(size), key=names.__getitem__, reverse=True)),
+        }
+        for field, keys in primary_keys.items():
+            # Sorts are stable, also in reverse, so name order survives within equal keys
+            self._orders[field, False] = array("I", sorted(by_name, key=keys.__getitem__))
+            self._orders[field, True] = array("I", sorted(by_name, key=keys.__getitem__, reverse=True))
+
+        self._ranks: Dict[Tuple[SortField, bool], array] = {}
+        for key, order in self._orders.items():
+            ranks = array("I", bytes(4 * size))
+            for rank, position in enumerate(order):
+                ranks[position] = rank
+            self._ranks[key] = ranks
+
+    def sort(self, field: SortField, descending: bool, matches: Sequence[int], members: Sequence[Container[int]]) -> "SortedPositions":
+        """matches in field order; members are containers every match is in, empty when all positions match"""
+        key = (field, descending)
+        return SortedPositions(self._orders[key], self._ranks[key], matches, members)
+
+
+class SortedPositions(Sequence[int]):
+    """Matching positions in a precomputed sort order, produced a slice at a time
+
+    Slicing walks the sort order and keeps the positions found in every member set,
+    stopping as soon as the slice is filled, so a first page of k services costs about
+    k / selectivity steps instead of a sort of every match. When the matches are too
+    sparse, or bunched too far into the order, for that to pay off, the first k are
+    selected by their precomputed ranks instead, without sorting the rest.
+    """
+
+    __slots__ = ("_order", "_ranks", "_matches", "_members")
+
+    def __init__(self, order: Sequence[int], ranks: Sequence[int], matches: Sequence[int], members: Sequence[Container[int]]):
+        self._order = order
+        self._ranks = ranks
+        self._matches = matches
+        self._members = members
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def __iter__(self):
+        return iter(self._prefix(len(self)))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return self._prefix(stop)[start:stop:step]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("position index out of range")
+        return self._prefix(index + 1)[index]
+
+    def _prefix(self, stop: int) -> Sequence[int]:
+        """The first stop positions in sort order"""
+        if not self._members:
+            return self._order[:stop]
+        if stop <= 0:
+            return []
+        count = len(self._matches)
+        # The walk visits about stop * size / count positions when matches are spread
+        # through the order; selecting from the matches themselves costs count / WALK_STEP_MATCHES
+        budget = count // WALK_STEP_MATCHES
+        if stop * len(self._order) <= count * budget:
+            members = self._members
+            found: List[int] = []
+            # Matches bunched late in the order, like one category sorted by category,
+            # would make the walk far longer, so it gives up within that budget
+            for position in islice(self._order, budget):
+                if all(position in container for container in members):
+                    found.append(position)
+                    if len(found) == stop:
+                        return found
+        # Selecting the stop smallest match ranks is a partition rather than a full sort,
+        # and the order maps those ranks straight back to positions
+        ranks = np.asarray(self._ranks)[np.fromiter(self._matches, dtype=np.int64, count=count)]
+        if stop < count:
+            ranks = np.partition(ranks, stop - 1)[:stop]
+        ranks.sort()
+        return np.asarray(self._order)[ranks].tolist()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Backend modules import each other by bare name, as they do when run from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def client():
+    """Test client for the app, with no responses cached by earlier tests"""
+    # Imported here so tests that never make requests do not load the app and its catalog
+    import main
+    from fastapi.testclient import TestClient
+    main.RESPONSE_CACHE.clear()
+    return TestClient(main.app)
@@ -0,0 +1,48 @@
+
+import main
+from data import get_catalog
+
+
+def ids_of(body):
+    return [service["id"] for service in body["services"]]
+
+
+def test_services_come_back_in_request_order(client):
+    body = client.get("/api/services/batch?ids=s3,lambda,ec2").json()
+    assert ids_of(body) == ["s3", "lambda", "ec2"]
+    assert body["services"][0] == get_catalog().get("s3").model_dump(mode="json")
+    assert body["missing"] == []
+
+
+def test_unknown_ids_are_listed_as_missing(client):
+    body = client.get("/api/services/batch?ids=nope,s3,also-nope").json()
+    assert ids_of(body) == ["s3"]
+    assert body["missing"] == ["nope", "also-nope"]
+
+    body = client.get("/api/services/batch?ids=nope").json()
+    assert body == {"services": [], "missing": ["nope"]}
+
+
+def test_duplicates_and_blanks_are_dropped(client):
+    body = client.get("/api/services/batch?ids=s3, s3,,lambda ,nope,nope").json()
+    assert ids_of(body) == ["s3", "lambda"]
+    assert body["missing"] == ["nope"]
+
+
+def test_post_matches_get(client):
+    posted = client.post("/api/services/batch", json={"service_ids": ["ec2", "nope", "rds"]}).json()
+    assert posted == client.get("/api/services/batch?ids=ec2,nope,rds").json()
+
+
+def test_batch_size_limit(client):
+    ids = [f"svc-{index}" for index in range(main.MAX_BATCH_SERVICES)]
+    assert client.post("/api/services/batch", json={"service_ids": ids}).status_code == 200
+    # The limit applies after duplicates are dropped
+    assert client.post("/api/services/batch", json={"service_ids": ids + ids[:1]}).status_code == 200
+    response = client.post("/api/services/batch", json={"service_ids": ids + ["one-more"]})
+    assert response.status_code == 400
+    assert client.get("/api/services/batch?ids=" + ",".join(ids + ["one-more"])).status_code == 400
+
+
+def test_batch_route_is_not_a_service_id(client):
+    assert client.get("/api/services/batch").status_code == 422
@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+from cache import ResponseCache
+from compression import EncodedBody
+
+
+def body(text: str) -> EncodedBody:
+    return EncodedBody(text.encode())
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(maxsize=2)
+    cache.put(1, "a", body("a"))
+    cache.put(1, "b", body("b"))
+    # Touching "a" makes "b" the eviction candidate
+    assert cache.get(1, "a").identity == b"a"
+    cache.put(1, "c", body("c"))
+    assert len(cache) == 2
+    assert cache.get(1, "b") is None
+    assert cache.get(1, "a").identity == b"a"
+    assert cache.get(1, "c").identity == b"c"
+
+
+def test_newer_version_invalidates_entries():
+    cache = ResponseCache()
+    cache.put(1, "a", body("old"))
+    assert cache.get(2, "a") is None
+    cache.put(2, "a", body("new"))
+    assert cache.get(2, "a").identity == b"new"
+
+
+def test_outdated_version_neither_reads_nor_writes():
+    cache = ResponseCache()
+    cache.put(2, "a", body("current"))
+    assert cache.get(1, "a") is None
+    cache.put(1, "a", body("stale"))
+    assert cache.get(2, "a").identity == b"current"
+
+
+def test_stats_count_hits_and_misses_but_not_peeks():
+    cache = ResponseCache(maxsize=4)
+    cache.put(1, "a", body("a"))
+    cache.get(1, "a")
+    cache.get(1, "b")
+    assert cache.peek(1, "a").identity == b"a"
+    assert cache.peek(1, "b") is None
+    assert cache.stats() == {
+        "size": 1, "maxsize": 4, "bytes": 1, "max_bytes": None, "hits": 1, "misses": 1, "hit_ratio": 0.5,
+    }
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = ResponseCache(maxsize=10, max_bytes=2500)
+    for key in "abc":
+        cache.put(1, key, EncodedBody(b"x" * 1000))
+    assert cache.get(1, "a") is None
+    assert cache.nbytes == 2000 and len(cache) == 2
+    # Replacing an entry counts only its new body
+    cache.put(1, "b", EncodedBody(b"y" * 500))
+    assert cache.nbytes == 1500
+
+
+def test_compressed_variants_count_against_the_budget():
+    cache = ResponseCache(maxsize=10, max_bytes=3000)
+    incompressible = EncodedBody(os.urandom(1400))
+    cache.put(1, "a", incompressible)
+    cache.put(1, "b", EncodedBody(b"z" * 1400))
+    assert cache.nbytes == 2800
+
+    cache.get(1, "a")
+    incompressible.variant("gzip")
+    assert incompressible.nbytes > 2800
+    # The grown entry stays; "b", now least recently used, makes room
+    assert cache.get(1, "b") is None
+    assert cache.nbytes == incompressible.nbytes
+
+
+def test_bodies_over_the_budget_are_not_cached():
+    cache = ResponseCache(max_bytes=100)
+    cache.put(1, "small", body("ok"))
+    cache.put(1, "large", EncodedBody(b"x" * 101))
+    assert cache.get(1, "large") is None
+    assert cache.get(1, "small").identity == b"ok"
+
+
+def test_evicted_and_invalidated_bodies_stop_reporting_growth():
+    cache = ResponseCache(maxsize=1)
+    evicted = EncodedBody(b"x" * 2000)
+    cache.put(1, "a", evicted)
+    cache.put(1, "b", body("b"))
+    evicted.variant("gzip")
+    assert evicted.on_resize is None
+    assert cache.nbytes == 1
+
+    current = EncodedBody(b"x" * 2000)
+    cache.put(1, "c", current)
+    cache.get(2, "c")
+    current.variant("gzip")
+    assert cache.nbytes == 0
+
+
+@pytest.mark.parametrize("arguments", [{"maxsize": 0}, {"max_bytes": 0}])
+def test_limits_must_be_positive(arguments):
+    with pytest.raises(ValueError):
+        ResponseCache(**arguments)
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+import data
+from catalog import ServiceCatalog, intersect_postings, make_posting
+from models import AWSService, PricingModel, ServiceCategory
+
+SIZE = 120
+
+
+def make_services():
+    rng = random.Random(3)
+    return [
+        AWSService(
+            id=f"svc-{index}",
+            name=f"Service {index}",
+            description=f"Handles {rng.choice(['queues', 'streams', 'tables'])}",
+            category=rng.choice(list(ServiceCategory)),
+            key_features=["Auto Scaling"],
+            pricing_notes="Priced per request.",
+            pricing_models=rng.sample(list(PricingModel), rng.randint(1, 3)),
+            use_cases=["testing"],
+            free_tier_available=rng.random() < 0.5,
+        )
+        for index in range(SIZE)
+    ]
+
+
+@pytest.fixture(scope="module")
+def services():
+    return make_services()
+
+
+@pytest.fixture(scope="module")
+def catalog(services) -> ServiceCatalog:
+    return ServiceCatalog(services)
+
+
+def test_lookups_by_id(services, catalog):
+    assert len(catalog) == SIZE
+    assert "svc-7" in catalog
+    assert "svc-missing" not in catalog
+    assert catalog.get("svc-7") == services[7]
+    assert catalog.get("svc-missing") is None
+    assert catalog.position_of("svc-7") == 7
+    assert catalog.position_of("svc-missing") is None
+    assert catalog.service_id(7) == "svc-7"
+
+
+@pytest.mark.parametrize("category", [None, ServiceCategory.DATABASE, ServiceCategory.IOT])
+@pytest.mark.parametrize("free_tier", [None, True, False])
+def test_filters_match_linear_scan(services, catalog, category, free_tier):
+    expected = [
+        position for position, service in enumerate(services)
+        if (category is None or service.category == category)
+        and (free_tier is None or service.free_tier_available == free_tier)
+    ]
+    assert list(catalog.positions(category=category, free_tier=free_tier)) == expected
+    assert catalog.filter(category=category, free_tier=free_tier) == [services[position] for position in expected]
+
+
+def test_by_category_and_pricing_model(services, catalog):
+    for category in ServiceCategory:
+        assert catalog.by_category(category) == [service for service in services if service.category == category]
+    for pricing_model in PricingModel:
+        assert catalog.by_pricing_model(pricing_model) == frozenset(
+            service.id for service in services if pricing_model in service.pricing_models
+        )
+    assert catalog.by_free_tier(True) == [service for service in services if service.free_tier_available]
+
+
+def test_search_respects_filters(services, catalog):
+    matches = catalog.search_positions("queues", category=ServiceCategory.DATABASE, free_tier=True)
+    expected = {
+        position for position, service in enumerate(services)
+        if "queues" in service.description
+        and service.category == ServiceCategory.DATABASE and service.free_tier_available
+    }
+    assert set(matches) == expected
+
+
+def test_intersect_postings():
+    postings = [make_posting([1, 3, 5, 7, 9]), make_posting([3, 4, 5]), make_posting([5, 3, 100])]
+    assert intersect_postings(postings) == (3, 5)
+    assert intersect_postings(postings[:1]) == (1, 3, 5, 7, 9)
+
+
+def test_duplicate_ids_are_rejected(services):
+    with pytest.raises(ValueError, match="Duplicate service id"):
+        ServiceCatalog([services[0], services[1], services[0]])
+
+
+def test_fingerprint_follows_content(services, catalog):
+    assert ServiceCatalog(services, version=2).fingerprint == catalog.fingerprint
+    changed = [services[0].model_copy(update={"name": "Renamed"})] + services[1:]
+    assert ServiceCatalog(changed).fingerprint != catalog.fingerprint
+
+
+def test_data_helpers_read_the_current_snapshot():
+    catalog = data.get_catalog()
+    assert data.get_service_by_id("lambda") == catalog.get("lambda")
+    assert data.get_services_by_category(ServiceCategory.DATABASE) == catalog.by_category(ServiceCategory.DATABASE)
+    assert [service.id for service in data.get_all_services()] == [catalog.service_id(position) for position in range(len(catalog))]
+    assert data.get_all_categories() == list(ServiceCategory)
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+import main
+from comparison import ComparisonIndex, pricing_mask, pricing_models_from_mask
+from models import AWSService, PricingModel, ServiceCategory
+
+TERMS = ["Auto Scaling", "auto scaling", "Encryption", "Backups", "Replication", "SQL", "Streams", "IAM"]
+
+
+def make_services(count=40):
+    rng = random.Random(11)
+    return [
+        AWSService(
+            id=f"svc-{index}",
+            name=f"Service {index}",
+            description="A service",
+            category=rng.choice(list(ServiceCategory)),
+            key_features=rng.sample(TERMS, rng.randint(1, 5)),
+            pricing_notes="Priced per request.",
+            pricing_models=rng.sample(list(PricingModel), rng.randint(1, 3)),
+            use_cases=["testing"],
+            limitations=rng.sample(TERMS, rng.randint(0, 3)) or None,
+            free_tier_available=rng.random() < 0.5,
+            region_availability=rng.choice(["Global", "Regional"]),
+        )
+        for index in range(count)
+    ]
+
+
+def folded(terms):
+    return {term.casefold() for term in terms}
+
+
+def check_sets(comparison, services, attribute):
+    term_sets = [folded(getattr(service, attribute) or ()) for service in services]
+    assert folded(comparison.shared) == set.intersection(*term_sets)
+    assert len(comparison.shared) == len(folded(comparison.shared))
+    for index, service in enumerate(services):
+        others = set().union(*(terms for other, terms in enumerate(term_sets) if other != index))
+        assert folded(comparison.unique[service.id]) == term_sets[index] - others
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matrix_matches_brute_force(seed):
+    services = make_services()
+    index = ComparisonIndex(services)
+    positions = random.Random(seed).sample(range(len(services)), random.Random(seed).randint(2, 6))
+    compared = [services[position] for position in positions]
+    matrix = index.compare(compared, positions)
+
+    check_sets(matrix.key_features, compared, "key_features")
+    check_sets(matrix.limitations, compared, "limitations")
+
+    model_sets = [set(service.pricing_models) for service in compared]
+    common = set.intersection(*model_sets)
+    assert set(matrix.pricing_models.common) == common
+    assert pricing_models_from_mask(matrix.pricing_models.union_bits) == [
+        model for model in PricingModel if model in set.union(*model_sets)
+    ]
+    for service, models in zip(compared, model_sets):
+        assert matrix.pricing_models.bits[service.id] == pricing_mask(models)
+        assert set(matrix.pricing_models.differences[service.id]) == models - common
+
+    assert matrix.free_tier_differs == (len({service.free_tier_available for service in compared}) > 1)
+    assert matrix.region_availability == {service.id: service.region_availability for service in compared}
+
+
+def test_get_and_post_agree(client):
+    listed = client.get("/api/compare?service_ids=ec2,lambda,s3").json()
+    posted = client.post("/api/compare", json={"service_ids": ["ec2", "lambda", "s3"]}).json()
+    assert listed == posted
+    assert [service["id"] for service in listed["services"]] == ["ec2", "lambda", "s3"]
+    assert listed["comparison_count"] == 3
+    assert listed["comparison_criteria"] == main.COMPARISON_CRITERIA
+
+
+def test_duplicate_ids_are_compared_once(client):
+    response = client.get("/api/compare?service_ids=ec2, lambda,ec2,")
+    assert response.status_code == 200
+    assert response.json()["comparison_count"] == 2
+
+
+@pytest.mark.parametrize("ids, status", [
+    (["ec2"], 400),
+    (["ec2", "ec2"], 400),
+    (["ec2", "missing"], 404),
+    ([f"svc-{index}" for index in range(101)], 400),
+])
+def test_invalid_comparisons(client, ids, status):
+    assert client.post("/api/compare", json={"service_ids": ids}).status_code == status
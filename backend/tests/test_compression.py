@@ -0,0 +1,60 @@
+import gzip
+
+import pytest
+
+from compression import MIN_COMPRESS_SIZE, EncodedBody, negotiate_encoding, variant_etag
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("identity", None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_small_bodies_stay_identity():
+    body = EncodedBody(b"x" * (MIN_COMPRESS_SIZE - 1))
+    assert body.applied_encoding("gzip") is None
+    assert body.variant("gzip") == (body.identity, None)
+
+    large = EncodedBody(b"x" * MIN_COMPRESS_SIZE)
+    assert large.applied_encoding("gzip") == "gzip"
+    compressed, applied = large.variant("gzip")
+    assert applied == "gzip"
+    assert gzip.decompress(compressed) == large.identity
+    # Compressed once, then reused
+    assert large.variant("gzip")[0] is compressed
+
+
+def etags(client, path):
+    return {
+        encoding: client.get(path, headers={"Accept-Encoding": encoding}).headers["etag"]
+        for encoding in ("identity", "gzip", "br")
+    }
+
+
+def test_small_response_has_one_etag(client):
+    # The categories body is sent uncompressed whatever the client accepts
+    tags = etags(client, "/api/categories")
+    assert len(set(tags.values())) == 1
+    response = client.get("/api/categories", headers={"Accept-Encoding": "gzip", "If-None-Match": tags["identity"]})
+    assert response.status_code == 304
+
+
+def test_compressed_responses_have_their_own_etags(client):
+    tags = etags(client, "/api/services")
+    assert tags["gzip"] == variant_etag(tags["identity"], "gzip")
+    assert tags["br"] == variant_etag(tags["identity"], "br")
+    # An identity copy does not validate the gzip representation
+    response = client.get("/api/services", headers={"Accept-Encoding": "gzip", "If-None-Match": tags["identity"]})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    response = client.get("/api/services", headers={"Accept-Encoding": "gzip", "If-None-Match": tags["gzip"]})
+    assert response.status_code == 304
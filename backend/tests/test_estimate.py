@@ -0,0 +1,189 @@
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import estimate
+import main
+from estimate import DIMENSIONS, PricingTable, cheapest, usage_matrix
+from models import AWSService, PricingDimensions, PricingModel, ServiceCategory, UsageScenario
+
+SIZE = 60
+
+
+def make_services():
+    rng = random.Random(11)
+    services = []
+    for index in range(SIZE):
+        kind = index % 6
+        if kind == 0:
+            pricing = None
+        elif kind == 1:
+            # Priced, but free on every dimension
+            pricing = PricingDimensions(free_requests_per_month=1000)
+        else:
+            pricing = PricingDimensions(
+                # Each service bills a random subset of the dimensions, so some bill none a scenario uses
+                per_request=rng.choice([0.0, rng.uniform(1e-7, 1e-5)]),
+                per_gb_month=rng.choice([0.0, rng.uniform(0.01, 0.5)]),
+                per_hour=rng.choice([0.0, rng.uniform(0.001, 0.2)]) if kind != 2 else 0.0,
+                free_requests_per_month=rng.choice([0.0, 1e6]),
+                free_gb_months_per_month=rng.choice([0.0, 5.0]),
+                free_hours_per_month=rng.choice([0.0, 750.0]),
+            )
+        services.append(AWSService(
+            id=f"svc-{index}",
+            name=f"Service {index}",
+            description="For estimates",
+            category=ServiceCategory.COMPUTE,
+            key_features=[],
+            pricing_notes="",
+            pricing_models=[PricingModel.PAY_PER_USE],
+            use_cases=[],
+            pricing=pricing,
+        ))
+    return services
+
+
+def make_usage(count):
+    rng = random.Random(5)
+    scenarios = [UsageScenario()]
+    for _ in range(count - 1):
+        scenarios.append(UsageScenario(
+            requests=rng.choice([0.0, rng.uniform(0, 1e8)]),
+            gb_months=rng.choice([0.0, rng.uniform(0, 100)]),
+            hours=rng.choice([0.0, rng.uniform(0, 2000)]),
+        ))
+    return usage_matrix(scenarios)
+
+
+def brute_force(services, usage, positions):
+    """Cost and cheapest competing column per scenario, one service at a time"""
+    costs = np.zeros((len(usage), len(positions)))
+    columns = []
+    for row, scenario in enumerate(usage.tolist()):
+        best = None
+        for column, position in enumerate(positions):
+            pricing = services[position].pricing
+            rates = [pricing.per_request, pricing.per_gb_month, pricing.per_hour]
+            allowances = [pricing.free_requests_per_month, pricing.free_gb_months_per_month, pricing.free_hours_per_month]
+            costs[row, column] = sum(max(used - allowance, 0.0) * rate for used, allowance, rate in zip(scenario, allowances, rates))
+            billed = any(used > 0 and rate > 0 for used, rate in zip(scenario, rates))
+            if billed and (best is None or costs[row, column] < costs[row, best]):
+                best = column
+        columns.append(-1 if best is None else best)
+    return costs, columns
+
+
+@pytest.fixture(scope="module")
+def services():
+    return make_services()
+
+
+@pytest.fixture(scope="module")
+def table(services):
+    return PricingTable(services)
+
+
+def test_default_positions_are_metered(services, table):
+    expected = [
+        position for position, service in enumerate(services)
+        if service.pricing is not None and (service.pricing.per_request or service.pricing.per_gb_month or service.pricing.per_hour)
+    ]
+    assert list(table.positions) == expected
+    assert 0 not in table
+    # Free services can still be asked for by id
+    assert 1 in table
+
+
+@pytest.mark.parametrize("block_cells", [estimate.BLOCK_CELLS, 1, 100])
+def test_matches_brute_force(services, table, monkeypatch, block_cells):
+    # Small blocks exercise the scenario loop and its last partial block
+    monkeypatch.setattr(estimate, "BLOCK_CELLS", block_cells)
+    usage = make_usage(40)
+    costs, columns = table.estimate(usage)
+    expected_costs, expected_columns = brute_force(services, usage, table.positions)
+    assert costs.shape == (len(usage), len(table.positions))
+    np.testing.assert_allclose(costs, expected_costs, rtol=1e-12)
+    # Ties resolve to the first column, as argmin does
+    assert columns.tolist() == expected_columns
+
+
+def test_requested_positions(services, table):
+    positions = [7, 1, 3]
+    usage = make_usage(10)
+    costs, columns = table.estimate(usage, positions)
+    expected_costs, expected_columns = brute_force(services, usage, positions)
+    np.testing.assert_allclose(costs, expected_costs, rtol=1e-12)
+    assert columns.tolist() == expected_columns
+    # The free service costs nothing but never competes
+    assert not costs[:, 1].any()
+    assert 1 not in columns.tolist()
+
+
+def test_no_usage_has_no_cheapest(table):
+    costs, columns = table.estimate(usage_matrix([UsageScenario()]))
+    assert not costs.any()
+    assert columns.tolist() == [-1]
+
+
+def test_no_services(table):
+    usage = make_usage(3)
+    costs, columns = table.estimate(usage, [])
+    assert costs.shape == (3, 0)
+    assert columns.tolist() == [-1, -1, -1]
+
+
+def test_cheapest_ids():
+    assert cheapest(np.array([2, -1, 0]), ["a", "b", "c"]) == ["c", None, "a"]
+
+
+def test_usage_matrix_shape():
+    assert usage_matrix([]).shape == (0, len(DIMENSIONS))
+    assert usage_matrix([UsageScenario(requests=1, hours=3)]).tolist() == [[1.0, 0.0, 3.0]]
+
+
+def test_endpoint_caps_cells(monkeypatch):
+    client = TestClient(main.app)
+    catalog = main.get_catalog()
+    width = catalog.estimate_width()
+    monkeypatch.setattr(main, "MAX_ESTIMATE_CELLS", 2 * width)
+    scenarios = [{"requests": 1000}] * 3
+    response = client.post("/api/estimate", json={"scenarios": scenarios})
+    assert response.status_code == 400
+    assert "service_ids" in response.json()["detail"]
+    # Fewer services fit the same scenarios under the cap
+    service_ids = [catalog.service_id(position) for position in range(len(catalog)) if catalog.is_priced(position)][:2]
+    response = client.post("/api/estimate", json={"scenarios": scenarios, "service_ids": service_ids})
+    assert response.status_code == 200
+    assert response.json()["service_ids"] == service_ids
+
+
+def test_endpoint_requires_services_when_listed():
+    client = TestClient(main.app)
+    response = client.post("/api/estimate", json={"scenarios": [{"requests": 1000}], "service_ids": []})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "At least 1 service id is required, or omit service_ids"
+    response = client.post("/api/estimate", json={"scenarios": [{"requests": 1000}]})
+    assert response.status_code == 200
+    assert response.json()["service_ids"]
+
+
+@pytest.mark.parametrize("usage", [
+    {"requests": "inf"},
+    {"hours": "-inf"},
+    {"gb_months": "nan"},
+    {"requests": 1e308},
+    {"hours": -1},
+])
+def test_endpoint_rejects_unbounded_usage(usage):
+    response = TestClient(main.app).post("/api/estimate", json={"scenarios": [usage]})
+    assert response.status_code == 422
+
+
+def test_pricing_must_be_finite():
+    with pytest.raises(ValueError):
+        PricingDimensions(per_hour=float("inf"))
+    with pytest.raises(ValueError):
+        PricingDimensions(free_requests_per_month=1e308)
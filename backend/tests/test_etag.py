@@ -0,0 +1,76 @@
+import pytest
+
+import cache
+import main
+from cache import etag_matches, make_etag
+
+PATHS = [
+    "/api/services",
+    "/api/services?category=Database&limit=1",
+    "/api/services/lambda",
+    "/api/services/lambda/similar",
+    "/api/services/batch?ids=s3,ec2",
+    "/api/services/category/Storage",
+    "/api/categories",
+    "/api/facets",
+    "/api/compare?service_ids=s3,ec2",
+]
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ('"xyz"', False),
+    ("*", True),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_make_etag_depends_on_every_part():
+    assert make_etag("fp", ("list", 1)) == make_etag("fp", ("list", 1))
+    assert make_etag("fp", ("list", 1)) != make_etag("fp", ("list", 2))
+    assert make_etag("fp", ("list", 1)) != make_etag("other", ("list", 1))
+
+
+def test_make_etag_depends_on_response_format(monkeypatch):
+    etag = make_etag("fp", ("list", 1))
+    monkeypatch.setattr(cache, "RESPONSE_FORMAT", cache.RESPONSE_FORMAT + 1)
+    assert make_etag("fp", ("list", 1)) != etag
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_matching_etag_answers_not_modified(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == main.CACHE_CONTROL
+
+    revalidated = client.get(path, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+    assert client.get(path, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert client.get(path, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_etags_differ_between_queries(client):
+    assert len({client.get(path).headers["etag"] for path in PATHS}) == len(PATHS)
+
+
+def test_not_modified_before_the_cache_is_warm(client):
+    etag = client.get("/api/services/s3").headers["etag"]
+    main.RESPONSE_CACHE.clear()
+    assert client.get("/api/services/s3", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_response_format_change_invalidates_etags(client, monkeypatch):
+    etag = client.get("/api/services").headers["etag"]
+    monkeypatch.setattr(cache, "RESPONSE_FORMAT", cache.RESPONSE_FORMAT + 1)
+    response = client.get("/api/services", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+import main
+from data import get_catalog
+
+
+def exported(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.text.endswith("\n")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 256])
+def test_export_streams_every_service_in_catalog_order(client, monkeypatch, chunk_size):
+    monkeypatch.setattr(main, "EXPORT_CHUNK_SIZE", chunk_size)
+    catalog = get_catalog()
+    lines = exported(client.get("/api/services/export", headers={"Accept-Encoding": "identity"}))
+    assert lines == [catalog.get(catalog.service_id(position)).model_dump(mode="json") for position in range(len(catalog))]
+
+
+@pytest.mark.parametrize("query", [
+    "category=Database",
+    "free_tier=false",
+    "search=storage",
+    "search=lamda&search_mode=fuzzy",
+])
+def test_export_matches_list_endpoint(client, query):
+    listed = client.get(f"/api/services?{query}&limit=100").json()["services"]
+    assert exported(client.get(f"/api/services/export?{query}")) == listed
+
+
+def test_export_is_gzipped_when_accepted(client):
+    response = client.get("/api/services/export", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    # The client transparently decodes the stream
+    assert len(exported(response)) == len(get_catalog())
+
+    plain = client.get("/api/services/export", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in plain.headers
+
+
+def test_export_rejects_unknown_category(client):
+    assert client.get("/api/services/export?category=Nope").status_code == 400
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from facets import FacetIndex, positions_bitmap
+from models import AWSService, PricingModel, ServiceCategory
+
+SIZE = 300
+
+
+def make_services():
+    rng = random.Random(5)
+    return [
+        AWSService(
+            id=f"svc-{index}",
+            name=f"Service {index}",
+            description="A service",
+            category=rng.choice(list(ServiceCategory)),
+            key_features=[],
+            pricing_notes="",
+            # Duplicates must only be counted once
+            pricing_models=rng.choices(list(PricingModel), k=rng.randint(1, 3)),
+            use_cases=[],
+            free_tier_available=rng.random() < 0.3,
+        )
+        for index in range(SIZE)
+    ]
+
+
+SERVICES = make_services()
+INDEX = FacetIndex(SERVICES)
+
+
+def brute_force(category, free_tier, matches):
+    def keep(service, position, skip=None):
+        return (
+            position in matches
+            and (skip == "category" or category is None or service.category == category)
+            and (skip == "free_tier" or free_tier is None or service.free_tier_available == free_tier)
+        )
+
+    rows = list(enumerate(SERVICES))
+    return {
+        "total_count": sum(keep(service, position) for position, service in rows),
+        "categories": {
+            key: sum(keep(service, position, "category") and service.category == key for position, service in rows)
+            for key in ServiceCategory
+        },
+        "pricing_models": {
+            key: sum(keep(service, position) and key in service.pricing_models for position, service in rows)
+            for key in PricingModel
+        },
+        "free_tier": {
+            key: sum(keep(service, position, "free_tier") and service.free_tier_available == key for position, service in rows)
+            for key in (True, False)
+        },
+    }
+
+
+@pytest.mark.parametrize("category", [None, ServiceCategory.STORAGE, ServiceCategory.DATABASE])
+@pytest.mark.parametrize("free_tier", [None, True, False])
+@pytest.mark.parametrize("restricted", [False, True])
+def test_counts_match_brute_force(category, free_tier, restricted):
+    matches = set(random.Random(9).sample(range(SIZE), 120)) if restricted else set(range(SIZE))
+    counts = INDEX.counts(category, free_tier, positions_bitmap(matches, SIZE) if restricted else None)
+    assert counts.model_dump() == brute_force(category, free_tier, matches)
+
+
+def test_positions_bitmap():
+    assert positions_bitmap([], 10) == 0
+    assert positions_bitmap([0, 3, 9], 10) == 0b1000001001
+
+
+@pytest.mark.parametrize("query", ["", "category=Database", "free_tier=false", "search=storage", "search=data&category=Database"])
+def test_facets_agree_with_list_endpoint(query):
+    client = TestClient(main.app)
+    facets = client.get(f"/api/facets?{query}").json()
+    listed = client.get(f"/api/services?{query}&limit=100").json()
+    assert facets["total_count"] == listed["total_count"]
+    for key, count in facets["pricing_models"].items():
+        assert count == sum(key in service["pricing_models"] for service in listed["services"])
@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from catalog import ServiceCatalog
+from fuzzy import FuzzyIndex, prefix_distance, prefix_matches
+from models import AWSService, PricingModel, SearchMode, ServiceCategory
+
+
+@pytest.mark.parametrize("query, term, limit, expected", [
+    ("lambda", "lambda", 2, 0),
+    # Substitution, insertion and deletion each cost one
+    ("lambdo", "lambda", 2, 1),
+    ("lamda", "lambda", 1, 1),
+    ("lammbda", "lambda", 2, 1),
+    # Adjacent transpositions cost one, not two
+    ("dyanmo", "dynamo", 2, 1),
+    ("cloduwatch", "cloudwatch", 2, 1),
+    ("dyanmo", "dynamo", 1, 1),
+    # A query only has to match a prefix of the term
+    ("dyna", "dynamodb", 0, 0),
+    ("dyanmo", "dynamodb", 2, 1),
+    ("sagemkr", "sagemaker", 2, 2),
+    # but a term shorter than the query pays for the missing letters
+    ("lambda", "lamb", 2, 2),
+    ("lambda", "lam", 2, None),
+    # Over the limit is None
+    ("lambda", "kinesis", 2, None),
+    ("dyanmo", "dynamo", 0, None),
+])
+def test_prefix_distance(query, term, limit, expected):
+    assert prefix_distance(query, term, limit) == expected
+
+
+def test_prefix_matches_match_prefix_distance():
+    rng = random.Random(7)
+    for limit in (0, 1, 2):
+        for _ in range(50):
+            query = "".join(rng.choice("abcd") for _ in range(rng.randint(1, 8)))
+            terms = sorted({"".join(rng.choice("abcd") for _ in range(rng.randint(1, 12))) for _ in range(40)})
+            # Two ranges, so the walk restarts partway through
+            middle = len(terms) // 2
+            starts, stops, distances = prefix_matches(query, terms, [0, middle], [middle, len(terms)], limit)
+            found = {}
+            for start, stop, distance in zip(starts, stops, distances):
+                for position in range(start, stop):
+                    found[terms[position]] = distance
+            expected = {term: prefix_distance(query, term, limit) for term in terms}
+            assert found == {term: distance for term, distance in expected.items() if distance is not None}, (query, limit)
+
+
+def index(*names, features=()):
+    return FuzzyIndex({"id": f"svc-{position}", "name": name, "key_features": list(features)} for position, name in enumerate(names))
+
+
+def matched(fuzzy_index, query):
+    term_ids, _ = fuzzy_index.matching_terms(query)
+    return sorted(fuzzy_index._terms[term_id] for term_id in term_ids.tolist())
+
+
+def test_matching_terms_typos_and_prefixes():
+    fuzzy_index = index("Amazon DynamoDB", "Amazon CloudWatch", "AWS Lambda", "Amazon SageMaker")
+    assert "dynamodb" in matched(fuzzy_index, "dyanmo")
+    assert "sagemaker" in matched(fuzzy_index, "sagemkr")
+    assert "lambda" in matched(fuzzy_index, "lamda")
+    assert matched(fuzzy_index, "kinesis") == []
+
+
+def test_matching_terms_reports_every_match():
+    names = [f"Amazon Serverless{chr(ord('a') + first)}{chr(ord('a') + second)}" for first in range(10) for second in range(10)]
+    fuzzy_index = index(*names)
+    assert len(matched(fuzzy_index, "servrless")) == len(names)
+    assert len(fuzzy_index.search("servrless")) == len(names)
+
+
+def test_common_pattern_counts_every_match():
+    # Far more terms share the query's trigrams than any candidate cap would keep
+    suffixes = [f"{first}{second}{third}" for first in "abcdefghij" for second in "abcdefghij" for third in "abcdefg"]
+    names = [f"Amazon Serverless{suffix}" for suffix in suffixes]
+    # Decoys share leading trigrams but are three edits away
+    decoys = [f"Amazon Servxyzss{suffix}" for suffix in suffixes[:100]]
+    fuzzy_index = index(*names, *decoys)
+    assert len(matched(fuzzy_index, "servrless")) == len(names)
+    assert sorted(position for position, _ in fuzzy_index.search("servrless")) == list(range(len(names)))
+
+    catalog = ServiceCatalog([
+        AWSService(
+            id=f"svc-{position}",
+            name=name,
+            description="",
+            category=ServiceCategory.SERVERLESS,
+            key_features=[],
+            pricing_notes="",
+            pricing_models=[PricingModel.PAY_PER_USE],
+            use_cases=[],
+        )
+        for position, name in enumerate(names + decoys)
+    ])
+    assert len(catalog.query_positions("servrless", search_mode=SearchMode.FUZZY)) == len(names)
+
+
+def test_matching_terms_long_queries():
+    fuzzy_index = index("AWS Elastic Load Balancing Application Controller")
+    assert "awselasticloadbalancingapplicationcontroller" in matched(fuzzy_index, "awselasticloadbalancngapplicationcontroller")
+
+
+def test_search_joined_words_and_numbers():
+    fuzzy_index = index("Amazon CloudWatch", "Amazon EC2", "Amazon S3")
+    assert [position for position, _ in fuzzy_index.search("cloud watch")] == [0]
+    assert [position for position, _ in fuzzy_index.search("ec2")] == [1]
+    assert fuzzy_index.search("ec3") == []
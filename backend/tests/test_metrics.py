@@ -0,0 +1,73 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from metrics import CONTENT_TYPE, LATENCY_BUCKETS, MetricsRegistry, format_labels
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})? (\S+)$')
+
+
+def parse(text):
+    """Samples keyed by name and label string, checking each belongs to a declared family"""
+    assert text.endswith("\n")
+    types = {}
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, metric_type = line.split(" ")
+            types[name] = metric_type
+        elif not line.startswith("# HELP "):
+            name, labels, value = SAMPLE.match(line).groups()
+            family = re.sub(r"_(bucket|sum|count)$", "", name) if types.get(name) is None else name
+            assert family in types, line
+            samples[name, labels or ""] = float(value)
+    return types, samples
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(prefix="test")
+    for duration in (0.0001, 0.003, 0.003, 0.2, 60.0):
+        registry.observe_request("/a", "GET", 200, duration, 10)
+    registry.observe_request("/a", "GET", 404, 0.001, 10)
+    types, samples = parse(registry.render())
+
+    assert types["test_request_duration_seconds"] == "histogram"
+    labels = '{route="/a",method="GET",le="%s"}'
+    counts = [samples["test_request_duration_seconds_bucket", labels % repr(bound)] for bound in LATENCY_BUCKETS]
+    assert counts == sorted(counts)
+    assert samples["test_request_duration_seconds_bucket", labels % "0.001"] == 2
+    assert samples["test_request_duration_seconds_bucket", labels % "5.0"] == 5
+    assert samples["test_request_duration_seconds_bucket", labels % "+Inf"] == 6
+    assert samples["test_request_duration_seconds_count", '{route="/a",method="GET"}'] == 6
+    assert samples["test_request_duration_seconds_sum", '{route="/a",method="GET"}'] == pytest.approx(60.2071)
+    assert samples["test_requests_total", '{route="/a",method="GET",status="200"}'] == 5
+    assert samples["test_requests_total", '{route="/a",method="GET",status="404"}'] == 1
+
+
+def test_callbacks_and_label_escaping():
+    registry = MetricsRegistry(prefix="test")
+    registry.register_callback("hits_total", "Hits.", lambda: 3, metric_type="counter")
+    registry.register_callback("sizes", "Sizes.", lambda: {(("shard", 'a"b\\c\n'),): 1.5})
+    types, samples = parse(registry.render())
+    assert types["test_hits_total"] == "counter"
+    assert samples["test_hits_total", ""] == 3
+    assert samples["test_sizes", '{shard="a\\"b\\\\c\\n"}'] == 1.5
+    assert format_labels(()) == ""
+
+
+def test_metrics_endpoint_labels_routes_by_template():
+    client = TestClient(main.app)
+    client.get("/api/services/lambda")
+    client.get("/api/services/s3")
+    client.get("/no/such/route")
+    response = client.get("/metrics")
+    assert response.headers["content-type"] == CONTENT_TYPE
+
+    types, samples = parse(response.text)
+    assert types["catalog_api_requests_total"] == "counter"
+    assert samples["catalog_api_requests_total", '{route="/api/services/{service_id}",method="GET",status="200"}'] >= 2
+    assert samples["catalog_api_requests_total", '{route="unmatched",method="GET",status="404"}'] >= 1
+    assert not any('route="/api/services/lambda"' in labels for _, labels in samples)
+    assert samples["catalog_api_catalog_services", ""] == len(main.get_catalog())
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+from offload import PoolSaturated, PoolTimeout, WorkerPool
+
+
+def thread_name() -> str:
+    return threading.current_thread().name
+
+
+def test_runs_on_worker_thread():
+    pool = WorkerPool(workers=1, queue_depth=0, timeout=1)
+    try:
+        assert asyncio.run(pool.run(thread_name)).startswith("offload")
+        assert pool.stats()["completed"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_rejects_beyond_queue_depth():
+    pool = WorkerPool(workers=1, queue_depth=1, timeout=1)
+    release = threading.Event()
+
+    async def scenario():
+        # One query holds the only worker and a second waits in the queue
+        running = asyncio.ensure_future(pool.run(release.wait))
+        queued = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        with pytest.raises(PoolSaturated):
+            await pool.run(thread_name)
+        release.set()
+        await asyncio.gather(running, queued)
+        # Capacity comes back once the backlog drains
+        return await pool.run(thread_name)
+
+    try:
+        assert asyncio.run(scenario()).startswith("offload")
+        assert pool.stats()["rejected"] == 1
+        assert pool.stats()["completed"] == 3
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_timeout():
+    pool = WorkerPool(workers=1, queue_depth=0, timeout=0.05)
+    try:
+        with pytest.raises(PoolTimeout):
+            asyncio.run(pool.run(time.sleep, 0.3))
+        assert pool.stats()["timeouts"] == 1
+        # The timed-out query keeps its thread, and its queue slot, until it returns
+        assert pool.pending == 1
+        time.sleep(0.4)
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+
+@pytest.fixture
+def worker_pool(monkeypatch):
+    pool = WorkerPool(workers=1, queue_depth=0, timeout=0.05)
+    monkeypatch.setattr(main, "WORKER_POOL", pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_run_query_dispatches_on_cost(worker_pool):
+    assert asyncio.run(main.run_query(main.OFFLOAD_COST - 1, thread_name)) == "MainThread"
+    assert asyncio.run(main.run_query(main.OFFLOAD_COST, thread_name)).startswith("offload")
+
+
+def test_run_query_answers_503(worker_pool):
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(main.run_query(main.OFFLOAD_COST, time.sleep, 0.3))
+    assert raised.value.status_code == 503
+    assert raised.value.headers["Retry-After"] == "1"
+    time.sleep(0.4)
+
+    release = threading.Event()
+
+    async def saturated():
+        running = asyncio.ensure_future(worker_pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        try:
+            await main.run_query(main.OFFLOAD_COST, thread_name)
+        finally:
+            release.set()
+            await running
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(saturated())
+    assert raised.value.status_code == 503
+
+
+def test_pool_survives_repeated_lifespans(monkeypatch):
+    # Every query is expensive enough to offload
+    monkeypatch.setattr(main, "OFFLOAD_COST", 0)
+    completed = main.WORKER_POOL.completed
+    for _ in range(2):
+        main.RESPONSE_CACHE.clear()
+        with TestClient(main.app) as client:
+            response = client.get("/api/services", params={"search": "storage"})
+            assert response.status_code == 200
+            assert response.json()["total_count"] > 0
+    assert main.WORKER_POOL.completed >= completed + 2
@@ -0,0 +1,142 @@
+import base64
+import json
+
+import pytest
+
+import main
+from catalog import ServiceCatalog
+from data import get_catalog
+from pagination import InvalidCursor, decode_cursor, encode_cursor, page_bounds
+
+FINGERPRINT = "3f2a9c0d51e7b6a48c2f0e1d9b7a6c5d4e3f2a1b0c9d8e7f6a5b4c3d2e1f0a9b"
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("offset", [0, 1, 20, 99, 10 ** 9])
+def test_cursor_round_trip(offset):
+    cursor = encode_cursor(offset, FINGERPRINT)
+    # Safe in a query string as is
+    assert cursor.replace("-", "").replace("_", "").isalnum()
+    assert "=" not in cursor
+    assert decode_cursor(cursor, FINGERPRINT) == offset
+
+
+def test_cursor_from_another_snapshot():
+    cursor = encode_cursor(20, FINGERPRINT)
+    with pytest.raises(InvalidCursor, match="outdated"):
+        decode_cursor(cursor, "0" * 64)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor",
+    "!!!!",
+    # Valid base64 of something that is not JSON
+    base64.urlsafe_b64encode(b"offset=20").decode(),
+    raw_cursor([20, FINGERPRINT[:12]]),
+    raw_cursor({"o": 20}),
+    raw_cursor({"s": FINGERPRINT[:12]}),
+    raw_cursor({"o": -1, "s": FINGERPRINT[:12]}),
+    raw_cursor({"o": "20", "s": FINGERPRINT[:12]}),
+    raw_cursor({"o": 2.5, "s": FINGERPRINT[:12]}),
+    raw_cursor({"o": None, "s": FINGERPRINT[:12]}),
+    raw_cursor({"o": True, "s": FINGERPRINT[:12]}),
+])
+def test_tampered_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, FINGERPRINT)
+
+
+def test_edited_cursor_keeps_its_snapshot_check():
+    # Re-encoding with a new offset still has to name the current snapshot
+    payload = json.loads(base64.urlsafe_b64decode(encode_cursor(20, FINGERPRINT) + "=="))
+    assert decode_cursor(raw_cursor(dict(payload, o=40)), FINGERPRINT) == 40
+    with pytest.raises(InvalidCursor):
+        decode_cursor(raw_cursor(dict(payload, s="0" * 12)), FINGERPRINT)
+
+
+@pytest.mark.parametrize("total, offset, limit, expected", [
+    (45, 0, 20, (20, 20)),
+    (45, 20, 20, (40, 40)),
+    (45, 40, 20, (45, None)),
+    (40, 20, 20, (40, None)),
+    (45, 0, None, (45, None)),
+    (0, 0, 20, (0, None)),
+])
+def test_page_bounds(total, offset, limit, expected):
+    assert page_bounds(total, offset, limit) == expected
+
+
+def ids_of(body):
+    return [service["id"] for service in body["services"]]
+
+
+@pytest.mark.parametrize("query", ["", "&category=Database", "&search=storage", "&sort=name&order=desc"])
+def test_next_cursor_chains_through_every_page(client, query):
+    everything = client.get(f"/api/services?{query}").json()
+    assert everything["next_cursor"] is None
+
+    pages, cursor = [], ""
+    while True:
+        response = client.get(f"/api/services?limit=3{query}{cursor}")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total_count"] == everything["total_count"]
+        assert 0 < len(body["services"]) <= 3 or body["total_count"] == 0
+        pages.append(ids_of(body))
+        if body["next_cursor"] is None:
+            break
+        cursor = f"&cursor={body['next_cursor']}"
+    assert [service_id for page in pages for service_id in page] == ids_of(everything)
+    assert all(len(page) == 3 for page in pages[:-1])
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", raw_cursor({"o": -1, "s": "0" * 12})])
+def test_malformed_cursor_is_a_bad_request(client, cursor):
+    response = client.get("/api/services", params={"limit": 3, "cursor": cursor})
+    assert response.status_code == 400
+    assert "cursor" in response.json()["detail"].lower()
+
+
+def test_cursor_from_a_replaced_snapshot_is_a_bad_request(client, monkeypatch):
+    cursor = client.get("/api/services?limit=3").json()["next_cursor"]
+    assert client.get("/api/services", params={"limit": 3, "cursor": cursor}).status_code == 200
+
+    # A reload between pages: the cursor names the snapshot its offset was counted in
+    catalog = get_catalog()
+    reloaded = ServiceCatalog(catalog.materialize(range(len(catalog) - 1)), version=catalog.version + 1)
+    monkeypatch.setattr(main, "get_catalog", lambda: reloaded)
+    response = client.get("/api/services", params={"limit": 3, "cursor": cursor})
+    assert response.status_code == 400
+    assert "outdated" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("fields, expected", [
+    ("name", ["id", "name"]),
+    ("category,name", ["id", "name", "category"]),
+    (" name , id ,, free_tier_available", ["id", "name", "free_tier_available"]),
+    ("id", ["id"]),
+])
+def test_fields_project_every_service(client, fields, expected):
+    full = client.get("/api/services").json()
+    body = client.get("/api/services", params={"fields": fields}).json()
+    assert body["total_count"] == full["total_count"]
+    assert [list(service) for service in body["services"]] == [expected] * len(full["services"])
+    assert body["services"] == [{field: service[field] for field in expected} for service in full["services"]]
+
+
+def test_fields_apply_to_every_page(client):
+    first = client.get("/api/services", params={"limit": 3, "fields": "name"}).json()
+    second = client.get("/api/services", params={"limit": 3, "fields": "name", "cursor": first["next_cursor"]}).json()
+    full = client.get("/api/services", params={"limit": 6}).json()
+    assert first["services"] + second["services"] == [{"id": service["id"], "name": service["name"]} for service in full["services"]]
+
+
+@pytest.mark.parametrize("fields", ["nmae", "name,pricing_plan", "services"])
+def test_unknown_fields_are_a_bad_request(client, fields):
+    response = client.get("/api/services", params={"fields": fields})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Unknown fields:")
@@ -0,0 +1,77 @@
+import os
+import pickle
+
+from models import AWSService, PricingDimensions, PricingModel, ServiceCategory
+from records import Interner, ServiceRecords
+from store import load_services
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "catalog.json")
+
+
+def make_service(index, **fields):
+    values = dict(
+        id=f"svc-{index}",
+        name=f"Service {index}",
+        # Built at runtime so equal strings start out as distinct objects
+        description="".join(["Shared ", "description"]),
+        category=ServiceCategory.DATABASE,
+        key_features=["Auto " + "Scaling", "Backups"],
+        pricing_notes="Per request",
+        pricing_models=[PricingModel.PAY_PER_USE, PricingModel.FREE_TIER],
+        use_cases=[],
+    )
+    values.update(fields)
+    return AWSService(**values)
+
+
+SERVICES = [
+    make_service(0),
+    make_service(1, limitations=None, free_tier_available=True, documentation_url="https://example.com"),
+    make_service(2, category=ServiceCategory.IOT, pricing=PricingDimensions(per_request=2e-7, free_requests_per_month=1e6)),
+    make_service(3, pricing=PricingDimensions(), limitations=["Regional " + "only"]),
+]
+
+
+def test_records_round_trip_to_the_original_models():
+    for services in (SERVICES, load_services(CATALOG_PATH)):
+        records = ServiceRecords(services)
+        assert len(records) == len(services)
+        for position, service in enumerate(services):
+            record = records.record(position)
+            assert record == service
+            assert record.model_dump_json() == service.model_dump_json()
+
+
+def test_unpriced_services_keep_pricing_none():
+    records = ServiceRecords(SERVICES)
+    assert records.pricing_dimensions(0) is None
+    assert records.pricing_dimensions(2) == SERVICES[2].pricing
+    # Explicit all-zero pricing is not the same as no pricing
+    assert records.pricing_dimensions(3) == PricingDimensions()
+
+
+def test_repeated_values_share_one_object():
+    records = ServiceRecords(SERVICES)
+    assert records.descriptions[0] is records.descriptions[3]
+    assert records.key_features[0] is records.key_features[1]
+    assert records.pricing_models[0] is records.pricing_models[2]
+    assert records.key_features[0][0] is records.key_features[2][0]
+
+
+def test_records_hand_out_fresh_lists():
+    records = ServiceRecords(SERVICES)
+    records.record(0).key_features.append("Mutated")
+    assert records.record(0).key_features == SERVICES[0].key_features
+
+
+def test_interner():
+    intern = Interner()
+    first = intern("".join(["a", "b"]))
+    assert intern("".join(["a", "b"])) is first
+    assert intern.strings(None) is None
+    assert intern.strings(["x", "y"]) is intern.strings(["x", "y"])
+
+
+def test_records_survive_pickling():
+    records = pickle.loads(pickle.dumps(ServiceRecords(SERVICES)))
+    assert [records.record(position) for position in range(len(SERVICES))] == SERVICES
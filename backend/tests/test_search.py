@@ -0,0 +1,56 @@
+import pytest
+
+from search import SearchIndex, normalize_query, tokenize
+
+DOCUMENTS = [
+    {"name": "Amazon RDS", "description": "Managed relational database for MySQL and PostgreSQL", "key_features": ["Read replicas"]},
+    {"name": "Amazon DynamoDB", "description": "Serverless NoSQL Database", "key_features": ["Global tables"]},
+    {"name": "Amazon CloudWatch", "description": "Monitoring and observability", "use_cases": ["Log aggregation"]},
+    {"name": "Amazon S3", "description": "Object storage", "key_features": ["Lifecycle policies"]},
+]
+
+
+@pytest.fixture(scope="module")
+def index() -> SearchIndex:
+    return SearchIndex(DOCUMENTS)
+
+
+def positions(index, query):
+    return [position for position, _ in index.search(query)]
+
+
+def test_tokenize_and_normalize():
+    assert tokenize("Auto-Scaling, EC2!") == ["auto", "scaling", "ec2"]
+    assert normalize_query("Scaling auto AUTO") == normalize_query("auto scaling")
+
+
+def test_words_rank_by_field(index):
+    # A name match outweighs a description match
+    assert positions(index, "dynamodb") == [1]
+    assert positions(index, "database") == [0, 1]
+    assert positions(index, "storage") == [3]
+
+
+def test_prefixes(index):
+    assert positions(index, "cloud") == [2]
+    assert positions(index, "repl") == [0]
+    # Every term has to match
+    assert positions(index, "amazon repl") == [0]
+    assert positions(index, "repl storage") == []
+
+
+def test_parts_of_words(index):
+    # Substring matches the unindexed search used to find keep working
+    assert positions(index, "sql") == [0, 1]
+    assert positions(index, "base") == [0, 1]
+    assert positions(index, "watch") == [2]
+    assert positions(index, "gresql") == [0]
+    # They rank below whole words and prefixes
+    exact = dict(index.search("database"))
+    infix = dict(index.search("base"))
+    assert infix[0] < exact[0]
+
+
+def test_short_terms_need_a_prefix(index):
+    assert positions(index, "ql") == []
+    assert positions(index, "zzz") == []
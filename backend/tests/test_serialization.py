@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import serialization
+from catalog import ServiceCatalog
+from data import get_catalog
+from models import AWSService, PricingDimensions, PricingModel, ServiceCategory, ServicesResponse
+
+SERVICES = [
+    AWSService(
+        id="unicode",
+        name="Sérvice — \"quoted\" \\ ✓",
+        description="Line one\nline two\t😀",
+        category=ServiceCategory.STORAGE,
+        key_features=["Ünïcode", "</script>"],
+        pricing_notes="$0.023 per GB",
+        pricing_models=[PricingModel.PAY_PER_USE],
+        use_cases=[],
+        limitations=None,
+        documentation_url="https://example.com/?a=1&b=2",
+        pricing=PricingDimensions(per_request=1e-7, per_gb_month=0.023),
+    ),
+    AWSService(
+        id="defaults",
+        name="Defaults",
+        description="Every optional field left unset",
+        category=ServiceCategory.COMPUTE,
+        key_features=[],
+        pricing_notes="",
+        pricing_models=[],
+        use_cases=["x"],
+    ),
+]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+
+
+def test_fragments_decode_to_model_dump():
+    catalog = ServiceCatalog(SERVICES)
+    for position, service in enumerate(SERVICES):
+        assert json.loads(catalog.fragment(position)) == service.model_dump(mode="json")
+        assert catalog.materialize([position]) == [service]
+    assert catalog.fragments([1, 0]) == [catalog.fragment(1), catalog.fragment(0)]
+
+
+def test_services_response_matches_model(encoder):
+    catalog = get_catalog()
+    positions = [2, 0, 5]
+    body = serialization.services_response(
+        catalog.fragments(positions), 42, [ServiceCategory.COMPUTE.value, ServiceCategory.IOT.value], "next"
+    )
+    expected = ServicesResponse(
+        services=catalog.materialize(positions),
+        total_count=42,
+        categories=[ServiceCategory.COMPUTE, ServiceCategory.IOT],
+        next_cursor="next",
+    )
+    assert json.loads(body) == expected.model_dump(mode="json")
+    assert serialization.dumps({"a": [1, None, "é"]}) == b'{"a":[1,null,"\xc3\xa9"]}'
+
+
+def test_endpoint_bodies_validate_against_response_models():
+    main.RESPONSE_CACHE.clear()
+    client = TestClient(main.app)
+    body = client.get("/api/services?limit=100").json()
+    assert ServicesResponse.model_validate(body).model_dump(mode="json") == body
+    assert body["services"] == [service.model_dump(mode="json") for service in get_catalog().filter()]
+    assert client.get("/api/services/s3").json() == get_catalog().get("s3").model_dump(mode="json")
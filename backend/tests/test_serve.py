@@ -0,0 +1,111 @@
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc"), reason="finds worker processes through /proc")
+
+
+def children(pid: int) -> set:
+    found = set()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The parent pid follows the parenthesized command name
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid and fields[0] != "Z":
+            found.add(int(entry))
+    return found
+
+
+def wait_for(condition, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(0.1)
+    raise AssertionError("timed out")
+
+
+def health(port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=5) as response:
+        return json.load(response)
+
+
+def try_health(port: int):
+    try:
+        return health(port)
+    except OSError:
+        return None
+
+
+@pytest.fixture
+def launcher(tmp_path):
+    catalog_path = tmp_path / "catalog.json"
+    shutil.copy(os.path.join(BACKEND_DIR, "catalog.json"), catalog_path)
+    env = dict(os.environ, CATALOG_PATH=str(catalog_path), CATALOG_SNAPSHOT_PATH=str(tmp_path / "missing.snapshot"))
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "2", "--host", "127.0.0.1", "--port", "0",
+         "--poll-interval", "0.2", "--graceful-timeout", "5"],
+        cwd=BACKEND_DIR, env=env, stderr=subprocess.PIPE, text=True,
+    )
+    log = []
+    reader = threading.Thread(target=lambda: log.extend(process.stderr), daemon=True)
+    reader.start()
+    try:
+        match = wait_for(lambda: next((re.search(r"Listening on 127\.0\.0\.1:(\d+)", line) for line in log if "Listening" in line), None))
+        yield process, int(match.group(1)), catalog_path
+    finally:
+        if process.poll() is None:
+            # Workers run in their own process groups, so a failed test stops them one by one
+            for pid in children(process.pid):
+                os.kill(pid, signal.SIGKILL)
+            process.kill()
+            process.wait()
+
+
+def test_workers_share_the_socket_and_follow_catalog_changes(launcher):
+    process, port, catalog_path = launcher
+    workers = wait_for(lambda: len(children(process.pid)) == 2 and children(process.pid))
+    first = wait_for(lambda: try_health(port))
+    assert first["catalog_version"] == 1
+
+    # Each worker answers on the shared socket while the other one is paused
+    served = set()
+    for paused in workers:
+        os.kill(paused, signal.SIGSTOP)
+        try:
+            served.add(health(port)["pid"])
+        finally:
+            os.kill(paused, signal.SIGCONT)
+    assert served == workers
+
+    # A changed catalog is loaded once by the master and served by a new generation
+    with open(catalog_path) as f:
+        services = json.load(f)
+    with open(catalog_path, "w") as f:
+        json.dump(services[:-1], f)
+    replaced = wait_for(lambda: (lambda current: current if current["catalog_version"] == 2 else None)(health(port)))
+    assert replaced["services_count"] == len(services) - 1
+    assert replaced["pid"] not in workers
+    new_workers = wait_for(lambda: (lambda pids: pids if len(pids) == 2 and not pids & workers else None)(children(process.pid)))
+
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=15) == 0
+    for pid in workers | new_workers:
+        assert not os.path.exists(f"/proc/{pid}")
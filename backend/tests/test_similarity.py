@@ -0,0 +1,99 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import similarity
+from similarity import MAX_SIMILAR, SimilarityIndex, document_terms
+
+WORDS = ["queue", "stream", "table", "object", "backup", "cache", "graph", "ledger", "search", "vector", "batch", "edge"]
+SIZE = 60
+
+
+def make_documents():
+    rng = random.Random(17)
+    return [
+        {
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(0, 6))),
+            "key_features": [" ".join(rng.choices(WORDS, k=2)) for _ in range(rng.randint(0, 3))],
+            "use_cases": None,
+        }
+        for _ in range(SIZE)
+    ]
+
+
+DOCUMENTS = make_documents()
+
+
+def brute_force_scores():
+    term_lists = [document_terms(document) for document in DOCUMENTS]
+    frequency = Counter(term for terms in term_lists for term in set(terms))
+    vectors = []
+    for terms in term_lists:
+        vector = {
+            term: math.log1p(count) * (math.log((1 + SIZE) / (1 + frequency[term])) + 1)
+            for term, count in Counter(terms).items()
+            if frequency[term] <= similarity.MAX_DOCUMENT_FRACTION * SIZE
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+    return [
+        [sum(weight * other.get(term, 0.0) for term, weight in vector.items()) for other in vectors]
+        for vector in vectors
+    ]
+
+
+SCORES = brute_force_scores()
+
+
+@pytest.fixture(params=["eager", "lazy"])
+def index(request, monkeypatch):
+    if request.param == "lazy":
+        monkeypatch.setattr(similarity, "EAGER_NEIGHBORS_LIMIT", 0)
+    return SimilarityIndex(DOCUMENTS)
+
+
+def test_neighbors_are_the_most_similar_services(index):
+    for position in range(SIZE):
+        neighbors = index.neighbors(position, MAX_SIMILAR)
+        found = [neighbor for neighbor, _ in neighbors]
+        assert position not in found
+        scores = [score for _, score in neighbors]
+        assert scores == sorted(scores, reverse=True)
+        assert all(score > 0 for score in scores)
+        for neighbor, score in neighbors:
+            assert score == pytest.approx(SCORES[position][neighbor], abs=1e-3)
+
+        left_out = [SCORES[position][other] for other in range(SIZE) if other != position and other not in found]
+        if len(found) < MAX_SIMILAR:
+            assert max(left_out, default=0.0) < 1e-6
+        else:
+            assert max(left_out, default=0.0) <= scores[-1] + 1e-3
+
+
+def test_k_takes_a_prefix(index):
+    assert index.neighbors(3, 4) == index.neighbors(3, MAX_SIMILAR)[:4]
+    assert index.neighbors(3, 1) == index.neighbors(3, MAX_SIMILAR)[:1]
+
+
+def test_service_without_terms_has_no_neighbors():
+    index = SimilarityIndex([{"description": "queue stream"}, {"description": ""}, {"description": "queue"}, {"description": "ledger"}])
+    assert index.neighbors(1, 5) == ()
+    assert [neighbor for neighbor, _ in index.neighbors(0, 5)] == [2]
+
+
+def test_similar_endpoint():
+    client = TestClient(main.app)
+    body = client.get("/api/services/dynamodb/similar?k=3").json()
+    assert body["service_id"] == "dynamodb"
+    assert 0 < len(body["similar"]) <= 3
+    assert all(item["service"]["id"] != "dynamodb" for item in body["similar"])
+    scores = [item["score"] for item in body["similar"]]
+    assert scores == sorted(scores, reverse=True)
+
+    assert client.get("/api/services/missing/similar").status_code == 404
+    assert client.get(f"/api/services/s3/similar?k={MAX_SIMILAR + 1}").status_code == 422
+    assert client.get("/api/services/s3/similar?k=0").status_code == 422
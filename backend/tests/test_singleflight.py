@@ -0,0 +1,143 @@
+import asyncio
+
+from fastapi import Request
+
+import main
+from compression import EncodedBody
+from singleflight import SingleFlight
+
+
+class Computation:
+    """A compute callable that counts its calls and finishes when released"""
+
+    def __init__(self, result="body", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_identical_keys_share_one_compute():
+    async def scenario():
+        flight = SingleFlight()
+        compute = Computation()
+        callers = [asyncio.ensure_future(flight.run(1, ("services", "a"), compute)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flight.stats()["waiters"] == {'["services", "a"]': 4}
+        # Another version of the same key is a separate computation
+        other = asyncio.ensure_future(flight.run(2, ("services", "a"), Computation("other")))
+        await asyncio.sleep(0)
+        assert len(flight) == 2
+        compute.release.set()
+        assert await asyncio.gather(*callers) == ["body"] * 5
+        other.cancel()
+        return flight, compute
+
+    flight, compute = asyncio.run(scenario())
+    assert compute.calls == 1
+    assert (flight.leaders, flight.coalesced) == (2, 4)
+    assert flight.coalesced_by_kind() == {"services": 4}
+    assert flight.stats()["top_coalesced"] == [{"key": '["services", "a"]', "coalesced": 4}]
+
+
+def test_cancelled_waiter_leaves_computation_running():
+    async def scenario():
+        flight = SingleFlight()
+        compute = Computation()
+        leader = asyncio.ensure_future(flight.run(1, "key", compute))
+        follower = asyncio.ensure_future(flight.run(1, "key", compute))
+        await asyncio.sleep(0)
+        # The client that started the computation disconnects
+        leader.cancel()
+        await asyncio.sleep(0)
+        assert leader.cancelled()
+        assert len(flight) == 1
+        compute.release.set()
+        return await follower, compute
+
+    result, compute = asyncio.run(scenario())
+    assert result == "body"
+    assert compute.calls == 1
+
+
+def test_exception_reaches_every_waiter_then_clears():
+    async def scenario():
+        flight = SingleFlight()
+        failing = Computation(error=ValueError("bad catalog"))
+        callers = [asyncio.ensure_future(flight.run(1, "key", failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        failing.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        assert len(flight) == 0
+        # The failure is not remembered: the next caller computes again
+        retry = Computation("fresh")
+        retry.release.set()
+        return results, failing, await flight.run(1, "key", retry), retry
+
+    results, failing, result, retry = asyncio.run(scenario())
+    assert [type(error) for error in results] == [ValueError] * 3
+    assert failing.calls == 1
+    assert (result, retry.calls) == ("fresh", 1)
+
+
+def test_tracked_keys_are_bounded():
+    async def scenario():
+        flight = SingleFlight(max_tracked_keys=4)
+        for key in range(10):
+            compute = Computation(key)
+            callers = [asyncio.ensure_future(flight.run(1, key, compute)) for _ in range(key + 2)]
+            await asyncio.sleep(0)
+            compute.release.set()
+            await asyncio.gather(*callers)
+        return flight
+
+    flight = asyncio.run(scenario())
+    top = flight.stats()["top_coalesced"]
+    assert len(top) <= 4
+    # The most coalesced keys survive the trimming
+    assert top[0] == {"key": "9", "coalesced": 10}
+
+
+def app_request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+
+def test_identical_misses_run_the_query_once(monkeypatch):
+    calls = []
+
+    def encode(catalog):
+        calls.append(catalog.version)
+        return b'{"services": []}'
+
+    async def scenario():
+        main.RESPONSE_CACHE.clear()
+        catalog = main.get_catalog()
+        # A cheap route, answered on the event loop rather than the worker pool
+        return await asyncio.gather(*(
+            main.cached_json_response(app_request(), catalog, ("test", "burst"), encode) for _ in range(5)
+        ))
+
+    responses = asyncio.run(scenario())
+    assert [response.body for response in responses] == [b'{"services": []}'] * 5
+    assert len(calls) == 1
+
+
+def test_miss_path_rechecks_the_cache(monkeypatch):
+    catalog = main.get_catalog()
+    main.RESPONSE_CACHE.clear()
+    main.RESPONSE_CACHE.put(catalog.version, ("test", "landed"), EncodedBody(b"[]"))
+    # The request's own lookup ran before the previous flight landed
+    monkeypatch.setattr(main.RESPONSE_CACHE, "get", lambda version, key: None)
+
+    def encode(catalog):
+        raise AssertionError("encoded a body that was already cached")
+
+    response = asyncio.run(main.cached_json_response(app_request(), catalog, ("test", "landed"), encode))
+    assert response.body == b"[]"
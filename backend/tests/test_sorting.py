@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from catalog import ServiceCatalog
+from models import AWSService, PricingModel, ServiceCategory, SortField
+
+SIZE = 300
+
+# Few distinct names, so ties are broken by name and then by position
+NAMES = ["Alpha", "beta", "Gamma", "delta", "Epsilon", "zeta"]
+
+
+def make_catalog() -> ServiceCatalog:
+    rng = random.Random(7)
+    services = []
+    for index in range(SIZE):
+        services.append(AWSService(
+            id=f"svc-{index}",
+            name=f"{rng.choice(NAMES)} {rng.choice(NAMES)}",
+            description=f"Service {index} for {rng.choice(['queues', 'streams', 'tables'])}",
+            category=rng.choice(list(ServiceCategory)),
+            key_features=[f"feature {feature}" for feature in range(rng.randint(1, 6))],
+            pricing_notes="Priced per request.",
+            pricing_models=[PricingModel.ON_DEMAND],
+            use_cases=["testing"],
+            free_tier_available=rng.random() < 0.5,
+        ))
+    return ServiceCatalog(services)
+
+
+@pytest.fixture(scope="module")
+def catalog() -> ServiceCatalog:
+    return make_catalog()
+
+
+def expected_order(catalog, positions, field, descending):
+    """Brute-force sort: the field, then name ascending, then position ascending"""
+    services = {position: catalog.get(catalog.service_id(position)) for position in positions}
+    keys = {
+        SortField.NAME: lambda position: services[position].name.casefold(),
+        SortField.CATEGORY: lambda position: services[position].category.value,
+        SortField.FEATURES: lambda position: len(services[position].key_features),
+        SortField.FREE_TIER: lambda position: not services[position].free_tier_available,
+    }
+    by_name = sorted(positions, key=lambda position: (services[position].name.casefold(), position))
+    return sorted(by_name, key=keys[field], reverse=descending)
+
+
+FIELDS = [SortField.NAME, SortField.CATEGORY, SortField.FEATURES, SortField.FREE_TIER]
+
+
+@pytest.mark.parametrize("field", FIELDS)
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("category, free_tier", [
+    (None, None),
+    # About half the catalog: pages come from walking the order
+    (None, True),
+    # About one in twelve: pages come from sorting the matches by rank
+    (ServiceCategory.DATABASE, None),
+    (ServiceCategory.COMPUTE, False),
+])
+def test_sorted_listing_matches_brute_force(catalog, field, descending, category, free_tier):
+    positions = catalog.query_positions(category=category, free_tier=free_tier, sort=field, descending=descending)
+    expected = expected_order(catalog, list(catalog.positions(category=category, free_tier=free_tier)), field, descending)
+
+    assert len(positions) == len(expected)
+    assert list(positions) == expected
+    # Every page on its own, the way /api/services slices them
+    for limit in (1, 7, 20):
+        pages = [list(positions[offset:offset + limit]) for offset in range(0, len(expected), limit)]
+        assert [position for page in pages for position in page] == expected
+    assert positions[len(expected) - 1] == expected[-1]
+    assert positions[-1] == expected[-1]
+
+
+def test_matches_bunched_late_in_the_order(catalog):
+    # One category sorted by category: every match sits in one run of the order
+    category = ServiceCategory.MANAGEMENT
+    positions = catalog.query_positions(category=category, sort=SortField.CATEGORY, descending=False)
+    expected = expected_order(catalog, list(catalog.positions(category=category)), SortField.CATEGORY, False)
+    assert list(positions[:5]) == expected[:5]
+    assert list(positions) == expected
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorted_search_results(catalog, descending):
+    matches = catalog.search_positions("queues", free_tier=True)
+    positions = catalog.query_positions(search="queues", free_tier=True, sort=SortField.NAME, descending=descending)
+    assert list(positions[:10]) == expected_order(catalog, matches, SortField.NAME, descending)[:10]
+    assert len(positions) == len(matches)
+
+
+def test_empty_slices(catalog):
+    positions = catalog.query_positions(category=ServiceCategory.DATABASE, sort=SortField.NAME)
+    assert list(positions[0:0]) == []
+    assert list(positions[len(positions):len(positions) + 20]) == []
+    with pytest.raises(IndexError):
+        positions[len(positions)]
+
+
+def test_query_cost(catalog):
+    database = len(catalog.positions(category=ServiceCategory.DATABASE))
+    free = len(catalog.positions(free_tier=True))
+    # Precomputed orders and single posting lists are sliced, so the page bounds the work
+    assert catalog.query_cost(limit=20, sort=SortField.NAME) == 20
+    assert catalog.query_cost(category=ServiceCategory.DATABASE, limit=20) == min(20, database)
+    assert catalog.query_cost(sort=SortField.NAME) == SIZE
+    # Sorting filtered matches, or intersecting filters, visits every match of the shortest posting
+    assert catalog.query_cost(category=ServiceCategory.DATABASE, limit=1, sort=SortField.CATEGORY) == database
+    assert catalog.query_cost(category=ServiceCategory.DATABASE, free_tier=True, limit=1) == min(database, free)
+    assert catalog.query_cost(search="queues", limit=1) == SIZE
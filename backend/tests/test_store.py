@@ -0,0 +1,101 @@
+import itertools
+import json
+import os
+import time
+
+import pytest
+
+from snapshot import write_snapshot
+from store import CatalogStore, load_services
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+with open(os.path.join(HERE, "catalog.json"), encoding="utf-8") as f:
+    RECORDS = json.load(f)
+
+
+# Distinct mtimes for every write, even on filesystems with coarse timestamps
+MTIMES = itertools.count(10**18, 10**9)
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    mtime = next(MTIMES)
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = tmp_path / "catalog.json"
+    write(path, json.dumps(RECORDS[:3]))
+    return path
+
+
+def test_jsonl_and_json_load_the_same_services(tmp_path):
+    path = tmp_path / "catalog.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in RECORDS) + "\n\n", encoding="utf-8")
+    assert load_services(str(path)) == load_services(os.path.join(HERE, "catalog.json"))
+
+
+def test_changed_file_swaps_in_a_new_version(catalog_path):
+    store = CatalogStore(str(catalog_path), poll_interval=0)
+    before = store.current()
+    assert before.version == 1 and len(before) == 3
+    assert not store.reload_if_changed()
+
+    write(catalog_path, json.dumps(RECORDS[:5]))
+    assert store.reload_if_changed()
+    after = store.current()
+    assert after.version == 2 and len(after) == 5
+    assert after.fingerprint != before.fingerprint
+    # Readers holding the old snapshot keep a consistent view
+    assert len(before) == 3 and before.get(RECORDS[4]["id"]) is None
+
+
+def test_broken_file_keeps_the_current_version(catalog_path):
+    store = CatalogStore(str(catalog_path), poll_interval=0)
+    write(catalog_path, "[{")
+    assert not store.reload_if_changed()
+    assert store.current().version == 1
+    # The broken file is not re-parsed until it changes again
+    assert not store.reload_if_changed()
+
+    write(catalog_path, json.dumps(RECORDS[:1] + [{"id": "incomplete"}]))
+    assert not store.reload_if_changed()
+    write(catalog_path, json.dumps(RECORDS))
+    assert store.reload_if_changed()
+    assert store.current().version == 2 and len(store.current()) == len(RECORDS)
+
+
+def test_missing_file_is_not_a_change(catalog_path):
+    store = CatalogStore(str(catalog_path), poll_interval=0)
+    catalog_path.unlink()
+    assert not store.reload_if_changed()
+    assert len(store.current()) == 3
+
+
+def test_watcher_picks_up_changes(catalog_path):
+    store = CatalogStore(str(catalog_path), poll_interval=0.01)
+    store.start_watching()
+    try:
+        write(catalog_path, json.dumps(RECORDS))
+        deadline = time.monotonic() + 5
+        while store.current().version == 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(store.current()) == len(RECORDS)
+    finally:
+        store.stop_watching()
+
+
+def test_startup_uses_a_matching_snapshot(catalog_path, tmp_path):
+    snapshot_path = str(tmp_path / "catalog.pickle")
+    assert not CatalogStore(str(catalog_path), poll_interval=0, snapshot_path=snapshot_path).from_snapshot
+
+    write_snapshot(CatalogStore(str(catalog_path), poll_interval=0).current(), str(catalog_path), snapshot_path)
+    store = CatalogStore(str(catalog_path), poll_interval=0, snapshot_path=snapshot_path)
+    assert store.from_snapshot and len(store.current()) == 3
+
+    # A snapshot of an older file is ignored
+    write(catalog_path, json.dumps(RECORDS[:4]))
+    store = CatalogStore(str(catalog_path), poll_interval=0, snapshot_path=snapshot_path)
+    assert not store.from_snapshot and len(store.current()) == 4
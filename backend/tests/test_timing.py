@@ -0,0 +1,66 @@
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main
+import timing
+from timing import ServerTimingMiddleware, TimingFormatter, phase
+
+
+def test_formatter_keeps_structured_fields():
+    record = logging.LogRecord("timing", logging.INFO, __file__, 1, "GET %s", ("/api/services",), None)
+    record.path = "/api/services"
+    record.phases_ms = {"cache": 0.25}
+    entry = json.loads(TimingFormatter().format(record))
+    assert entry["logger"] == "timing"
+    assert entry["message"] == "GET /api/services"
+    assert entry["path"] == "/api/services"
+    assert entry["phases_ms"] == {"cache": 0.25}
+    assert "status" not in entry
+
+
+def test_middleware_logs_phases(monkeypatch):
+    # configure_logger changes the module's logger; the monkeypatched attributes are restored afterwards
+    monkeypatch.setattr(timing.logger, "handlers", [])
+    monkeypatch.setattr(timing.logger, "level", logging.NOTSET)
+    monkeypatch.setattr(timing.logger, "propagate", True)
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        with phase("encode"):
+            return {"ok": True}
+
+    timed_app = ServerTimingMiddleware(app, enabled=True)
+    assert timing.logger.level == logging.INFO
+    assert not timing.logger.propagate
+    records = []
+    monkeypatch.setattr(timing.logger.handlers[0], "emit", records.append)
+
+    response = TestClient(timed_app).get("/slow")
+    assert "encode;dur=" in response.headers["server-timing"]
+    entry = json.loads(timing.logger.handlers[0].format(records[0]))
+    assert (entry["method"], entry["path"], entry["status"]) == ("GET", "/slow", 200)
+    assert set(entry["phases_ms"]) == {"encode"}
+    assert entry["total_ms"] >= entry["phases_ms"]["encode"]
+
+
+def test_routes_time_validation(monkeypatch):
+    monkeypatch.setattr(timing.logger, "handlers", [])
+    monkeypatch.setattr(timing.logger, "level", logging.NOTSET)
+    monkeypatch.setattr(timing.logger, "propagate", True)
+    timed_app = ServerTimingMiddleware(main.app, enabled=True)
+    monkeypatch.setattr(timing.logger.handlers[0], "emit", lambda record: None)
+    client = TestClient(timed_app)
+    main.RESPONSE_CACHE.clear()
+
+    response = client.get("/api/services", params={"category": "Database", "limit": 5})
+    phases = {entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")}
+    assert {"validate", "cache", "filter", "serialize", "total"} <= phases
+
+    # Rejected parameters are timed too
+    response = client.get("/api/services", params={"category": "Nope"})
+    assert response.status_code == 400
+    assert response.headers["server-timing"].startswith("validate;dur=")
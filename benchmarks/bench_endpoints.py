@@ -0,0 +1,264 @@
+"""Endpoint latency and throughput benchmarks against synthetic catalogs.
+
+    python benchmarks/bench_endpoints.py --sizes 10 1000 100000 --output benchmarks/baseline.json
+    python benchmarks/bench_endpoints.py --baseline benchmarks/baseline.json
+
+Both FastAPI apps (backend/ and api/) are driven in-process through httpx's ASGI
+transport. Each (app, catalog size) pair runs in its own subprocess, because the two
+apps share flat module names and every run needs a fresh catalog.
+
+The response cache is cleared before every timed request, so each one measures the
+query and encode path rather than a cache lookup; pass --warm-cache to keep it.
+Search shapes draw their terms from the catalog's generated vocabulary.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+APP_DIRS = {"backend": os.path.join(REPO_ROOT, "backend"), "api": os.path.join(REPO_ROOT, "api")}
+
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic import CATEGORIES, FEATURES, make_vocabulary, skewed_choice, vocabulary_size, write_catalog
+
+# (name, url factory taking (rng, catalog size, generated vocabulary), largest catalog size
+# the shape is run at; None for no limit). Unpaginated full-list shapes are skipped on
+# huge catalogs, their payloads are tens of MB.
+Shape = Tuple[str, Callable[[random.Random, int, List[str]], str], Optional[int]]
+
+STOCK_TERMS = sorted({word.lower() for feature in FEATURES for word in feature.split() if len(word) > 3})
+SORT_FIELDS = ("name", "category", "features", "free_tier")
+
+
+def random_ids(rng: random.Random, size: int, count: int) -> str:
+    return ",".join(f"svc-{index}" for index in rng.sample(range(size), min(count, size)))
+
+
+def search_term(rng: random.Random, words: List[str]) -> str:
+    """A stock feature word or, as often, a generated one drawn with term-frequency skew"""
+    return rng.choice(STOCK_TERMS) if rng.random() < 0.5 else skewed_choice(rng, words)
+
+
+def typo(rng: random.Random, term: str) -> str:
+    """term with two adjacent letters swapped, as a user mistyping it would send"""
+    index = rng.randrange(1, len(term) - 2)
+    return term[:index] + term[index + 1] + term[index] + term[index + 2:]
+
+
+SHAPES: List[Shape] = [
+    ("services_all", lambda rng, size, words: "/api/services", 10_000),
+    ("services_page", lambda rng, size, words: "/api/services?limit=20", None),
+    ("services_category", lambda rng, size, words: f"/api/services?category={quote(rng.choice(CATEGORIES))}", 10_000),
+    ("services_category_free_tier_page", lambda rng, size, words: f"/api/services?category={quote(rng.choice(CATEGORIES))}&free_tier=true&limit=20", None),
+    ("services_search", lambda rng, size, words: f"/api/services?search={search_term(rng, words)}&limit=20", None),
+    ("services_search_prefix", lambda rng, size, words: f"/api/services?search={search_term(rng, words)[:3]}&limit=20", None),
+    ("services_search_fuzzy", lambda rng, size, words: f"/api/services?search={typo(rng, search_term(rng, words))}&search_mode=fuzzy&limit=20", None),
+    ("services_sorted_page", lambda rng, size, words: f"/api/services?category={quote(rng.choice(CATEGORIES))}&sort={rng.choice(SORT_FIELDS)}&order={rng.choice(['asc', 'desc'])}&limit=20", None),
+    ("services_projection_page", lambda rng, size, words: "/api/services?limit=50&fields=name,category,free_tier_available", None),
+    ("service_by_id", lambda rng, size, words: f"/api/services/svc-{rng.randrange(size)}", None),
+    ("services_batch", lambda rng, size, words: f"/api/services/batch?ids={random_ids(rng, size, 20)},missing-id", None),
+    ("similar_services", lambda rng, size, words: f"/api/services/svc-{rng.randrange(size)}/similar?k=5", None),
+    ("services_by_category", lambda rng, size, words: f"/api/services/category/{quote(rng.choice(CATEGORIES))}", 10_000),
+    ("facets", lambda rng, size, words: "/api/facets", None),
+    ("facets_category_search", lambda rng, size, words: f"/api/facets?category={quote(rng.choice(CATEGORIES))}&search={search_term(rng, words)}", None),
+    ("compare_pair", lambda rng, size, words: f"/api/compare?service_ids={random_ids(rng, size, 2)}", None),
+    ("compare_ten", lambda rng, size, words: f"/api/compare?service_ids={random_ids(rng, size, 10)}", None),
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int, response_bytes: int) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": count / elapsed if elapsed else 0.0,
+        "mean_ms": sum(ordered) / count * 1000 if count else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "mean_response_bytes": response_bytes / count if count else 0.0,
+    }
+
+
+async def run_shapes(
+    app, size: int, iterations: int, max_seconds: float, seed: int, clear_cache: Optional[Callable[[], None]]
+) -> Dict[str, object]:
+    import httpx
+
+    words = make_vocabulary(vocabulary_size(size), seed)
+    results: Dict[str, object] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, make_url, max_size in SHAPES:
+            if max_size is not None and size > max_size:
+                results[name] = {"skipped": f"catalog larger than {max_size}"}
+                continue
+            rng = random.Random(seed)
+            for _ in range(min(10, iterations)):
+                await client.get(make_url(rng, size, words))
+
+            latencies: List[float] = []
+            errors = response_bytes = 0
+            started = time.perf_counter()
+            while len(latencies) < iterations and time.perf_counter() - started < max_seconds:
+                url = make_url(rng, size, words)
+                if clear_cache is not None:
+                    clear_cache()
+                request_started = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - request_started)
+                response_bytes += len(response.content)
+                if response.status_code >= 400:
+                    errors += 1
+            results[name] = summarize(latencies, time.perf_counter() - started, errors, response_bytes)
+    return results
+
+
+def run_worker(
+    app_dir: str, size: int, iterations: int, max_seconds: float, seed: int, warm_cache: bool
+) -> Dict[str, object]:
+    """Import one app against the catalog named by CATALOG_PATH and benchmark every shape"""
+    sys.path.insert(0, app_dir)
+    os.chdir(app_dir)
+    started = time.perf_counter()
+    import main
+    startup_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "startup_ms": startup_ms,
+        "shapes": asyncio.run(run_shapes(
+            main.app, size, iterations, max_seconds, seed, None if warm_cache else main.RESPONSE_CACHE.clear
+        )),
+    }
+
+
+def run_suite(
+    sizes: List[int], apps: List[str], iterations: int, max_seconds: float, seed: int, warm_cache: bool
+) -> Dict[str, object]:
+    results: Dict[str, Dict[str, object]] = {app: {} for app in apps}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            catalog_path = os.path.join(workdir, f"catalog-{size}.json")
+            write_catalog(catalog_path, size, seed)
+            env = dict(
+                os.environ,
+                CATALOG_PATH=catalog_path,
+                CATALOG_SNAPSHOT_PATH=os.path.join(workdir, "no.snapshot"),
+                CATALOG_POLL_INTERVAL="0",
+            )
+            for app in apps:
+                print(f"Benchmarking {app} with {size} services...", file=sys.stderr)
+                completed = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--worker", app,
+                     "--sizes", str(size), "--iterations", str(iterations),
+                     "--max-seconds", str(max_seconds), "--seed", str(seed)]
+                    + (["--warm-cache"] if warm_cache else []),
+                    env=env, capture_output=True, text=True, check=True,
+                )
+                results[app][str(size)] = json.loads(completed.stdout)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "iterations": iterations,
+            "seed": seed,
+            "response_cache": "warm" if warm_cache else "cleared per request",
+        },
+        "results": results,
+    }
+
+
+def find_regressions(current: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """p95 latencies that grew by more than tolerance relative to the baseline"""
+    regressions = []
+    for app, sizes in current["results"].items():
+        for size, run in sizes.items():
+            baseline_shapes = baseline.get("results", {}).get(app, {}).get(size, {}).get("shapes", {})
+            for shape, stats in run["shapes"].items():
+                previous = baseline_shapes.get(shape)
+                if "p95_ms" not in stats or not previous or "p95_ms" not in previous:
+                    continue
+                if stats["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                    regressions.append(
+                        f"{app} size={size} {shape}: p95 {previous['p95_ms']:.3f}ms -> {stats['p95_ms']:.3f}ms"
+                    )
+    return regressions
+
+
+def print_table(report: Dict[str, object]) -> None:
+    for app, sizes in report["results"].items():
+        for size, run in sizes.items():
+            print(f"\n{app} / {size} services (startup {run['startup_ms']:.1f}ms)")
+            print(f"  {'shape':<34}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'bytes':>12}")
+            for shape, stats in run["shapes"].items():
+                if "skipped" in stats:
+                    print(f"  {shape:<34}  skipped: {stats['skipped']}")
+                    continue
+                print(
+                    f"  {shape:<34}{stats['throughput_rps']:>10.0f}{stats['p50_ms']:>10.3f}"
+                    f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['mean_response_bytes']:>12.0f}"
+                )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--apps", nargs="+", choices=sorted(APP_DIRS), default=sorted(APP_DIRS))
+    parser.add_argument("--iterations", type=int, default=200, help="Requests per shape")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Time budget per shape")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--warm-cache", action="store_true", help="Keep the response cache between requests")
+    parser.add_argument("--output", help="Write the JSON report here, e.g. to record a new baseline")
+    parser.add_argument("--baseline", help="Compare p95 latencies against a previous JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative p95 growth")
+    parser.add_argument("--worker", choices=sorted(APP_DIRS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(
+            APP_DIRS[args.worker], args.sizes[0], args.iterations, args.max_seconds, args.seed, args.warm_cache
+        )
+        json.dump(result, sys.stdout)
+        return 0
+
+    report = run_suite(args.sizes, args.apps, args.iterations, args.max_seconds, args.seed, args.warm_cache)
+    print_table(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("response_cache") != report["meta"]["response_cache"]:
+            print("warning: the baseline was recorded with a different response cache mode", file=sys.stderr)
+        regressions = find_regressions(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Memory held by the catalog's service records, pydantic models versus compact columns.
+
+    python benchmarks/bench_memory.py --sizes 1000 100000
+    python benchmarks/bench_memory.py --sizes 100000 --output benchmarks/memory.json
+
+For each synthetic catalog size this decodes the catalog from JSON text and validates
+the services into AWSService models, as load_services does, then converts them into the
+ServiceRecords columns a snapshot keeps, and reports the memory each representation
+retains as measured by tracemalloc. Tracing starts before the JSON is decoded: the models
+keep the decoded strings themselves, so starting later would leave every string payload,
+and with it what interning saves, out of both figures. The records figure is taken after
+the models are released, so strings the two share count only once. It
+also times materializing models back from the records, the cost paid per service a
+response needs as a model.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "backend"))
+
+from synthetic import generate_services
+from models import AWSService
+from records import ServiceRecords
+
+
+def traced_bytes() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def measure(size: int, seed: int) -> Dict[str, float]:
+    text = json.dumps(generate_services(size, seed))
+    tracemalloc.start()
+    try:
+        baseline = traced_bytes()
+        decoded = json.loads(text)
+        models = [AWSService.model_validate(record) for record in decoded]
+        del decoded
+        models_bytes = traced_bytes() - baseline
+
+        records = ServiceRecords(models)
+        del models
+        records_bytes = traced_bytes() - baseline
+    finally:
+        tracemalloc.stop()
+
+    positions = range(0, size, max(1, size // 1000))
+    started = time.perf_counter()
+    for position in positions:
+        records.record(position)
+    materialize_us = (time.perf_counter() - started) / len(positions) * 1e6
+
+    return {
+        "models_mb": models_bytes / 2**20,
+        "records_mb": records_bytes / 2**20,
+        "models_bytes_per_service": models_bytes / size,
+        "records_bytes_per_service": records_bytes / size,
+        "reduction": 1 - records_bytes / models_bytes if models_bytes else 0.0,
+        "materialize_us": materialize_us,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'services':>10}{'models MB':>12}{'records MB':>12}{'B/svc before':>14}{'B/svc after':>13}{'saved':>8}{'model us':>10}")
+    for size in args.sizes:
+        stats = results[str(size)] = measure(size, args.seed)
+        print(
+            f"{size:>10}{stats['models_mb']:>12.1f}{stats['records_mb']:>12.1f}"
+            f"{stats['models_bytes_per_service']:>14.0f}{stats['records_bytes_per_service']:>13.0f}"
+            f"{stats['reduction']:>8.0%}{stats['materialize_us']:>10.1f}"
+        )
+
+    if args.output:
+        report: Dict[str, object] = {"seed": args.seed, "results": results}
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import json
+import random
+from typing import Dict, List
+
+# Vocabulary the generator draws from; overlapping phrases across services mirror the
+# real catalog, where features like "Auto Scaling" repeat between many entries
+CATEGORIES = [
+    "Compute", "Storage", "Database", "Networking", "Security", "Analytics",
+    "Machine Learning", "Containers", "Serverless", "Developer Tools",
+    "Management & Governance", "Internet of Things",
+]
+
+PRICING_MODELS = ["On-Demand", "Reserved Instances", "Spot Pricing", "Free Tier", "Pay-per-use"]
+
+NAME_PREFIXES = ["Amazon", "AWS"]
+
+# Syllables for made-up product and feature words. A real catalog's text has a long tail
+# of rare terms, and index, search and fuzzy costs all grow with vocabulary size.
+ONSETS = ["b", "br", "c", "ch", "d", "dr", "f", "fl", "g", "gr", "h", "j", "k", "kr", "l", "m",
+          "n", "p", "pl", "qu", "r", "s", "sh", "sk", "st", "t", "tr", "v", "w", "z"]
+VOWELS = ["a", "e", "i", "o", "u", "ai", "ea", "io", "ou", "y"]
+CODAS = ["", "", "", "n", "r", "s", "x", "l", "m", "nd", "st", "th", "ck"]
+
+FEATURES = [
+    "Auto Scaling", "High availability", "Pay-per-request pricing", "Built-in monitoring",
+    "Encryption at rest", "Encryption in transit", "VPC support", "IAM integration",
+    "Multi-AZ deployment", "Point-in-time recovery", "Global replication", "Serverless option",
+    "Managed backups", "Fine-grained access control", "Event-driven execution",
+    "Automatic patching", "Read replicas", "Lifecycle policies", "Real-time metrics",
+    "API access", "SDK support", "Custom dashboards", "Load balancing integration",
+    "Container support", "GPU acceleration", "Edge locations", "Streaming ingestion",
+]
+
+USE_CASES = [
+    "Web applications", "Mobile backends", "Data processing", "Batch processing",
+    "Machine learning training", "Real-time analytics", "Log aggregation", "Backup and restore",
+    "Microservices", "Event-driven applications", "IoT telemetry", "Content delivery",
+    "Compliance auditing", "Gaming", "Media transcoding", "Data warehousing",
+]
+
+LIMITATIONS = [
+    "Regional service", "Request rate limits", "Item size limits", "Cold start latency",
+    "Instance limits per region", "Limited customization", "Learning curve",
+    "Cost optimization needed", "Quota increases require support ticket",
+]
+
+REGIONS = ["Most AWS regions", "All AWS regions", "Selected AWS regions", "Global"]
+
+
+def make_vocabulary(size: int, seed: int = 42) -> List[str]:
+    """size distinct pronounceable made-up words, the same for the same arguments"""
+    rng = random.Random(f"vocabulary-{seed}")
+    words: Dict[str, None] = {}
+    while len(words) < size:
+        syllables = rng.randint(2, 3)
+        words["".join(rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS) for _ in range(syllables))] = None
+    return list(words)
+
+
+def vocabulary_size(count: int) -> int:
+    """Distinct generated words for a catalog of count services; grows with the catalog"""
+    return 2_000 + count
+
+
+def skewed_choice(rng: random.Random, words: List[str]) -> str:
+    """Pick from words with a heavy head and a long tail, roughly like term frequencies in text"""
+    return words[int(len(words) * rng.random() ** 3)]
+
+
+def phrase(rng: random.Random, words: List[str], low: int, high: int) -> str:
+    return " ".join(skewed_choice(rng, words) for _ in range(rng.randint(low, high)))
+
+
+def generate_services(count: int, seed: int = 42) -> List[Dict[str, object]]:
+    """Deterministic catalog of count services shaped like the records in catalog.json
+
+    Names, features, use cases and limitations mix the stock phrases above with phrases
+    of generated words, so the number of distinct terms grows with the catalog.
+    """
+    rng = random.Random(seed)
+    words = make_vocabulary(vocabulary_size(count), seed)
+    services = []
+    for index in range(count):
+        product = phrase(rng, words, 1, 2).title()
+        name = f"{rng.choice(NAME_PREFIXES)} {product} {index}"
+        category = rng.choice(CATEGORIES)
+        key_features = [
+            rng.choice(FEATURES) if rng.random() < 0.3 else f"{phrase(rng, words, 1, 3).capitalize()} {rng.choice(FEATURES).lower()}"
+            for _ in range(rng.randint(4, 8))
+        ]
+        pricing_models = rng.sample(PRICING_MODELS, rng.randint(1, 3))
+        free_tier = rng.random() < 0.7
+        if free_tier and "Free Tier" not in pricing_models:
+            pricing_models.append("Free Tier")
+        services.append({
+            "id": f"svc-{index}",
+            "name": name,
+            "description": f"{product} service for {rng.choice(USE_CASES).lower()} and {phrase(rng, words, 1, 2)} "
+                           f"with {phrase(rng, words, 2, 5)}, {rng.choice(FEATURES).lower()} and {phrase(rng, words, 1, 3)}",
+            "category": category,
+            "key_features": key_features,
+            "pricing_notes": f"Priced per {rng.choice(['request', 'GB-month', 'hour', 'instance-hour'])}. "
+                             f"{'Free tier available.' if free_tier else 'No free tier.'}",
+            "pricing_models": pricing_models,
+            "use_cases": [
+                rng.choice(USE_CASES) if rng.random() < 0.5 else f"{phrase(rng, words, 1, 2).capitalize()} {rng.choice(USE_CASES).lower()}"
+                for _ in range(rng.randint(3, 5))
+            ],
+            "limitations": [
+                rng.choice(LIMITATIONS) if rng.random() < 0.5 else f"{rng.choice(LIMITATIONS)} for {phrase(rng, words, 1, 2)}"
+                for _ in range(rng.randint(1, 3))
+            ],
+            "free_tier_available": free_tier,
+            "region_availability": rng.choice(REGIONS),
+            "documentation_url": f"https://docs.aws.amazon.com/svc-{index}/",
+            "pricing": {
+                "per_request": round(rng.choice([0.0, rng.uniform(1e-7, 1e-5)]), 9),
+                "per_gb_month": round(rng.choice([0.0, rng.uniform(0.01, 0.3)]), 4),
+                "per_hour": round(rng.choice([0.0, rng.uniform(0.005, 2.0)]), 4),
+                "free_requests_per_month": 1_000_000.0 if free_tier else 0.0,
+                "free_gb_months_per_month": 5.0 if free_tier else 0.0,
+                "free_hours_per_month": 750.0 if free_tier else 0.0,
+            },
+        })
+    return services
+
+
+def write_catalog(path: str, count: int, seed: int = 42) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(generate_services(count, seed), f)
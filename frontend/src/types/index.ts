@@ -11,18 +11,89 @@ export interface AWSService {
   free_tier_available: boolean;
   region_availability: string;
   documentation_url?: string;
+  pricing?: PricingDimensions | null;
+}
+
+export interface PricingDimensions {
+  per_request: number;
+  per_gb_month: number;
+  per_hour: number;
+  free_requests_per_month: number;
+  free_gb_months_per_month: number;
+  free_hours_per_month: number;
 }
 
 export interface ServicesResponse {
   services: AWSService[];
   total_count: number;
   categories: ServiceCategory[];
+  next_cursor?: string | null;
+}
+
+export interface SetComparison {
+  shared: string[];
+  unique: Record<string, string[]>;
+}
+
+export interface PricingComparison {
+  bits: Record<string, number>;
+  common_bits: number;
+  union_bits: number;
+  common: PricingModel[];
+  differences: Record<string, PricingModel[]>;
+}
+
+export interface ComparisonMatrix {
+  key_features: SetComparison;
+  limitations: SetComparison;
+  pricing_models: PricingComparison;
+  free_tier: Record<string, boolean>;
+  free_tier_differs: boolean;
+  region_availability: Record<string, string>;
+  region_availability_differs: boolean;
 }
 
 export interface ComparisonResponse {
   services: AWSService[];
   comparison_criteria: string[];
   comparison_count: number;
+  matrix: ComparisonMatrix;
+}
+
+export interface SimilarService {
+  score: number;
+  service: AWSService;
+}
+
+export interface SimilarServicesResponse {
+  service_id: string;
+  similar: SimilarService[];
+}
+
+export interface UsageScenario {
+  name?: string;
+  requests?: number;
+  gb_months?: number;
+  hours?: number;
+}
+
+export interface EstimateResponse {
+  service_ids: string[];
+  scenario_count: number;
+  costs: number[][];
+  cheapest: (string | null)[];
+}
+
+export interface BatchServicesResponse {
+  services: AWSService[];
+  missing: string[];
+}
+
+export interface FacetsResponse {
+  total_count: number;
+  categories: Record<ServiceCategory, number>;
+  pricing_models: Record<PricingModel, number>;
+  free_tier: Record<'true' | 'false', number>;
 }
 
 export enum ServiceCategory {
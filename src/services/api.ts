@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { AWSService, ServicesResponse, ComparisonResponse, ServiceCategory } from '../types';
+import { AWSService, ServicesResponse, ComparisonResponse, FacetsResponse, SimilarServicesResponse, UsageScenario, EstimateResponse, BatchServicesResponse, ServiceCategory } from '../types';
 
 const API_BASE_URL = process.env.NODE_ENV === 'production' 
   ? '' // Use relative URLs in production (same domain)
@@ -16,6 +16,12 @@ export interface GetServicesParams {
   category?: string;
   free_tier?: boolean;
   search?: string;
+  search_mode?: 'text' | 'fuzzy';
+  limit?: number;
+  cursor?: string;
+  fields?: string;
+  sort?: 'name' | 'category' | 'features' | 'free_tier' | 'relevance';
+  order?: 'asc' | 'desc';
 }
 
 export const apiService = {
@@ -31,6 +37,18 @@ export const apiService = {
     return response.data;
   },
 
+  // Get many services by id in one request; unknown ids come back in missing
+  getServicesBatch: async (serviceIds: string[]): Promise<BatchServicesResponse> => {
+    const response = await api.post('/api/services/batch', { service_ids: serviceIds });
+    return response.data;
+  },
+
+  // Get the services most similar to a service
+  getSimilarServices: async (serviceId: string, k?: number): Promise<SimilarServicesResponse> => {
+    const response = await api.get(`/api/services/${serviceId}/similar`, { params: { k } });
+    return response.data;
+  },
+
   // Get all categories
   getCategories: async (): Promise<{ categories: ServiceCategory[] }> => {
     const response = await api.get('/api/categories');
@@ -43,6 +61,12 @@ export const apiService = {
     return response.data;
   },
 
+  // Get facet counts for the same filters as getServices
+  getFacets: async (params?: Pick<GetServicesParams, 'category' | 'free_tier' | 'search' | 'search_mode'>): Promise<FacetsResponse> => {
+    const response = await api.get('/api/facets', { params });
+    return response.data;
+  },
+
   // Compare services
   compareServices: async (serviceIds: string[]): Promise<ComparisonResponse> => {
     const response = await api.get('/api/compare', {
@@ -51,6 +75,12 @@ export const apiService = {
     return response.data;
   },
 
+  // Estimate monthly costs of usage scenarios, across all priced services by default
+  estimateCosts: async (scenarios: UsageScenario[], serviceIds?: string[]): Promise<EstimateResponse> => {
+    const response = await api.post('/api/estimate', { scenarios, service_ids: serviceIds });
+    return response.data;
+  },
+
   // Health check
   healthCheck: async (): Promise<{ status: string; services_count: number }> => {
     const response = await api.get('/api/health');
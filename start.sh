@@ -46,6 +46,10 @@ source venv/bin/activate
 echo "📦 Installing Python dependencies..."
 pip install -r requirements.txt
 
+# Compile the catalog snapshot so startup skips validation
+echo "🗂️  Building catalog snapshot..."
+python snapshot.py
+
 # Start backend server
 echo "🌐 Starting backend server on http://localhost:8000"
 uvicorn main:app --reload --host 0.0.0.0 --port 8000 &